@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+"""
+Memory used by decoders for many contracts sharing the same ABIs.
+
+Every copy is loaded from its own JSON, as when reading one file per contract,
+and the traced allocations are reported for full, compact and lazy decoders.
+
+    python -m benchmarks.memory --copies 1000
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import tracemalloc
+from argparse import ArgumentParser
+from collections.abc import Callable
+from time import perf_counter
+
+from pysad.cache import PlanCache
+from pysad.decoder import ABIDecoder
+from tests.abis import PERMIT2_ABI, UNIVERSAL_ROUTER_ABI, WETH_ABI
+
+ABIS = (PERMIT2_ABI, UNIVERSAL_ROUTER_ABI, WETH_ABI)
+
+
+def measure(copies: int, build: Callable[[list[dict]], ABIDecoder]):
+    sources = [json.dumps(abi) for abi in ABIS]
+
+    # Process wide caches, eg. eth_abi's decoders by type, are warmed up first so
+    # that no mode is charged for them. Fragments and plans are interned weakly
+    # and freed along with the warm-up decoders.
+    for source in sources:
+        build(json.loads(source))
+    gc.collect()
+    tracemalloc.start()
+    start = perf_counter()
+    decoders = [build(json.loads(source)) for _ in range(copies) for source in sources]
+    elapsed = perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # The JSON is freed once the decoders are built, count only what they retain
+    return len(decoders), current, elapsed
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--copies", type=int, default=200)
+    args = parser.parse_args()
+
+    modes: dict[str, Callable[[list[dict]], ABIDecoder]] = {
+        "full": lambda abi: ABIDecoder(abi, compact=False),
+        "compact": lambda abi: ABIDecoder(abi),
+        "lazy": lambda abi, plans=PlanCache(): ABIDecoder(abi, plans=plans),
+    }
+    for mode, build in modes.items():
+        count, size, elapsed = measure(args.copies, build)
+        print(
+            f"{mode:>8}: {count} decoders, {size / (1 << 20):8.1f} MiB "
+            f"({size / count / 1024:6.1f} KiB each), built in {elapsed:6.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+"""
+Decoding throughput of threads sharing one decoder and result cache.
+
+Runs on the default and the free-threaded builds of CPython alike. With the GIL,
+throughput stays flat as threads are added; without it, it should scale with them.
+
+    python -m benchmarks.threads --threads 8 --calls 20000
+"""
+
+from __future__ import annotations
+
+import sys
+from argparse import ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from pysad.cache import PlanCache, ResultCache
+from pysad.decoder import ABIDecoder
+from tests.abis import WETH_ABI
+
+TRANSFER = bytes.fromhex(
+    "a9059cbb000000000000000000000000eb093c39fc8ded8c4d043c367d4bd75321e8a7c6"
+    "0000000000000000000000000000000000000000000000000577f9efb3eee9c1"
+)
+APPROVE = bytes.fromhex(
+    "095ea7b300000000000000000000000068b3465833fb72a70ecdf485e0e4c7bd8665fc45"
+    "ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff"
+)
+
+
+def payloads(calls: int) -> list[bytes]:
+    # Distinct amounts, so the cache hit rate does not depend on the thread count
+    selectors = (TRANSFER[:36], APPROVE[:36])
+    return [selectors[i % 2] + (i % 1000).to_bytes(32, "big") for i in range(calls)]
+
+
+def measure(decoder: ABIDecoder, inputs: list[bytes], threads: int) -> float:
+    chunks = [inputs[i::threads] for i in range(threads)]
+
+    def run(chunk: list[bytes]):
+        for input in chunk:
+            decoder.decode_function(input)
+
+    with ThreadPoolExecutor(threads) as pool:
+        start = perf_counter()
+        list(pool.map(run, chunks))
+        return perf_counter() - start
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+
+    inputs = payloads(args.calls)
+    modes = {
+        "uncached": lambda: ABIDecoder(WETH_ABI),
+        "cached": lambda: ABIDecoder(WETH_ABI, cache=ResultCache()),
+        "lazy": lambda: ABIDecoder(WETH_ABI, plans=PlanCache()),
+    }
+    for mode, build in modes.items():
+        base = None
+        for threads in range(1, args.threads + 1):
+            elapsed = measure(build(), inputs, threads)
+            base = base or elapsed
+            print(
+                f"{mode:>8} x{threads:<2}: {args.calls / elapsed:10.0f} calls/s "
+                f"({base / elapsed:4.2f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
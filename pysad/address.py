@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+
+"""
+Address output formats.
+
+eth_abi returns every address as a new lowercase hex string. The formats below
+convert through bounded LRU caches, so hot addresses (routers, WETH, stablecoins)
+are checksummed once and equal addresses share a single object.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Literal
+
+from eth_utils.address import to_checksum_address
+
+AddressFormat = Literal["hex", "checksum", "bytes"]
+
+ADDRESS_CACHE_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def intern_address(address: str) -> str:
+    return address
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def checksum_address(address: str) -> str:
+    return to_checksum_address(address)
+
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def address_bytes(address: str) -> bytes:
+    return bytes.fromhex(address[2:])
+
+
+ADDRESS_CONVERTERS: dict[str, Callable[[str], str | bytes]] = {
+    "hex": intern_address,
+    "checksum": checksum_address,
+    "bytes": address_bytes,
+}
+
+
+def get_address_converter(
+    format: AddressFormat | None,
+) -> Callable[[str], str | bytes] | None:
+    """
+    Get the converter from eth_abi's lowercase hex into `format`.
+    None leaves addresses as eth_abi returns them.
+    """
+    if format is None:
+        return None
+    try:
+        return ADDRESS_CONVERTERS[format]
+    except KeyError:
+        raise ValueError(f"Unknown address format {format!r}") from None
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+
+"""
+asyncio decoding.
+
+Most payloads decode in microseconds, far less than it costs to hand them to
+another thread, so they are decoded inline on the event loop. Payloads and
+batches above a size threshold would block the loop for longer and are decoded
+in an executor instead, either a thread pool or a process pool whose workers
+hold their own copy of the decoder. The number of offloaded jobs in flight is
+bounded per event loop, so producers outpacing the pool wait instead of
+queueing without limit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import weakref
+from collections import deque
+from collections.abc import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Mapping,
+)
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import Any
+
+from pysad.cache import PlanCache
+from pysad.decoder import ABIDecoder
+from pysad.fragment import Fragment
+from pysad.result import DecodeResult
+
+DEFAULT_OFFLOAD_BYTES = 16 << 10
+DEFAULT_MAX_IN_FLIGHT = 64
+
+# The decoder of a process pool worker, built by `_init_worker`
+_worker_decoder: ABIDecoder | None = None
+
+
+def _init_worker(
+    sources: list[tuple[list[dict], str | None]], compact: bool, max_plans: int | None
+):
+    global _worker_decoder
+    plans = None if max_plans is None else PlanCache(max_plans)
+    _worker_decoder = ABIDecoder([], plans=plans, compact=compact)
+    for entries, source in sources:
+        _worker_decoder.add_abi(entries, source)
+
+
+def _decode_each(decode: Callable[..., Any], batch: list[tuple]) -> list:
+    return [decode(*args) for args in batch]
+
+
+def _call_worker(method: str, batch: list[tuple], options: dict[str, Any]) -> list:
+    return _decode_each(partial(getattr(_worker_decoder, method), **options), batch)
+
+
+def _as_dict(entry: Mapping[str, Any]) -> dict:
+    return entry.to_dict() if isinstance(entry, Fragment) else dict(entry)
+
+
+def _abi_sources(decoder: ABIDecoder) -> list[tuple[list[dict], str | None]]:
+    """
+    The ABI entries of a decoder with their sources, in an order which adds the
+    colliding candidates of every selector in their original order.
+    """
+    ranked: list[tuple[int, dict, str | None]] = []
+    for kind, table in (
+        ("function", decoder.functions),
+        ("error", decoder.errors),
+        ("event", decoder.events),
+    ):
+        for selector in table:
+            for rank, candidate in enumerate(decoder.candidates(selector, kind)):
+                ranked.append((rank, candidate.fragment.to_dict(), candidate.source))
+    if decoder.constructor is not None:
+        ranked.append((0, _as_dict(decoder.constructor), None))
+    # Grouped by source within a rank, the order across selectors not mattering
+    ranked.sort(key=lambda item: (item[0], item[2] is not None, item[2] or ""))
+
+    # One update per run of entries from the same source
+    sources: list[tuple[list[dict], str | None]] = []
+    for _, entry, source in ranked:
+        if sources and sources[-1][1] == source:
+            sources[-1][0].append(entry)
+        else:
+            sources.append(([entry], source))
+    return sources
+
+
+class DecoderProcessPool(ProcessPoolExecutor):
+    """
+    A process pool whose workers decode with copies of an `ABIDecoder`, taken at
+    its `version`. Results are sent back pickled, so `records` output is not
+    available from process pools.
+    """
+
+    version: object
+
+    def __init__(self, decoder: ABIDecoder, max_workers: int | None = None):
+        # Retried if the decoder is updated while its entries are read
+        while True:
+            version = decoder.version
+            sources = _abi_sources(decoder)
+            if decoder.version is version:
+                break
+        self.version = version
+        max_plans = None if decoder.plans is None else decoder.plans.max_entries
+        super().__init__(
+            max_workers,
+            initializer=_init_worker,
+            initargs=(sources, decoder.compact, max_plans),
+        )
+
+
+def process_pool(
+    decoder: ABIDecoder, max_workers: int | None = None
+) -> DecoderProcessPool:
+    """
+    A process pool for an `AsyncDecoder` wrapping `decoder`, each worker decoding
+    with its own copy of it.
+    """
+    return DecoderProcessPool(decoder, max_workers)
+
+
+def _size(args: tuple) -> int:
+    size = 0
+    for arg in args:
+        if isinstance(arg, str):
+            size += len(arg) // 2
+        elif isinstance(arg, (bytes, bytearray, memoryview)):
+            size += len(arg)
+        elif isinstance(arg, list):
+            size += _size(tuple(arg))
+    return size
+
+
+def _args(item: Any) -> tuple:
+    # Events and returns take several arguments, calldata and reverts just one
+    return item if isinstance(item, tuple) else (item,)
+
+
+class AsyncDecoder:
+    """
+    Awaitable decoding with an `ABIDecoder`.
+
+    Payloads of at least `threshold` bytes are decoded in `executor`, the event
+    loop's default thread pool if None, or a pool from `process_pool` built from
+    `decoder`. At most `max_in_flight` jobs per event loop are offloaded at once.
+
+    A process pool must be replaced after the decoder is updated, eg. by
+    `add_abi`: until it is, offloading raises a `ValueError` instead of decoding
+    with the stale copies of its workers.
+    """
+
+    decoder: ABIDecoder
+    executor: Executor | None
+    threshold: int
+    max_in_flight: int
+
+    def __init__(
+        self,
+        decoder: ABIDecoder,
+        executor: Executor | None = None,
+        threshold: int = DEFAULT_OFFLOAD_BYTES,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    ):
+        if isinstance(executor, ProcessPoolExecutor) and not isinstance(
+            executor, DecoderProcessPool
+        ):
+            raise TypeError("process pools must be built by process_pool(decoder)")
+        self.decoder = decoder
+        self.executor = executor
+        self.threshold = threshold
+        self.max_in_flight = max_in_flight
+        # A semaphore per event loop, created on its first offload, as they cannot
+        # be shared between loops
+        self._in_flight: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    async def _offload(
+        self, method: str, batch: list[tuple], options: dict[str, Any]
+    ) -> list:
+        loop = asyncio.get_running_loop()
+        in_flight = self._in_flight.get(loop)
+        if in_flight is None:
+            in_flight = self._in_flight.setdefault(
+                loop, asyncio.Semaphore(self.max_in_flight)
+            )
+
+        if isinstance(self.executor, DecoderProcessPool):
+            if self.executor.version is not self.decoder.version:
+                raise ValueError(
+                    "the decoder was updated after its process pool was built"
+                )
+            job = partial(_call_worker, method, batch, options)
+        else:
+            decode = partial(getattr(self.decoder, method), **options)
+            job = partial(_decode_each, decode, batch)
+
+        async with in_flight:
+            return await loop.run_in_executor(self.executor, job)
+
+    async def _decode(self, method: str, args: tuple, options: dict[str, Any]) -> Any:
+        if _size(args) < self.threshold:
+            return getattr(self.decoder, method)(*args, **options)
+        return (await self._offload(method, [args], options))[0]
+
+    async def decode_function(self, input: bytes | str, **options: Any):
+        return await self._decode("decode_function", (input,), options)
+
+    async def decode_error(self, input: bytes | str, **options: Any):
+        return await self._decode("decode_error", (input,), options)
+
+    async def decode_return(
+        self, output: bytes | str, selector: str | bytes, **options: Any
+    ):
+        return await self._decode("decode_return", (output, selector), options)
+
+    async def decode_event(
+        self, topics: list[str] | list[bytes], memory: str | bytes, **options: Any
+    ):
+        return await self._decode("decode_event", (topics, memory), options)
+
+    async def try_decode_function(
+        self, input: bytes | str, **options: Any
+    ) -> DecodeResult:
+        return await self._decode("try_decode_function", (input,), options)
+
+    async def try_decode_error(
+        self, input: bytes | str, **options: Any
+    ) -> DecodeResult:
+        return await self._decode("try_decode_error", (input,), options)
+
+    async def try_decode_return(
+        self, output: bytes | str, selector: str | bytes, **options: Any
+    ) -> DecodeResult:
+        return await self._decode("try_decode_return", (output, selector), options)
+
+    async def try_decode_event(
+        self, topics: list[str] | list[bytes], memory: str | bytes, **options: Any
+    ) -> DecodeResult:
+        return await self._decode("try_decode_event", (topics, memory), options)
+
+    async def decode_batch(
+        self, method: str, items: Iterable[Any], **options: Any
+    ) -> list:
+        """
+        Decode every item with the decoder's `method`, eg. "try_decode_event", as a
+        single job, offloaded if the items add up to at least `threshold` bytes.
+        Items are the payload, or a tuple of the arguments for events and returns.
+        """
+        batch = [_args(item) for item in items]
+        if sum(map(_size, batch)) < self.threshold:
+            return _decode_each(
+                partial(getattr(self.decoder, method), **options), batch
+            )
+        return await self._offload(method, batch, options)
+
+    async def stream(
+        self,
+        items: Iterable[Any] | AsyncIterable[Any],
+        method: str = "try_decode_function",
+        **options: Any,
+    ) -> AsyncIterator[Any]:
+        """
+        Decode a stream of items with the decoder's `method`, yielding the results
+        in the order of the items. Up to `max_in_flight` items are decoded ahead of
+        the one being yielded, and the stream is read no further until it is.
+        """
+        pending: deque[asyncio.Task] = deque()
+        try:
+            async for item in _aiter(items):
+                task = self._decode(method, _args(item), options)
+                pending.append(asyncio.ensure_future(task))
+                if len(pending) >= self.max_in_flight:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            # Waited for, so an early exit leaves no tasks or in flight slots behind
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _aiter(items: Iterable[Any] | AsyncIterable[Any]) -> AsyncIterator[Any]:
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+
+"""
+Caches of decoding results.
+
+A large share of real traffic is byte-identical calldata (approvals to the same
+router, WETH deposits, bots repeating a call every block). The cache maps the
+exact payload, together with the table it was decoded against and the output
+options, to the decoded result, evicting the least recently used entries once
+either the entry or the payload byte bound is reached.
+
+The plan cache keeps the decode plans of lazy decoders, compiled on first use.
+The negative cache remembers the selectors and topics which matched nothing, so
+repeated lookups of unknown ones stop early and can be ranked by frequency.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from copy import deepcopy
+from threading import Lock
+from typing import Any, NamedTuple
+
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_MAX_BYTES = 16 << 20
+DEFAULT_MAX_PLANS = 1 << 14
+DEFAULT_SHARDS = 16
+# Caches are only split when every shard can hold at least this many entries
+MIN_SHARD_ENTRIES = 256
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class _Shard:
+    """
+    A least recently used segment of a `ResultCache`, with its own lock.
+    """
+
+    __slots__ = (
+        "lock",
+        "entries",
+        "max_entries",
+        "max_bytes",
+        "bytes",
+        "hits",
+        "misses",
+        "evictions",
+    )
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.lock = Lock()
+        self.entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def evict(self):
+        entries = self.entries
+        while len(entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, (_, size) = entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+
+class ResultCache:
+    """
+    A bounded LRU cache of decoded results.
+
+    Results are mutable dicts and lists, so by default every hit returns a deep
+    copy. With `copy=False` hits share the cached object, which callers must
+    then treat as read only.
+
+    The cache is safe to share between threads. Keys are spread over `shards`
+    segments, each with its own lock held only around lookups and insertions,
+    never while decoding. The bounds are split evenly between the segments, so
+    entries are evicted least recently used within their segment. By default
+    large caches get `DEFAULT_SHARDS` segments and small ones a single one.
+    """
+
+    max_entries: int
+    max_bytes: int
+    copy: bool
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        copy: bool = True,
+        shards: int | None = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.copy = copy
+
+        if shards is None:
+            shards = max(1, min(DEFAULT_SHARDS, max_entries // MIN_SHARD_ENTRIES))
+        self._shards = [
+            _Shard(max(1, max_entries // shards), max_bytes // shards)
+            for _ in range(shards)
+        ]
+
+    def _shard(self, key: Hashable) -> _Shard:
+        shards = self._shards
+        return shards[0] if len(shards) == 1 else shards[hash(key) % len(shards)]
+
+    def __len__(self) -> int:
+        return sum(len(shard.entries) for shard in self._shards)
+
+    def get_or_decode(self, key: Hashable, size: int, decode: Callable[[], Any]) -> Any:
+        """
+        Get the result for `key`, calling `decode` and caching its result on a miss.
+        `size` is the payload length counted against `max_bytes`.
+        Exceptions raised by `decode` are not cached.
+        """
+        shard = self._shard(key)
+        with shard.lock:
+            if (entry := shard.entries.get(key)) is not None:
+                shard.entries.move_to_end(key)
+                shard.hits += 1
+            else:
+                shard.misses += 1
+        if entry is not None:
+            return deepcopy(entry[0]) if self.copy else entry[0]
+
+        result = decode()
+        if size <= shard.max_bytes:
+            with shard.lock:
+                # Another thread may have decoded the same key meanwhile
+                if key not in shard.entries:
+                    shard.entries[key] = (result, size)
+                    shard.bytes += size
+                    shard.evict()
+            if self.copy:
+                result = deepcopy(result)
+        return result
+
+    def discard(self, keys: Iterable[Hashable]):
+        for key in keys:
+            shard = self._shard(key)
+            with shard.lock:
+                if (entry := shard.entries.pop(key, None)) is not None:
+                    shard.bytes -= entry[1]
+
+    def clear(self):
+        for shard in self._shards:
+            with shard.lock:
+                shard.entries.clear()
+                shard.bytes = 0
+
+    def stats(self) -> CacheStats:
+        shards = self._shards
+        return CacheStats(
+            sum(shard.hits for shard in shards),
+            sum(shard.misses for shard in shards),
+            sum(shard.evictions for shard in shards),
+            sum(len(shard.entries) for shard in shards),
+            sum(shard.bytes for shard in shards),
+        )
+
+
+class PlanCache(ResultCache):
+    """
+    A bounded LRU cache of decode plans compiled on first use, shared by lazy
+    decoders so that only the plans of the selectors in use stay resident.
+    """
+
+    def __init__(self, max_plans: int = DEFAULT_MAX_PLANS):
+        super().__init__(max_plans, DEFAULT_MAX_BYTES, copy=False)
+
+    def get_or_compile(self, key: Hashable, compile: Callable[[], Any]) -> Any:
+        return self.get_or_decode(key, 0, compile)
+
+
+class NegativeCache:
+    """
+    A bounded LRU set of selectors and topics known to match no registered ABI,
+    with a count of the lookups which missed on each.
+
+    Entries are stamped with the generation of the index the lookup missed in,
+    and only hold for that generation and later ones: a miss recorded against
+    an index replaced meanwhile does not hide a newly registered ABI. Entries
+    are also discarded once an ABI defining them is registered, and the least
+    recently missed ones are evicted beyond `max_entries`.
+    """
+
+    max_entries: int
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # The misses of a key and the latest generation they were recorded for
+        self._misses: OrderedDict[bytes, tuple[int, int]] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._misses)
+
+    def __contains__(self, key: bytes) -> bool:
+        with self._lock:
+            return key in self._misses
+
+    def known(self, key: bytes, generation: int = 0) -> bool:
+        """
+        Whether `key` is known to match nothing in the index of `generation`.
+        """
+        with self._lock:
+            entry = self._misses.get(key)
+        return entry is not None and entry[1] >= generation
+
+    def add(self, key: bytes, generation: int = 0):
+        """
+        Record a lookup of `key` which found nothing in the index of `generation`.
+        """
+        misses = self._misses
+        with self._lock:
+            count, stamp = misses.get(key, (0, generation))
+            misses[key] = (count + 1, max(stamp, generation))
+            misses.move_to_end(key)
+            if len(misses) > self.max_entries:
+                misses.popitem(last=False)
+
+    def discard(self, keys: Iterable[bytes]):
+        with self._lock:
+            for key in keys:
+                self._misses.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._misses.clear()
+
+    def misses(self, key: bytes) -> int:
+        with self._lock:
+            entry = self._misses.get(key)
+        return 0 if entry is None else entry[0]
+
+    def most_common(self, n: int | None = None) -> list[tuple[bytes, int]]:
+        """
+        The unknown selectors and topics with the most misses, ie. the ABIs most
+        worth sourcing next.
+        """
+        with self._lock:
+            misses = [(key, count) for key, (count, _) in self._misses.items()]
+        return sorted(misses, key=lambda item: -item[1])[:n]
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 
-from collections import defaultdict
-from itertools import starmap
+from collections.abc import Callable, Iterator, Mapping
+from functools import partial
+from threading import Lock
+from typing import Any, Literal, NamedTuple, TypeVar
 
 from eth_abi.abi import decode
 from eth_utils.abi import (
@@ -10,123 +12,788 @@ from eth_utils.abi import (
     function_signature_to_4byte_selector,
 )
 
-from pysad.errors import DecodingError, UnknownABI
+from pysad.address import AddressFormat
+from pysad.cache import PlanCache, ResultCache
+from pysad.errors import DecodingError, InvalidShape, UnknownABI
+from pysad.expand import CalldataExpander
+from pysad.fragment import Fragment, compact_fragment
+from pysad.plan import DecodePlan, EventPlan, SchemaField, shape_error
+from pysad.result import DecodeResult, DecodeStatus
+from pysad.revert import STANDARD_SELECTORS, decode_standard_error
+from pysad.serialize import JSONPolicy, get_policy
 from pysad.signature import parse_signature
+from pysad.tables import LazyPlans, cached_plan, intern_plan
 from pysad.types import ABITypes, SelectorABIMapping
-from pysad.utils import (
-    extract_constructor_args,
-    fix_log_types,
-    fix_reference_log_inputs,
-    get_input_info,
-    get_log_inputs,
-    hex_to_bytes,
-    named_tree,
+from pysad.utils import extract_constructor_args, hex_to_bytes
+from pysad.validate import DecodeLimits
+
+Plan = TypeVar("Plan", DecodePlan, EventPlan)
+
+
+def _function_plan(entry: Fragment) -> DecodePlan:
+    return DecodePlan(entry["inputs"], entry["name"])
+
+
+def _return_plan(entry: Fragment) -> DecodePlan:
+    return DecodePlan(entry.get("outputs", []), f"{entry['name']}Output")
+
+
+def _event_plan(entry: Fragment) -> EventPlan:
+    return EventPlan(entry["inputs"], entry["name"])
+
+
+def _constructor_plan(entry: Fragment) -> DecodePlan:
+    return DecodePlan(entry["inputs"])
+
+
+class Candidate(NamedTuple):
+    """
+    An ABI entry for a selector, as listed in the decoder's public tables, with
+    its compact fragment and the source it was added from.
+    """
+
+    entry: Mapping[str, Any]
+    fragment: Fragment
+    source: str | None
+
+
+def _choose(
+    plans: Mapping[bytes, DecodePlan],
+    choices: Mapping[bytes, tuple[DecodePlan, ...]],
+    selector: bytes,
+    data: bytes,
+) -> DecodePlan | None:
+    """
+    The plan for the data of a selector, the first of its colliding candidates
+    whose shape the data has, if any.
+    """
+    if (candidates := choices.get(selector)) is not None:
+        for plan in candidates:
+            if plan.accepts(data):
+                return plan
+    return plans.get(selector)
+
+
+def _choose_event(
+    plans: Mapping[bytes, EventPlan],
+    choices: Mapping[bytes, tuple[EventPlan, ...]],
+    topics: list[bytes],
+    memory: bytes,
+) -> EventPlan | None:
+    if (candidates := choices.get(topics[0])) is not None:
+        for plan in candidates:
+            if plan.accepts(topics[1:], memory):
+                return plan
+    return plans.get(topics[0])
+
+
+PlanKind = Literal["function", "return", "error", "event"]
+
+# The ABI type whose fragments each kind of plan is compiled from, and how
+_COMPILERS: tuple[tuple[PlanKind, ABITypes, Callable[[Fragment], Any]], ...] = (
+    ("function", "function", _function_plan),
+    ("return", "function", _return_plan),
+    ("error", "error", _function_plan),
+    ("event", "event", _event_plan),
 )
 
 
+class _Tables(NamedTuple):
+    """
+    Everything decoding reads from an ABI, replaced as a whole on every update so
+    that a decode reading it once sees a consistent ABI.
+    """
+
+    # Identifies the tables in cache keys
+    key: object
+    # Every entry added for a selector, the last of which is the primary one
+    # listed in the public tables and the default plan
+    candidates: dict[ABITypes, dict[bytes, tuple[Candidate, ...]]]
+    # Plans are compiled from, and interned by, the compact fragments
+    fragments: dict[ABITypes, dict[bytes, Fragment]]
+    entries: dict[ABITypes, SelectorABIMapping]
+    plans: dict[PlanKind, Mapping[bytes, Any]]
+    # The plans of colliding candidates, the most recently added first
+    choices: dict[PlanKind, Mapping[bytes, tuple[Any, ...]]]
+    constructor: Mapping[str, Any] | None
+    constructor_fragment: Fragment | None
+    constructor_plan: DecodePlan | None
+
+
+_EMPTY_TABLES = _Tables(
+    None,
+    {"function": {}, "error": {}, "event": {}},
+    {"function": {}, "error": {}, "event": {}},
+    {"function": {}, "error": {}, "event": {}},
+    {kind: {} for kind, _, _ in _COMPILERS},
+    {kind: {} for kind, _, _ in _COMPILERS},
+    None,
+    None,
+    None,
+)
+
+# Called with a decoder and its function and event plans before an update
+Watcher = Callable[
+    ["ABIDecoder", Mapping[bytes, DecodePlan], Mapping[bytes, EventPlan]], None
+]
+
+
 class ABIDecoder:
-    functions: SelectorABIMapping
-    errors: SelectorABIMapping
-    events: SelectorABIMapping
-    constructor: dict | None
-
-    def __init__(self, abi: list[dict]):
-        self.functions = {}
-        self.errors = {}
-        self.events = {}
-        self.constructor = None
-
-        for entry in abi:
-            type: ABITypes = entry["type"]
+    cache: ResultCache | None
+    plans: PlanCache | None
+    compact: bool
+
+    def __init__(
+        self,
+        abi: list[dict],
+        cache: ResultCache | None = None,
+        plans: PlanCache | None = None,
+        compact: bool = True,
+        source: str | None = None,
+    ):
+        """
+        With `plans`, the decoder is lazy: only the ABI entries are indexed, and the
+        plan of a selector is compiled on its first use and kept in the given
+        `PlanCache` for as long as it stays in use.
+        ABI entries are stored as compact `Fragment`s, or with `compact=False` as
+        the original JSON dicts.
+        `source` names where the entries come from, see `candidates`.
+        """
+        self.cache = cache
+        self.plans = plans
+        self.compact = compact
+        # Serializes updates, decodes only read the tables swapped in by them
+        self._lock = Lock()
+        self._tables = _EMPTY_TABLES
+        # Built on first use, for the tables it indexes
+        self._expander: tuple[_Tables, CalldataExpander] | None = None
+        # Eg. the registries the decoder is registered in, to reindex it
+        self._watchers: list[Watcher] = []
+
+        self.add_abi(abi, source)
+
+    @property
+    def functions(self) -> SelectorABIMapping:
+        return self._tables.entries["function"]
+
+    @property
+    def errors(self) -> SelectorABIMapping:
+        return self._tables.entries["error"]
+
+    @property
+    def events(self) -> SelectorABIMapping:
+        return self._tables.entries["event"]
+
+    @property
+    def constructor(self) -> Mapping[str, Any] | None:
+        return self._tables.constructor
+
+    @property
+    def version(self) -> object:
+        """
+        An object replaced on every update of the ABI, eg. to tell whether a copy
+        of the decoder is still up to date.
+        """
+        return self._tables.key
+
+    def add_abi(self, entries: list[dict], source: str | None = None):
+        """
+        Add ABI entries, eg. the functions of a proxy's new implementation or an extra
+        error definition, from the given `source`.
+        Entries whose selector collides with a different entry's, eg. across the
+        facets of a diamond, are kept as candidates, which are told apart when
+        decoding by checking the shape of the data against each. The entry added
+        last is the primary one, listed in `functions`, `errors` and `events`.
+
+        Plans of the other entries are kept as they are. The tables are rebuilt as
+        copies and swapped in at once, so concurrent decodes see either the old or
+        the new tables, never a partial update.
+        """
+        self._update(entries, source, remove=False)
+
+    def remove_abi(self, entries: list[dict]):
+        """
+        Remove ABI entries, matched by their selector or topic and content.
+        Entries which are not in the ABI are ignored.
+        """
+        self._update(entries, None, remove=True)
+
+    def watch(self, callback: Watcher):
+        """
+        Call `callback` after every update of the ABI, with the decoder and its
+        function and event plans before the update.
+        """
+        with self._lock:
+            if callback not in self._watchers:
+                self._watchers = [*self._watchers, callback]
+
+    def unwatch(self, callback: Watcher):
+        with self._lock:
+            self._watchers = [w for w in self._watchers if w != callback]
+
+    def _update(self, entries: list[dict], source: str | None, remove: bool):
+        with self._lock:
+            old = self._tables
+            self._tables = self._build_tables(old, entries, source, remove)
+            # Called in order of the updates, which keeps reindexing consistent
+            for watcher in self._watchers:
+                watcher(self, old.plans["function"], old.plans["event"])
+
+    def _build_tables(
+        self, old: _Tables, entries: list[dict], source: str | None, remove: bool
+    ) -> _Tables:
+        candidates = {type: dict(table) for type, table in old.candidates.items()}
+        changed = self._merge_candidates(candidates, entries, source, remove)
+        fragments, public_tables = self._rebuild_tables(old, candidates, changed)
+
+        plans, choices = dict(old.plans), dict(old.choices)
+        for kind, type, compile in _COMPILERS:
+            plans[kind] = self._update_plans(
+                plans[kind], fragments[type], changed[type], compile
+            )
+            choices[kind] = self._update_choices(
+                choices[kind], candidates[type], changed[type], compile
+            )
 
-            if type == "constructor":
-                self.constructor = entry
-                continue
+        constructor, fragment, plan = self._update_constructor(old, entries, remove)
+        # A new key, as cached results belong to the old tables
+        return _Tables(
+            object(),
+            candidates,
+            fragments,
+            public_tables,
+            plans,
+            choices,
+            constructor,
+            fragment,
+            plan,
+        )
 
-            if type == "function":
-                selector = function_abi_to_4byte_selector(entry)
-                self.functions[selector] = entry
-            elif type == "error":
+    def _merge_candidates(
+        self,
+        candidates: dict[ABITypes, dict[bytes, tuple[Candidate, ...]]],
+        entries: list[dict],
+        source: str | None,
+        remove: bool,
+    ) -> dict[ABITypes, set[bytes]]:
+        """
+        Add or remove the entries' candidates in place, returning the selectors
+        changed for each type.
+        """
+        changed: dict[ABITypes, set[bytes]] = {type: set() for type in candidates}
+        for entry in entries:
+            type: ABITypes = entry["type"]
+            if type == "function" or type == "error":
                 selector = function_abi_to_4byte_selector(entry)
-                self.errors[selector] = entry
             elif type == "event":
                 selector = event_abi_to_log_topic(entry)
-                self.events[selector] = entry
+            else:
+                continue
 
-    def _decode_primitive(self, input: bytes | str, lookup: dict):
+            # Fragments are interned, equal entries are the same fragment
+            fragment = compact_fragment(entry)
+            others = tuple(
+                c
+                for c in candidates[type].get(selector, ())
+                if c.fragment is not fragment
+            )
+            if not remove:
+                public = fragment if self.compact else entry
+                others += (Candidate(public, fragment, source),)
+            if others:
+                candidates[type][selector] = others
+            else:
+                candidates[type].pop(selector, None)
+            changed[type].add(selector)
+        return changed
+
+    def _rebuild_tables(
+        self,
+        old: _Tables,
+        candidates: dict[ABITypes, dict[bytes, tuple[Candidate, ...]]],
+        changed: dict[ABITypes, set[bytes]],
+    ) -> tuple[dict[ABITypes, dict[bytes, Fragment]], dict[ABITypes, dict]]:
+        """
+        Copies of the fragment and public tables, with the primary candidates of
+        the changed selectors.
+        """
+        fragments = {type: dict(table) for type, table in old.fragments.items()}
+        public_tables = {type: dict(table) for type, table in old.entries.items()}
+        for type, selectors in changed.items():
+            for selector in selectors:
+                if (primary := candidates[type].get(selector)) is None:
+                    fragments[type].pop(selector, None)
+                    public_tables[type].pop(selector, None)
+                else:
+                    fragments[type][selector] = primary[-1].fragment
+                    public_tables[type][selector] = primary[-1].entry
+        return fragments, public_tables
+
+    def _update_constructor(
+        self, old: _Tables, entries: list[dict], remove: bool
+    ) -> tuple[Mapping[str, Any] | None, Fragment | None, DecodePlan | None]:
+        constructor, public_constructor = old.constructor_fragment, old.constructor
+        for entry in entries:
+            if entry["type"] == "constructor":
+                constructor = None if remove else compact_fragment(entry)
+                public_constructor = constructor if self.compact or remove else entry
+
+        if constructor is old.constructor_fragment:
+            return old.constructor, constructor, old.constructor_plan
+        plan = None
+        if constructor is not None and self.plans is None:
+            plan = intern_plan(_constructor_plan, constructor)
+        return public_constructor, constructor, plan
+
+    def _update_plans(
+        self,
+        plans: Mapping[bytes, Plan],
+        fragments: dict[bytes, Fragment],
+        changed: set[bytes],
+        compile: Callable[[Fragment], Plan],
+    ) -> Mapping[bytes, Plan]:
+        if self.plans is not None:
+            return LazyPlans(fragments, compile, self.plans)
+
+        plans = dict(plans)
+        for selector in changed:
+            if (fragment := fragments.get(selector)) is None:
+                plans.pop(selector, None)
+            else:
+                plans[selector] = intern_plan(compile, fragment)
+        return plans
+
+    def _update_choices(
+        self,
+        choices: Mapping[bytes, tuple[Plan, ...]],
+        candidates: dict[bytes, tuple[Candidate, ...]],
+        changed: set[bytes],
+        compile: Callable[[Fragment], Plan],
+    ) -> Mapping[bytes, tuple[Plan, ...]]:
+        if not choices and all(len(candidates.get(s, ())) < 2 for s in changed):
+            return choices
+
+        # Collisions are rare, their plans are compiled up front even when lazy
+        choices = dict(choices)
+        for selector in changed:
+            if len(colliding := candidates.get(selector, ())) > 1:
+                choices[selector] = tuple(
+                    intern_plan(compile, c.fragment) for c in reversed(colliding)
+                )
+            else:
+                choices.pop(selector, None)
+        return choices
+
+    def _get_constructor_plan(self, tables: _Tables) -> DecodePlan | None:
+        if self.plans is None or tables.constructor_fragment is None:
+            return tables.constructor_plan
+        return cached_plan(self.plans, _constructor_plan, tables.constructor_fragment)
+
+    def candidates(
+        self,
+        selector: str | bytes,
+        kind: Literal["function", "error", "event"] | None = None,
+    ) -> tuple[Candidate, ...]:
+        """
+        Every entry added for a selector, with the source it was added from, the
+        primary one last. `kind` defaults to "event" for 32 byte topics and
+        "function" otherwise.
+        """
+        selector = hex_to_bytes(selector)
+        if kind is None:
+            kind = "event" if len(selector) == 32 else "function"
+        return self._tables.candidates[kind].get(selector, ())
+
+    @property
+    def function_plans(self) -> Mapping[bytes, DecodePlan]:
+        return self._tables.plans["function"]
+
+    @property
+    def event_plans(self) -> Mapping[bytes, EventPlan]:
+        return self._tables.plans["event"]
+
+    def _get_expander(
+        self, tables: _Tables, expand: bool | CalldataExpander
+    ) -> CalldataExpander | None:
+        if expand is True:
+            if (expander := self._expander) is None or expander[0] is not tables:
+                expander = (tables, CalldataExpander(tables.plans["function"]))
+                self._expander = expander
+            return expander[1]
+        return expand or None
+
+    def _decode_primitive(
+        self,
+        input: bytes | str,
+        tables: _Tables,
+        kind: PlanKind,
+        expander: CalldataExpander | None = None,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ):
         input = hex_to_bytes(input)
         selector, calldata = input[:4], input[4:]
-        func_abi = lookup[selector]
-        if func_abi is None:
+        plan = _choose(tables.plans[kind], tables.choices[kind], selector, calldata)
+        if plan is None:
             raise UnknownABI()
 
-        types, _ = get_input_info(func_abi["inputs"])
-        try:
-            args = decode(types, calldata)
-        except Exception as e:
-            raise DecodingError from e
+        if expander is not None:
+            if records or json or raw:
+                raise ValueError("Nested calls can only be expanded into dicts")
+            args = plan.decode(calldata, address=address_format, limits=limits)
+            return expander.expand(plan, args)
 
-        return named_tree(func_abi["inputs"], args)
+        policy = get_policy(json)
+        decode = partial(
+            plan.decode, calldata, records, address_format, policy, raw, limits
+        )
+        if self.cache is None:
+            return decode()
+        key = (tables.key, kind, records, address_format, policy, raw, limits)
+        return self.cache.get_or_decode((key, input), len(input), decode)
+
+    def decode_function(
+        self,
+        input: bytes | str,
+        expand: bool | CalldataExpander = False,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ):
+        """
+        Decode calldata for one of the ABI's functions.
+        With `expand`, calls nested in `bytes` arguments are decoded as well, either
+        against this ABI's functions or the index of the given `CalldataExpander`.
+        With `records`, results are compact `Record` tuples instead of dicts.
+        `address_format` selects the address format ("hex", "checksum" or "bytes").
+        With `json` (True or a `JSONPolicy`), results are JSON-ready trees.
+        With `raw`, the eth_abi tuple is returned as is, laid out as in `schema`.
+        With `limits`, the calldata is shape checked against the `DecodeLimits`
+        before decoding and rejected early with an `InvalidShape` error.
+        """
+        tables = self._tables
+        return self._decode_primitive(
+            input,
+            tables,
+            "function",
+            self._get_expander(tables, expand),
+            records,
+            address_format,
+            json,
+            raw,
+            limits,
+        )
 
-    def decode_function(self, input: bytes | str):
-        return self._decode_primitive(input, self.functions)
+    def iter_array(
+        self,
+        input: bytes | str,
+        name: str,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+    ) -> Iterator[Any]:
+        """
+        Lazily decode the elements of the array argument `name` of a function call,
+        one at a time, without decoding the rest of the calldata.
+        """
+        input = hex_to_bytes(input)
+        tables = self._tables
+        plan = _choose(
+            tables.plans["function"], tables.choices["function"], input[:4], input[4:]
+        )
+        if plan is None:
+            raise UnknownABI()
+        return plan.iter_array(
+            memoryview(input)[4:],
+            name,
+            records,
+            address_format,
+            get_policy(json),
+            raw,
+        )
 
-    def decode_error(self, input: bytes | str):
-        return self._decode_primitive(input, self.errors)
+    def decode_error(
+        self,
+        input: bytes | str,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ):
+        """
+        Decode revert data against the ABI's errors. The standard `Error(string)`
+        and `Panic(uint256)` reverts are decoded whether or not the ABI has them,
+        with the same output options and caching.
+        """
+        input = hex_to_bytes(input)
+        if input[:4] in STANDARD_SELECTORS:
+            policy = get_policy(json)
+            decode = partial(
+                decode_standard_error,
+                input,
+                records,
+                raw,
+                address_format,
+                policy,
+                limits,
+            )
+            if self.cache is None:
+                return decode()
+            # Standard reverts decode the same for every ABI
+            key = (STANDARD_SELECTORS, records, address_format, policy, raw, limits)
+            return self.cache.get_or_decode((key, input), len(input), decode)
+        return self._decode_primitive(
+            input,
+            self._tables,
+            "error",
+            records=records,
+            address_format=address_format,
+            json=json,
+            raw=raw,
+            limits=limits,
+        )
 
-    def decode_return(self, output: bytes | str, selector: str | bytes):
+    def decode_return(
+        self,
+        output: bytes | str,
+        selector: str | bytes,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ):
         output = hex_to_bytes(output)
         selector = hex_to_bytes(selector)
-        func_abi = self.functions.get(selector)
-        if func_abi is None:
-            raise UnknownABI()
-        return self._decode_primitive(
-            (b"\x00" * 4) + output,
-            defaultdict(
-                lambda: {
-                    "name": "return",
-                    "inputs": func_abi["outputs"],  # type: ignore
-                    "type": "function",
-                }
-            ),
+        tables = self._tables
+        plan = _choose(
+            tables.plans["return"], tables.choices["return"], selector, output
         )
+        if plan is None:
+            raise UnknownABI()
 
-    def decode_event(self, topics: list[str] | list[bytes], memory: str | bytes):
+        policy = get_policy(json)
+        decode = partial(
+            plan.decode, output, records, address_format, policy, raw, limits
+        )
+        if self.cache is None:
+            return decode()
+        key = (tables.key, selector, records, address_format, policy, raw, limits)
+        return self.cache.get_or_decode((key, output), len(output), decode)
+
+    def decode_event(
+        self,
+        topics: list[str] | list[bytes],
+        memory: str | bytes,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ):
         if len(topics) == 0:
             return {}
 
         topics = list(map(hex_to_bytes, topics))
         memory = hex_to_bytes(memory)
 
-        selector = topics[0]
-        topics = topics[1:]
-        event_abi = self.events.get(selector)  # type: ignore
-        if event_abi is None:
+        tables = self._tables
+        plan = _choose_event(
+            tables.plans["event"], tables.choices["event"], topics, memory  # type: ignore
+        )
+        if plan is None:
             raise UnknownABI
 
-        types, _ = get_input_info(event_abi["inputs"])
-        rtypes_bmap, index_bmap = get_log_inputs(event_abi["inputs"])
-        types = fix_log_types(types, rtypes_bmap, index_bmap)
+        policy = get_policy(json)
+        decode = partial(
+            plan.decode,
+            topics[1:],
+            memory,
+            records,
+            address_format,
+            policy,
+            raw,
+            limits,
+        )
+        if self.cache is None:
+            return decode()
+        key = (tables.key, records, address_format, policy, raw, limits)
+        return self.cache.get_or_decode(
+            (key, tuple(topics), memory), 32 * len(topics) + len(memory), decode
+        )
+
+    def _try_decode_primitive(
+        self,
+        input: bytes,
+        kind: PlanKind,
+        records: bool,
+        address_format: AddressFormat | None,
+        json: bool | JSONPolicy,
+        raw: bool,
+        limits: DecodeLimits | None,
+    ) -> DecodeResult:
+        selector = input[:4]
+        tables = self._tables
+        plan = _choose(tables.plans[kind], tables.choices[kind], selector, input[4:])
+        if plan is None:
+            return DecodeResult(DecodeStatus.UNKNOWN_SELECTOR, selector)
+        return plan.try_decode(
+            input[4:], selector, records, address_format, get_policy(json), raw, limits
+        )
 
-        topic_types = [[t] for (t, b) in zip(types, index_bmap) if b]
-        memory_types = [t for (t, b) in zip(types, index_bmap) if not b]
+    def try_decode_function(
+        self,
+        input: bytes | str,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ) -> DecodeResult:
+        """
+        Decode calldata like `decode_function`, reporting unknown selectors and
+        invalid data in the returned `DecodeResult` instead of raising.
+        """
+        return self._try_decode_primitive(
+            hex_to_bytes(input),
+            "function",
+            records,
+            address_format,
+            json,
+            raw,
+            limits,
+        )
 
-        # use lambda to extract tuple from decode
-        decoded_topics = map(lambda x: x[0], starmap(decode, zip(topic_types, topics)))
-        decoded_memory = iter(decode(memory_types, memory))
+    def try_decode_error(
+        self,
+        input: bytes | str,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ) -> DecodeResult:
+        input = hex_to_bytes(input)
+        try:
+            standard = decode_standard_error(
+                input, records, raw, address_format, get_policy(json), limits
+            )
+        except InvalidShape as e:
+            return shape_error(e, input[:4])
+        except DecodingError:
+            return DecodeResult(DecodeStatus.INVALID_DATA, input[:4])
+        if standard is not None:
+            return DecodeResult(DecodeStatus.OK, input[:4], standard)
+
+        return self._try_decode_primitive(
+            input,
+            "error",
+            records,
+            address_format,
+            json,
+            raw,
+            limits,
+        )
 
-        args = [
-            next(decoded_topics) if indexed else next(decoded_memory)
-            for indexed in index_bmap
-        ]
+    def try_decode_return(
+        self,
+        output: bytes | str,
+        selector: str | bytes,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ) -> DecodeResult:
+        selector, output = hex_to_bytes(selector), hex_to_bytes(output)
+        if (
+            plan := _choose(
+                self._tables.plans["return"],
+                self._tables.choices["return"],
+                selector,
+                output,
+            )
+        ) is None:
+            return DecodeResult(DecodeStatus.UNKNOWN_SELECTOR, selector)
+        return plan.try_decode(
+            output,
+            selector,
+            records,
+            address_format,
+            get_policy(json),
+            raw,
+            limits,
+        )
 
-        processed_abi = {k: v for k, v in event_abi.items() if k != "inputs"}
-        processed_abi["inputs"] = fix_reference_log_inputs(event_abi["inputs"])
+    def try_decode_event(
+        self,
+        topics: list[str] | list[bytes],
+        memory: str | bytes,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ) -> DecodeResult:
+        if len(topics) == 0:
+            return DecodeResult(DecodeStatus.UNKNOWN_SELECTOR, b"")
+
+        topics = list(map(hex_to_bytes, topics))
+        memory = hex_to_bytes(memory)
+        selector: bytes = topics[0]  # type: ignore
+        tables = self._tables
+        plan = _choose_event(
+            tables.plans["event"], tables.choices["event"], topics, memory  # type: ignore
+        )
+        if plan is None:
+            return DecodeResult(DecodeStatus.UNKNOWN_SELECTOR, selector)
+
+        return plan.try_decode(
+            topics[1:],  # type: ignore
+            memory,
+            selector,
+            records,
+            address_format,
+            get_policy(json),
+            raw,
+            limits,
+        )
 
-        return named_tree(processed_abi["inputs"], args)
+    def schema(
+        self,
+        selector: str | bytes,
+        kind: Literal["function", "return", "error", "event"] | None = None,
+    ) -> tuple[SchemaField, ...]:
+        """
+        Describe the names and nesting of the tuples returned with `raw=True`.
+        `kind` defaults to "event" for 32 byte topics and "function" otherwise.
+        """
+        selector = hex_to_bytes(selector)
+        if kind is None:
+            kind = "event" if len(selector) == 32 else "function"
 
-    def decode_constructor(self, input: bytes | str, bytecode: bytes | str):
-        if not self.constructor:
+        if (plan := self._tables.plans[kind].get(selector)) is None:
+            raise UnknownABI()
+        return plan.schema
+
+    def decode_constructor(
+        self,
+        input: bytes | str,
+        bytecode: bytes | str,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ):
+        if (plan := self._get_constructor_plan(self._tables)) is None:
             raise UnknownABI()
 
         input = hex_to_bytes(input)
@@ -135,8 +802,8 @@ class ABIDecoder:
         args = extract_constructor_args(input, bytecode)
 
         if args:
-            return self._decode_primitive(
-                (b"\x00" * 4) + args, defaultdict(lambda: self.constructor)
+            return plan.decode(
+                args, records, address_format, get_policy(json), raw, limits
             )
         else:
             return None
@@ -26,7 +26,28 @@ class InvalidSignature(PySADError):
 
 
 class UnknownPrecompile(PySADError):
-    def __init__(self, address: bytes | str):
-        if isinstance(address, (bytes, bytearray, memoryview)):
+    def __init__(self, address: bytes | str | int):
+        if isinstance(address, int):
+            address = f"0x{address:040x}"
+        elif isinstance(address, (bytes, bytearray, memoryview)):
             address = "0x" + address.hex()
         super().__init__(address)
+
+
+class InvalidShape(DecodingError):
+    """
+    Raised by shape checks before decoding, `position` is the offset of the
+    offending word in the input.
+    """
+
+    def __init__(self, message: str, position: int):
+        super().__init__(message)
+        self.position = position
+
+    def __reduce__(self):
+        # Sent back pickled from process pool workers
+        return type(self), (*self.args, self.position)
+
+
+class LimitExceeded(InvalidShape):
+    pass
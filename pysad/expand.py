@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+Expansion of calldata nested inside `bytes` parameters.
+
+Wrappers such as `multicall(bytes[])`, `aggregate((address,bytes)[])` or Safe's
+`execTransaction` carry whole calls in `bytes` fields. When expanding, each such
+field is probed against a selector index and, on a hit, decoded in place.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any, NamedTuple
+
+from pysad.errors import DecodingError
+from pysad.plan import DecodePlan
+
+DEFAULT_MAX_DEPTH = 4
+DEFAULT_MAX_BYTES = 1 << 20
+
+
+class NestedCall(NamedTuple):
+    selector: bytes
+    name: str
+    args: dict[str, Any]
+
+
+class CalldataExpander:
+    """
+    Expands nested calls found in decoded arguments.
+
+    `max_depth` limits how many wrappers deep calls are expanded and `max_bytes`
+    caps the total size of the payloads decoded for a single top level call.
+    Identical payloads within one call are decoded once and share their result.
+    """
+
+    plans: Mapping[bytes, DecodePlan]
+    max_depth: int
+    max_bytes: int
+
+    def __init__(
+        self,
+        plans: Mapping[bytes, DecodePlan],
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.plans = plans
+        self.max_depth = max_depth
+        self.max_bytes = max_bytes
+
+    def expand(self, plan: DecodePlan, args: dict[str, Any]) -> dict[str, Any]:
+        if (expander := plan.expander) is None:
+            return args
+        return expander(args, _Expansion(self))
+
+
+class _Expansion:
+    """
+    Mutable state of a single top level expansion.
+    """
+
+    __slots__ = ("plans", "max_depth", "depth", "budget", "memo")
+
+    def __init__(self, expander: CalldataExpander):
+        self.plans = expander.plans
+        self.max_depth = expander.max_depth
+        self.depth = 0
+        self.budget = expander.max_bytes
+        self.memo: dict[bytes, NestedCall] = {}
+
+    def __call__(self, data: bytes) -> bytes | NestedCall:
+        if self.depth >= self.max_depth or len(data) < 4:
+            return data
+
+        # Cheap probe first, the vast majority of bytes values are not calls
+        if (plan := self.plans.get(data[:4])) is None:
+            return data
+
+        if (call := self.memo.get(data)) is not None:
+            return call
+
+        if len(data) > self.budget:
+            return data
+        self.budget -= len(data)
+
+        try:
+            args = plan.decode(data[4:])
+        except DecodingError:
+            return data
+
+        if (expander := plan.expander) is not None:
+            self.depth += 1
+            try:
+                args = expander(args, self)
+            finally:
+                self.depth -= 1
+
+        call = self.memo[data] = NestedCall(data[:4], plan.name, args)
+        return call
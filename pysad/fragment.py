@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+
+"""
+Compact ABI fragments.
+
+Full ABI entries are dicts of dicts, including fields no decoder reads such as
+`stateMutability` or the `internalType` of every scalar. Compact fragments keep
+only what plans need, in slotted objects with interned strings. Identical
+parameters and fragments are interned too, so structs repeated across an ABI and
+entries repeated across contracts are stored once. They are interned weakly, so
+fragments no decoder holds any more are freed.
+
+Fragments are read only mappings with the same keys as the ABI JSON they keep,
+so plans compile from either form.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Mapping
+from operator import attrgetter
+from sys import intern
+from threading import Lock
+from typing import Any, ClassVar
+from weakref import WeakValueDictionary
+
+# Keyed by the values of the interned objects, which are held weakly
+_PARAMS: WeakValueDictionary[tuple, Param] = WeakValueDictionary()
+_FRAGMENTS: WeakValueDictionary[tuple, Fragment] = WeakValueDictionary()
+_INTERN_LOCK = Lock()
+
+
+class _Compact(Mapping[str, Any]):
+    """
+    Base of the compact ABI objects, exposing their set fields as ABI JSON keys.
+    """
+
+    # The hash is taken on every interning lookup, of every nested parameter too
+    __slots__ = ("_hash", "__weakref__")
+
+    # ABI JSON keys, in the order of the slots they are stored in
+    _keys: ClassVar[tuple[str, ...]] = ()
+    _slots: ClassVar[dict[str, str]] = {}
+    _get_values: ClassVar[Callable[[Any], tuple]]
+
+    def __init_subclass__(cls):
+        cls._get_values = attrgetter(*cls.__slots__)
+
+    def _intern(self, table: WeakValueDictionary[tuple, Any]) -> Any:
+        with _INTERN_LOCK:
+            return table.setdefault(self._values(), self)
+
+    def _values(self) -> tuple:
+        return self._get_values(self)
+
+    def __getitem__(self, key: str) -> Any:
+        if (slot := self._slots.get(key)) is None:
+            raise KeyError(key)
+        if (value := getattr(self, slot)) is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        slot = self._slots.get(key)  # type: ignore
+        return slot is not None and getattr(self, slot) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (
+            key for key, value in zip(self._keys, self._values()) if value is not None
+        )
+
+    def __len__(self) -> int:
+        return sum(value is not None for value in self._values())
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is type(self):
+            return self._values() == other._values()  # type: ignore
+        return super().__eq__(other)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert back to ABI JSON, without the fields dropped when compacting.
+        """
+        return {key: _to_json(value) for key, value in self.items()}
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, _Compact):
+        return value.to_dict()
+    elif isinstance(value, tuple):
+        return [_to_json(item) for item in value]
+    return value
+
+
+class Param(_Compact):
+    """
+    A function, error or event parameter.
+    `internalType` is only kept for tuples, where it names the struct.
+    """
+
+    __slots__ = ("name", "type", "components", "internal_type", "indexed")
+
+    _keys = ("name", "type", "components", "internalType", "indexed")
+    _slots = dict(zip(_keys, __slots__))
+
+    name: str
+    type: str
+    components: tuple[Param, ...] | None
+    internal_type: str | None
+    indexed: bool | None
+
+    def __init__(
+        self,
+        name: str,
+        type: str,
+        components: tuple[Param, ...] | None = None,
+        internal_type: str | None = None,
+        indexed: bool | None = None,
+    ):
+        self.name = name
+        self.type = type
+        self.components = components
+        self.internal_type = internal_type
+        self.indexed = indexed
+        self._hash = hash(self._values())
+
+
+class Fragment(_Compact):
+    """
+    A function, error, event or constructor ABI entry.
+    """
+
+    __slots__ = ("type", "name", "inputs", "outputs")
+
+    _keys = ("type", "name", "inputs", "outputs")
+    _slots = dict(zip(_keys, __slots__))
+
+    type: str
+    name: str | None
+    inputs: tuple[Param, ...]
+    outputs: tuple[Param, ...] | None
+
+    def __init__(
+        self,
+        type: str,
+        name: str | None,
+        inputs: tuple[Param, ...],
+        outputs: tuple[Param, ...] | None = None,
+    ):
+        self.type = type
+        self.name = name
+        self.inputs = inputs
+        self.outputs = outputs
+        self._hash = hash(self._values())
+
+
+def compact_param(param: Mapping[str, Any]) -> Param:
+    components = param.get("components")
+    internal_type = param.get("internalType") if components is not None else None
+    compact = Param(
+        intern(param.get("name") or ""),
+        intern(param["type"]),
+        compact_params(components) if components is not None else None,
+        intern(internal_type) if internal_type else None,
+        param.get("indexed"),
+    )
+    return compact._intern(_PARAMS)
+
+
+def compact_params(params: list[Mapping[str, Any]]) -> tuple[Param, ...]:
+    return tuple(compact_param(param) for param in params)
+
+
+def compact_fragment(entry: Mapping[str, Any]) -> Fragment:
+    """
+    Compact an ABI entry, sharing the result with any identical entry compacted
+    before, eg. the `Transfer` event of every ERC-20 token.
+    """
+    outputs = entry.get("outputs") if entry["type"] == "function" else None
+    name = entry.get("name")
+    compact = Fragment(
+        intern(entry["type"]),
+        intern(name) if name is not None else None,
+        compact_params(entry.get("inputs", [])),
+        compact_params(outputs) if outputs is not None else None,
+    )
+    return compact._intern(_FRAGMENTS)
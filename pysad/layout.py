@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+
+"""
+Declarative binary layouts.
+
+Precompiled functions do not use the ABI encoding, instead each one packs its
+arguments in its own way. A layout describes such an encoding as a sequence of
+fields, each of which is one of
+
+- `fixed`: a field of a fixed byte width
+- `padding`: fixed width bytes which are skipped
+- `prefixed`: a length prefix followed by that many bytes
+- `ref`: a field whose length (or end offset) is given by an earlier field
+- `rest`: the remainder of the input
+- `repeated`: the remainder of the input split into fixed width records
+
+Layouts are compiled once into a list of slice steps which are run by a single
+executor, returning zero-copy memoryview slices of the input.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, Literal, NamedTuple
+
+from pysad.errors import DecodingError
+
+FieldType = Literal["uint", "bool", "bytes", "string", "address"]
+FieldKind = Literal["fixed", "padding", "prefixed", "ref", "rest", "repeated"]
+
+
+class Field(NamedTuple):
+    name: str
+    kind: FieldKind
+    type: FieldType = "bytes"
+    size: int = 0
+    ref: str | None = None
+    base: int | None = None
+    record: Layout | None = None
+
+
+def fixed(name: str, size: int, type: FieldType = "bytes") -> Field:
+    return Field(name, "fixed", type, size=size)
+
+
+def padding(size: int) -> Field:
+    return Field("", "padding", size=size)
+
+
+def prefixed(name: str, prefix: int = 32, type: FieldType = "bytes") -> Field:
+    return Field(name, "prefixed", type, size=prefix)
+
+
+def ref(
+    name: str, length: str, type: FieldType = "bytes", base: int | None = None
+) -> Field:
+    """
+    A field sized by the integer field `length`.
+    With `base`, the field instead ends at the absolute offset `base + length`.
+    """
+    return Field(name, "ref", type, ref=length, base=base)
+
+
+def rest(name: str, type: FieldType = "bytes") -> Field:
+    return Field(name, "rest", type)
+
+
+def repeated(name: str, record: Layout) -> Field:
+    return Field(name, "repeated", record=record)
+
+
+def _to_bytes(view: memoryview) -> bytes:
+    return view.tobytes()
+
+
+def _to_uint(view: memoryview) -> int:
+    return int.from_bytes(view, "big")
+
+
+def _to_bool(view: memoryview) -> bool:
+    return any(view)
+
+
+def _to_address(view: memoryview) -> str:
+    return "0x" + view.hex()
+
+
+def _to_string(view: memoryview) -> str:
+    try:
+        return str(view, "utf-8")
+    except UnicodeDecodeError as e:
+        raise DecodingError from e
+
+
+CONVERTERS: dict[FieldType, Callable[[memoryview], Any]] = {
+    "uint": _to_uint,
+    "bool": _to_bool,
+    "bytes": _to_bytes,
+    "string": _to_string,
+    "address": _to_address,
+}
+
+
+def _repeated_slices(f: Field, view: memoryview, cursor: int) -> list[list[Any]]:
+    # The records of a `repeated` field fill the rest of the input
+    record = f.record
+    assert record is not None and record.size
+    if (len(view) - cursor) % record.size:
+        raise DecodingError(
+            f"Input for {f.name} is not a multiple of {record.size} bytes"
+        )
+    return [
+        record.slices(view[start : start + record.size])
+        for start in range(cursor, len(view), record.size)
+    ]
+
+
+class Layout:
+    """
+    A compiled layout.
+
+    `size` is the width of the layout when every field is fixed, in which case the
+    fields are sliced at precomputed offsets. With `exact`, inputs must match the
+    minimum size exactly rather than only be at least that long.
+    """
+
+    __slots__ = (
+        "fields",
+        "exact",
+        "size",
+        "min_size",
+        "_slices",
+        "_values",
+        "_converters",
+    )
+
+    fields: tuple[Field, ...]
+    exact: bool
+    size: int | None
+    min_size: int
+
+    def __init__(self, fields: Sequence[Field], exact: bool = False):
+        self.fields = tuple(fields)
+        self.exact = exact
+
+        self.min_size = sum(
+            f.size for f in self.fields if f.kind in ("fixed", "padding", "prefixed")
+        )
+        if all(f.kind in ("fixed", "padding") for f in self.fields):
+            self.size = self.min_size
+            self._slices: tuple[slice, ...] | None = ()
+            offset = 0
+            for f in self.fields:
+                if f.kind == "fixed":
+                    self._slices += (slice(offset, offset + f.size),)
+                offset += f.size
+        else:
+            self.size = None
+            self._slices = None
+
+        # Padding produces no value
+        self._values = tuple(f for f in self.fields if f.kind != "padding")
+        self._converters = tuple(CONVERTERS[f.type] for f in self._values)
+
+    def _check_size(self, length: int):
+        if length < self.min_size or (self.exact and length != self.min_size):
+            raise DecodingError(
+                f"Input has length {length}, expected "
+                f"{'' if self.exact else 'at least '}{self.min_size}"
+            )
+
+    def slices(self, data: bytes | memoryview) -> list[Any]:
+        """
+        Split the input into its fields.
+        Every value is a memoryview slice, except `repeated` fields which are
+        lists of their records' slices.
+        """
+        view = memoryview(data)
+        self._check_size(len(view))
+
+        if self._slices is not None:
+            return [view[s] for s in self._slices]
+
+        values: list[Any] = []
+        lengths: dict[str, int] = {}
+        cursor = 0
+        for f in self.fields:
+            kind = f.kind
+            if kind == "fixed":
+                end = cursor + f.size
+            elif kind == "padding":
+                cursor += f.size
+                continue
+            elif kind == "prefixed":
+                length = _to_uint(view[cursor : cursor + f.size])
+                cursor += f.size
+                end = cursor + length
+            elif kind == "ref":
+                length = lengths[f.ref]  # type: ignore
+                end = cursor + length if f.base is None else f.base + length
+            elif kind == "rest":
+                end = len(view)
+            else:
+                values.append(_repeated_slices(f, view, cursor))
+                cursor = len(view)
+                continue
+
+            if end > len(view):
+                raise DecodingError(
+                    f"Field {f.name} ends at {end} beyond the input length {len(view)}"
+                )
+
+            value = view[cursor:end]
+            if f.type == "uint":
+                lengths[f.name] = _to_uint(value)
+            values.append(value)
+            cursor = end
+
+        return values
+
+    def convert(self, values: list[Any], zero_copy: bool = False) -> dict[str, Any]:
+        result = {}
+        for f, convert, value in zip(self._values, self._converters, values):
+            if f.kind == "repeated":
+                value = [f.record.convert(v, zero_copy) for v in value]  # type: ignore
+            elif not (zero_copy and f.type == "bytes"):
+                value = convert(value)
+            result[f.name] = value
+        return result
+
+    def decode(
+        self, data: bytes | memoryview, zero_copy: bool = False
+    ) -> dict[str, Any]:
+        """
+        Decode the input into a dict of field values.
+        With `zero_copy`, bytes fields are left as memoryview slices of the input.
+        """
+        return self.convert(self.slices(data), zero_copy)
+
+    def decode_columns(
+        self, inputs: Iterable[bytes | memoryview], zero_copy: bool = False
+    ) -> dict[str, list[Any]]:
+        """
+        Decode many inputs into a dict of columns, one list of values per field.
+
+        Fixed layouts check each distinct input length once and then slice every
+        input at the precomputed offsets, one column at a time.
+        """
+        views = list(map(memoryview, inputs))
+
+        if self._slices is None:
+            rows = [self.decode(view, zero_copy) for view in views]
+            return {f.name: [row[f.name] for row in rows] for f in self._values}
+
+        for length in {len(view) for view in views}:
+            self._check_size(length)
+
+        columns = {}
+        for f, convert, s in zip(self._values, self._converters, self._slices):
+            if zero_copy and f.type == "bytes":
+                columns[f.name] = [view[s] for view in views]
+            else:
+                columns[f.name] = [convert(view[s]) for view in views]
+        return columns
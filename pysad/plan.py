@@ -0,0 +1,774 @@
+#!/usr/bin/env python3
+
+"""
+Compiled decoding plans.
+
+A plan is built once per ABI fragment and holds everything needed to turn
+calldata into a named tree: the eth_abi tuple decoder and a shaper which maps
+the decoded tuple onto the ABI names without re-parsing any type strings.
+Plans can also shape results into compact records (see `pysad.records`) or
+JSON-ready trees (see `pysad.serialize`).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Sequence
+from typing import Any, NamedTuple, cast
+
+from eth_abi.decoding import ContextFramesBytesIO, TupleDecoder
+from eth_abi.grammar import ABIType, TupleType, parse
+from eth_abi.registry import registry
+from eth_utils.abi import collapse_if_tuple
+
+from pysad.address import AddressFormat, get_address_converter
+from pysad.errors import DecodingError, InvalidShape, LimitExceeded
+from pysad.records import DEFAULT_RECORD_NAME, record_type, struct_name
+from pysad.result import DecodeResult, DecodeStatus
+from pysad.serialize import JSONPolicy, get_json_converters
+from pysad.utils import (
+    fix_log_types,
+    fix_reference_log_inputs,
+    get_input_info,
+    get_log_inputs,
+)
+from pysad.validate import DecodeLimits, ShapeCheck, head_size
+
+Shaper = Callable[[Any], Any]
+Expander = Callable[[Any, Shaper], Any]
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def compile_shaper(abi: dict, address: Shaper | None = None) -> Shaper:
+    """
+    Compile the conversion of a single decoded value into its named subtree.
+    Mirrors `named_tree`: tuples become dicts, arrays become lists.
+    Addresses are passed through `address` if given.
+    """
+    abi_type = cast(ABIType, parse(collapse_if_tuple(dict(abi))))
+
+    if abi_type.is_array:
+        item_type = abi_type.item_type.to_type_str()
+        item_shaper = compile_shaper({**abi, "type": item_type, "name": ""}, address)
+        if item_shaper is _identity:
+            return list
+        return lambda data: [item_shaper(item) for item in data]
+
+    elif isinstance(abi_type, TupleType):
+        return compile_tree(abi["components"], address)
+
+    elif address is not None and abi_type.base == "address":
+        return address
+
+    return _identity
+
+
+def compile_tree(abi: Sequence[dict], address: Shaper | None = None) -> Shaper:
+    """
+    Compile the conversion of a decoded tuple into a dict keyed by ABI names.
+    """
+    names = tuple(item["name"] for item in abi)
+    shapers = tuple(compile_shaper(item, address) for item in abi)
+
+    if all(shaper is _identity for shaper in shapers):
+        return lambda data: dict(zip(names, data))
+
+    fields = tuple(zip(names, shapers))
+    return lambda data: {
+        name: shaper(value) for (name, shaper), value in zip(fields, data)
+    }
+
+
+def compile_record_shaper(abi: dict, address: Shaper | None = None) -> Shaper:
+    """
+    Compile the conversion of a single decoded value into its record subtree.
+    Mirrors `compile_shaper`, with tuples becoming records instead of dicts.
+    """
+    abi_type = cast(ABIType, parse(collapse_if_tuple(dict(abi))))
+
+    if abi_type.is_array:
+        item_type = abi_type.item_type.to_type_str()
+        item_shaper = compile_record_shaper(
+            {**abi, "type": item_type, "name": ""}, address
+        )
+        if item_shaper is _identity:
+            return list
+        return lambda data: [item_shaper(item) for item in data]
+
+    elif isinstance(abi_type, TupleType):
+        return compile_record(abi["components"], struct_name(abi), address)
+
+    elif address is not None and abi_type.base == "address":
+        return address
+
+    return _identity
+
+
+def compile_record(
+    abi: Sequence[dict],
+    name: str = DEFAULT_RECORD_NAME,
+    address: Shaper | None = None,
+) -> Shaper:
+    """
+    Compile the conversion of a decoded tuple into a record of the struct `name`.
+    """
+    make = record_type(name, [item["name"] for item in abi])._make
+    shapers = tuple(compile_record_shaper(item, address) for item in abi)
+
+    if all(shaper is _identity for shaper in shapers):
+        return make
+
+    return lambda data: make([shaper(value) for shaper, value in zip(shapers, data)])
+
+
+JSONConverters = tuple[Shaper, Shaper | None, Shaper | None]
+
+# Integers of at most this many bits always fit in a double
+SAFE_INT_BITS = 53
+
+
+def compile_json_shaper(abi: dict, converters: JSONConverters) -> Shaper:
+    """
+    Compile the conversion of a single decoded value into its JSON-ready subtree.
+    Mirrors `compile_shaper`, converting bytes, big integers and addresses on the
+    way according to the `JSONPolicy` the converters were resolved from.
+    """
+    abi_type = cast(ABIType, parse(collapse_if_tuple(dict(abi))))
+    bytes_converter, big_int_converter, address_converter = converters
+
+    if abi_type.is_array:
+        item_type = abi_type.item_type.to_type_str()
+        item_shaper = compile_json_shaper(
+            {**abi, "type": item_type, "name": ""}, converters
+        )
+        if item_shaper is _identity:
+            return list
+        return lambda data: [item_shaper(item) for item in data]
+
+    elif isinstance(abi_type, TupleType):
+        return compile_json_tree(abi["components"], converters)
+
+    base = abi_type.base
+    if base in ("bytes", "function"):
+        return bytes_converter
+    elif base in ("uint", "int"):
+        bits = int(abi_type.sub)
+        if big_int_converter is None or bits - (base == "int") <= SAFE_INT_BITS:
+            return _identity
+        return big_int_converter
+    elif base in ("fixed", "ufixed"):
+        return str
+    elif base == "address" and address_converter is not None:
+        return address_converter
+
+    return _identity
+
+
+def compile_json_tree(abi: Sequence[dict], converters: JSONConverters) -> Shaper:
+    names = tuple(item["name"] for item in abi)
+    shapers = tuple(compile_json_shaper(item, converters) for item in abi)
+
+    if all(shaper is _identity for shaper in shapers):
+        return lambda data: dict(zip(names, data))
+
+    fields = tuple(zip(names, shapers))
+    return lambda data: {
+        name: shaper(value) for (name, shaper), value in zip(fields, data)
+    }
+
+
+def compile_expander(abi: dict) -> Expander | None:
+    """
+    Compile a walk over a named subtree which passes every dynamic `bytes` value
+    through a callback, replacing it with the result.
+    Returns None when the subtree contains no `bytes` values.
+    """
+    abi_type = cast(ABIType, parse(collapse_if_tuple(dict(abi))))
+
+    if abi_type.is_array:
+        item_type = abi_type.item_type.to_type_str()
+        item_expander = compile_expander({**abi, "type": item_type, "name": ""})
+        if item_expander is None:
+            return None
+        return lambda data, expand: [item_expander(item, expand) for item in data]
+
+    elif isinstance(abi_type, TupleType):
+        return compile_tree_expander(abi["components"])
+
+    elif abi_type.base == "bytes" and not abi_type.sub:
+        return lambda data, expand: expand(data)
+
+    return None
+
+
+def compile_tree_expander(abi: Sequence[dict]) -> Expander | None:
+    fields = [
+        (item["name"], expander)
+        for item in abi
+        if (expander := compile_expander(item)) is not None
+    ]
+    if not fields:
+        return None
+
+    def expander(data: dict, expand: Shaper) -> dict:
+        for name, field_expander in fields:
+            data[name] = field_expander(data[name], expand)
+        return data
+
+    return expander
+
+
+_UNCOMPILED: Any = object()
+_DEFAULT_LIMITS = DecodeLimits()
+
+ShapeKey = tuple[bool, AddressFormat | None, JSONPolicy | None]
+
+
+def _json_converters(
+    records: bool, address: AddressFormat | None, json: JSONPolicy
+) -> JSONConverters:
+    if records:
+        raise ValueError("Records can not be output as JSON")
+    if address is not None:
+        json = json._replace(address=address)
+    return get_json_converters(json)
+
+
+def compile_output(
+    abi: Sequence[dict],
+    name: str,
+    records: bool,
+    address: AddressFormat | None,
+    json: JSONPolicy | None = None,
+) -> Shaper:
+    if json is not None:
+        return compile_json_tree(abi, _json_converters(records, address, json))
+
+    converter = get_address_converter(address)
+    if records:
+        return compile_record(abi, name or DEFAULT_RECORD_NAME, converter)
+    return compile_tree(abi, converter)
+
+
+def compile_value_output(
+    abi: dict,
+    records: bool,
+    address: AddressFormat | None,
+    json: JSONPolicy | None = None,
+) -> Shaper:
+    """
+    Like `compile_output`, for a single value rather than a parameter list.
+    """
+    if json is not None:
+        return compile_json_shaper(abi, _json_converters(records, address, json))
+
+    converter = get_address_converter(address)
+    if records:
+        return compile_record_shaper(abi, converter)
+    return compile_shaper(abi, converter)
+
+
+class SchemaField(NamedTuple):
+    """
+    Describes one position of a raw decoded tuple.
+    `components` describes the fields of tuples, or of their items for arrays
+    of tuples.
+    """
+
+    name: str
+    type: str
+    components: tuple[SchemaField, ...] | None = None
+
+
+def compile_schema(abi: Sequence[dict]) -> tuple[SchemaField, ...]:
+    return tuple(
+        SchemaField(
+            item["name"],
+            item["type"],
+            compile_schema(item["components"]) if "components" in item else None,
+        )
+        for item in abi
+    )
+
+
+def _check_raw(records: bool, address: Any, json: Any):
+    if records or address is not None or json is not None:
+        raise ValueError("Raw output can not be combined with other output modes")
+
+
+def _accepts(check: ShapeCheck, head_size: int, data: bytes) -> bool:
+    if check.static:
+        return len(data) == head_size
+    try:
+        check(data, _DEFAULT_LIMITS)
+    except InvalidShape:
+        return False
+    return True
+
+
+def shape_error(e: InvalidShape, selector: bytes) -> DecodeResult:
+    status = (
+        DecodeStatus.LIMIT_EXCEEDED
+        if isinstance(e, LimitExceeded)
+        else DecodeStatus.INVALID_DATA
+    )
+    return DecodeResult(status, selector, None, e.position)
+
+
+class ArrayAccess:
+    """
+    Locates the elements of a top level array parameter within the encoding of a
+    parameter list, so they can be decoded one at a time.
+    """
+
+    __slots__ = (
+        "name",
+        "head",
+        "dynamic",
+        "length",
+        "item_abi",
+        "item_dynamic",
+        "item_size",
+        "decoder",
+        "_shapes",
+    )
+
+    def __init__(self, inputs: Sequence[dict], types: Sequence[str], name: str):
+        names = [item["name"] for item in inputs]
+        if name not in names:
+            raise ValueError(f"No parameter named {name!r}")
+        index = names.index(name)
+
+        abi_type = cast(ABIType, parse(types[index]))
+        if not abi_type.is_array:
+            raise ValueError(f"Parameter {name!r} is not an array")
+
+        self.name = name
+        self.head = head_size(types[:index])
+        self.dynamic = abi_type.is_dynamic
+        dimension = abi_type.arrlist[-1]  # type: ignore
+        self.length: int | None = dimension[0] if dimension else None
+
+        item_type = abi_type.item_type.to_type_str()
+        self.item_abi = {**inputs[index], "type": item_type, "name": ""}
+        self.item_dynamic = abi_type.item_type.is_dynamic
+        self.item_size = head_size([item_type])
+        self.decoder = registry.get_decoder(item_type)
+        self._shapes: dict[ShapeKey, Shaper] = {}
+
+    def get_shape(
+        self, records: bool, address: AddressFormat | None, json: JSONPolicy | None
+    ) -> Shaper:
+        key = (records, address, json)
+        if (shape := self._shapes.get(key)) is None:
+            shape = self._shapes[key] = compile_value_output(
+                self.item_abi, records, address, json
+            )
+        return shape
+
+    def _read_word(self, data: bytes | memoryview, position: int) -> int:
+        if position + 32 > len(data):
+            raise DecodingError(
+                f"Word at {position} of {self.name} runs past the input length"
+            )
+        return int.from_bytes(data[position : position + 32], "big")
+
+    def locate(self, data: bytes | memoryview) -> tuple[int, int]:
+        """
+        Get the position of the array's first element (or offset for dynamic
+        elements) and its length.
+        """
+        start = self._read_word(data, self.head) if self.dynamic else self.head
+        if (length := self.length) is None:
+            length = self._read_word(data, start)
+            start += 32
+
+        if start + length * self.item_size > len(data):
+            raise DecodingError(
+                f"Array {self.name} of {length} elements runs past the input length"
+            )
+        return start, length
+
+    def positions(self, data: bytes | memoryview, start: int, length: int):
+        """
+        Yield the position of every element.
+        """
+        if not self.item_dynamic:
+            yield from range(start, start + length * self.item_size, self.item_size)
+            return
+
+        # Dynamic elements are located through offsets relative to the first
+        for head in range(start, start + 32 * length, 32):
+            yield start + self._read_word(data, head)
+
+
+def build_decoder(types: Sequence[str]) -> TupleDecoder:
+    return TupleDecoder(decoders=tuple(registry.get_decoder(t) for t in types))
+
+
+class DecodePlan:
+    """
+    Decoding plan for a list of ABI parameters (function inputs, outputs, errors).
+    """
+
+    __slots__ = (
+        # Interned plans are held weakly, see `pysad.tables.intern_plan`
+        "__weakref__",
+        "name",
+        "inputs",
+        "types",
+        "names",
+        "decoder",
+        "head_size",
+        "shape",
+        "_shapes",
+        "_schema",
+        "_shape_check",
+        "_arrays",
+        "_expander",
+    )
+
+    name: str
+    inputs: Sequence[dict]
+    types: list[str]
+    names: list[str]
+    decoder: TupleDecoder
+    head_size: int
+    shape: Shaper
+
+    def __init__(self, inputs: Sequence[dict], name: str = ""):
+        self.name = name
+        self.inputs = inputs
+        self.types, self.names = get_input_info(list(inputs))
+        self.decoder = build_decoder(self.types)
+        self.head_size = head_size(self.types)
+        self.shape = compile_tree(inputs)
+        self._shapes: dict[ShapeKey, Shaper] = {(False, None, None): self.shape}
+        self._schema: tuple[SchemaField, ...] | None = None
+        self._shape_check: ShapeCheck | None = None
+        self._arrays: dict[str, ArrayAccess] = {}
+        self._expander = _UNCOMPILED
+
+    @property
+    def schema(self) -> tuple[SchemaField, ...]:
+        if self._schema is None:
+            self._schema = compile_schema(self.inputs)
+        return self._schema
+
+    def get_shape(
+        self,
+        records: bool = False,
+        address: AddressFormat | None = None,
+        json: JSONPolicy | None = None,
+    ) -> Shaper:
+        # Other output modes are only compiled once they are first used
+        key = (records, address, json)
+        if (shape := self._shapes.get(key)) is None:
+            shape = self._shapes[key] = compile_output(
+                self.inputs, self.name, records, address, json
+            )
+        return shape
+
+    @property
+    def expander(self) -> Expander | None:
+        # Only compiled for plans which are actually decoded with expansion
+        if self._expander is _UNCOMPILED:
+            self._expander = compile_tree_expander(self.inputs)
+        return self._expander
+
+    @property
+    def shape_check(self) -> ShapeCheck:
+        if self._shape_check is None:
+            self._shape_check = ShapeCheck(self.types)
+        return self._shape_check
+
+    def accepts(self, data: bytes) -> bool:
+        """
+        Whether `data` has the shape of an encoding of the parameters, a far
+        cheaper check than decoding it, used to tell colliding selectors apart.
+        """
+        return _accepts(self.shape_check, self.head_size, data)
+
+    def decode_args(
+        self, data: bytes | memoryview, limits: DecodeLimits | None = None
+    ) -> tuple:
+        """
+        Decode into the eth_abi tuple.
+        With `limits`, the input is shape checked first and rejected with an
+        `InvalidShape` error if it is malformed or exceeds the limits.
+        """
+        if limits is not None:
+            self.shape_check(data, limits)
+        try:
+            return self.decoder(ContextFramesBytesIO(data))
+        except Exception as e:
+            raise DecodingError from e
+
+    def decode(
+        self,
+        data: bytes | memoryview,
+        records: bool = False,
+        address: AddressFormat | None = None,
+        json: JSONPolicy | None = None,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ) -> Any:
+        """
+        Decode into the named tree, or the requested output mode.
+        With `raw`, the eth_abi tuple is returned as is, see `schema` for its layout.
+        """
+        if raw:
+            _check_raw(records, address, json)
+            return self.decode_args(data, limits)
+        shape = self.get_shape(records, address, json)
+        return shape(self.decode_args(data, limits))
+
+    def iter_array(
+        self,
+        data: bytes | memoryview,
+        name: str,
+        records: bool = False,
+        address: AddressFormat | None = None,
+        json: JSONPolicy | None = None,
+        raw: bool = False,
+    ) -> Iterator[Any]:
+        """
+        Lazily decode the elements of the top level array parameter `name`.
+        Only one element is decoded at a time and elements which are not iterated
+        over are never decoded.
+        """
+        if (array := self._arrays.get(name)) is None:
+            array = self._arrays[name] = ArrayAccess(self.inputs, self.types, name)
+
+        if raw:
+            _check_raw(records, address, json)
+            shape = _identity
+        else:
+            shape = array.get_shape(records, address, json)
+
+        # Locate eagerly, so an invalid array raises before iteration starts
+        start, length = array.locate(data)
+        return self._iter_elements(array, shape, data, start, length)
+
+    @staticmethod
+    def _iter_elements(
+        array: ArrayAccess,
+        shape: Shaper,
+        data: bytes | memoryview,
+        start: int,
+        length: int,
+    ) -> Iterator[Any]:
+        decoder = array.decoder
+        stream = ContextFramesBytesIO(data)
+        for position in array.positions(data, start, length):
+            stream.push_frame(position)
+            try:
+                value = decoder(stream)
+            except Exception as e:
+                raise DecodingError from e
+            stream.pop_frame()
+            yield shape(value)
+
+    def try_decode(
+        self,
+        data: bytes | memoryview,
+        selector: bytes = b"",
+        records: bool = False,
+        address: AddressFormat | None = None,
+        json: JSONPolicy | None = None,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ) -> DecodeResult:
+        """
+        Like `decode`, but reports invalid data in the result instead of raising.
+        """
+        if raw:
+            _check_raw(records, address, json)
+            shape = tuple
+        else:
+            shape = self.get_shape(records, address, json)
+
+        if len(data) < self.head_size:
+            return DecodeResult(DecodeStatus.TOO_SHORT, selector, None, len(data))
+
+        if limits is not None:
+            try:
+                self.shape_check(data, limits)
+            except InvalidShape as e:
+                return shape_error(e, selector)
+
+        stream = ContextFramesBytesIO(data)
+        try:
+            args = self.decoder(stream)
+        except Exception:
+            return DecodeResult(
+                DecodeStatus.INVALID_DATA, selector, None, stream.tell()
+            )
+        return DecodeResult(DecodeStatus.OK, selector, shape(args))
+
+
+class EventPlan:
+    """
+    Decoding plan for an event, split between the indexed topics and log data.
+    """
+
+    __slots__ = (
+        # Interned plans are held weakly, see `pysad.tables.intern_plan`
+        "__weakref__",
+        "name",
+        "inputs",
+        "indexed",
+        "topic_decoders",
+        "decoder",
+        "data_types",
+        "head_size",
+        "shape",
+        "_shape_inputs",
+        "_shapes",
+        "_schema",
+        "_shape_check",
+    )
+
+    name: str
+    inputs: Sequence[dict]
+    indexed: list[bool]
+    topic_decoders: tuple[TupleDecoder, ...]
+    decoder: TupleDecoder
+    data_types: list[str]
+    head_size: int
+    shape: Shaper
+
+    def __init__(self, inputs: Sequence[dict], name: str = ""):
+        self.name = name
+        self.inputs = inputs
+
+        types, _ = get_input_info(list(inputs))
+        rtypes_bmap, self.indexed = get_log_inputs(list(inputs))
+        types = fix_log_types(types, rtypes_bmap, self.indexed)
+
+        self.topic_decoders = tuple(
+            build_decoder([t]) for (t, b) in zip(types, self.indexed) if b
+        )
+        self.data_types = [t for (t, b) in zip(types, self.indexed) if not b]
+        self.decoder = build_decoder(self.data_types)
+        self.head_size = head_size(self.data_types)
+        self._shape_check: ShapeCheck | None = None
+        # Indexed reference types are only available as their hash
+        self._shape_inputs = fix_reference_log_inputs(list(inputs))
+        self.shape = compile_tree(self._shape_inputs)
+        self._shapes: dict[ShapeKey, Shaper] = {(False, None, None): self.shape}
+        self._schema: tuple[SchemaField, ...] | None = None
+
+    @property
+    def schema(self) -> tuple[SchemaField, ...]:
+        if self._schema is None:
+            self._schema = compile_schema(self._shape_inputs)
+        return self._schema
+
+    def get_shape(
+        self,
+        records: bool = False,
+        address: AddressFormat | None = None,
+        json: JSONPolicy | None = None,
+    ) -> Shaper:
+        key = (records, address, json)
+        if (shape := self._shapes.get(key)) is None:
+            shape = self._shapes[key] = compile_output(
+                self._shape_inputs, self.name, records, address, json
+            )
+        return shape
+
+    @property
+    def shape_check(self) -> ShapeCheck:
+        if self._shape_check is None:
+            self._shape_check = ShapeCheck(self.data_types)
+        return self._shape_check
+
+    def accepts(self, topics: Sequence[bytes], memory: bytes) -> bool:
+        return len(topics) == len(self.topic_decoders) and _accepts(
+            self.shape_check, self.head_size, memory
+        )
+
+    def decode_args(
+        self,
+        topics: Sequence[bytes],
+        memory: bytes,
+        limits: DecodeLimits | None = None,
+    ) -> list:
+        if len(topics) != len(self.topic_decoders):
+            raise DecodingError(
+                f"Expected {len(self.topic_decoders)} topics but received {len(topics)}"
+            )
+        if limits is not None:
+            self.shape_check(memory, limits)
+
+        try:
+            decoded_topics = iter(
+                [
+                    d(ContextFramesBytesIO(t))[0]
+                    for d, t in zip(self.topic_decoders, topics)
+                ]
+            )
+            decoded_memory = iter(self.decoder(ContextFramesBytesIO(memory)))
+        except Exception as e:
+            raise DecodingError from e
+
+        return [
+            next(decoded_topics) if indexed else next(decoded_memory)
+            for indexed in self.indexed
+        ]
+
+    def decode(
+        self,
+        topics: Sequence[bytes],
+        memory: bytes,
+        records: bool = False,
+        address: AddressFormat | None = None,
+        json: JSONPolicy | None = None,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ) -> Any:
+        if raw:
+            _check_raw(records, address, json)
+            return tuple(self.decode_args(topics, memory, limits))
+        shape = self.get_shape(records, address, json)
+        return shape(self.decode_args(topics, memory, limits))
+
+    def try_decode(
+        self,
+        topics: Sequence[bytes],
+        memory: bytes,
+        selector: bytes = b"",
+        records: bool = False,
+        address: AddressFormat | None = None,
+        json: JSONPolicy | None = None,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ) -> DecodeResult:
+        """
+        Like `decode`, but reports invalid data in the result instead of raising.
+        """
+        if raw:
+            _check_raw(records, address, json)
+            shape = tuple
+        else:
+            shape = self.get_shape(records, address, json)
+
+        if len(topics) != len(self.topic_decoders):
+            return DecodeResult(DecodeStatus.INVALID_TOPICS, selector)
+        if len(memory) < self.head_size:
+            return DecodeResult(DecodeStatus.TOO_SHORT, selector, None, len(memory))
+
+        if limits is not None:
+            try:
+                self.shape_check(memory, limits)
+            except InvalidShape as e:
+                return shape_error(e, selector)
+
+        try:
+            args = self.decode_args(topics, memory)
+        except DecodingError:
+            return DecodeResult(DecodeStatus.INVALID_DATA, selector)
+        return DecodeResult(DecodeStatus.OK, selector, shape(args))
@@ -2,237 +2,363 @@
 Precompiled functions exist on-chain to reduce gas cost for commonly used functions.
 This file creates special cases for decoding these contracts.
 
-On the main chain, these exist ot addresses 0x000...01 to 0x000...09.
+On the main chain, these exist ot addresses 0x000...01 to 0x000...11.
 A list of these functions is available here: https://www.evm.codes/precompiled
 """
 
 
-from typing import Any
+from __future__ import annotations
 
-from eth_abi.abi import decode
+from collections.abc import Iterable, Iterator, Mapping
+from typing import Any, NamedTuple
 
-from pysad.errors import DecodingError, UnknownPrecompile
-from pysad.utils import get_input_info, hex_to_bytes, named_tree
+from pysad.errors import UnknownPrecompile
+from pysad.layout import Layout, fixed, padding, ref, repeated, rest
+from pysad.utils import hex_to_bytes
 
+# Every precompile lives below 0x10000, ie. its address starts with 18 zero bytes
+SMALL_ADDRESS_LIMIT = 1 << 16
+ZERO_PREFIX = bytes(18)
 
-def get_precompiled_abi(address: bytes | str) -> dict | None:
-    return PRECOMPILED_MAP.get(hex_to_bytes(address))
 
+def get_precompiled_abi(
+    address: bytes | str | int, chain_id: int | None = None
+) -> dict | None:
+    return get_precompiles(chain_id).get(address)
 
-def decode_precompiled(address: bytes | str, input: bytes | str) -> dict[str, Any]:
-    """
-    Decode calldata for precompiled functions.
-    Returns a dict mapping the function's parameters to their values.
-    """
-
-    # Precompiled functions do not have a selector, so the entire input is calldata
-    calldata = hex_to_bytes(input)
-
-    # Check if this is actually a precompiled function
-    if (abi := get_precompiled_abi(address)) is None:
-        raise UnknownPrecompile(address)
-
-    # Check if a special case is needed to handle this function
-    if case_handler := SPECIAL_CASES.get(abi["name"]):
-        return case_handler(abi, calldata)
 
-    # Decode the function normally
-    types, _ = get_input_info(abi["inputs"])
-    try:
-        args = decode(types, calldata)
-    except Exception as e:
-        raise DecodingError from e
+def is_precompiled(address: bytes | str | int, chain_id: int | None = None) -> bool:
+    return get_precompiles(chain_id).lookup(address) is not None
 
-    return named_tree(abi["inputs"], args)
 
-
-def decode_single_input(abi: dict, calldata: bytes) -> dict[str, Any]:
+def decode_precompiled(
+    address: bytes | str | int,
+    input: bytes | str,
+    zero_copy: bool = False,
+    chain_id: int | None = None,
+) -> dict[str, Any]:
     """
-    Special Case: Decode functions with a single argument.
-    eg. sha256, ripemd160, identity
+    Decode calldata for precompiled functions.
+    Returns a dict mapping the function's parameters to their values.
+    With `zero_copy`, bytes values are memoryview slices of the input.
 
-    Since there is only one argument, all calldata corresponds to this value.
+    Without a `chain_id`, the address is looked up across every known chain.
     """
-
-    return named_tree(abi["inputs"], [calldata])
+    return get_precompiles(chain_id).decode(address, input, zero_copy)
 
 
-def decode_modexp(abi: dict, calldata: bytes) -> dict[str, Any]:
+def decode_precompiled_batch(
+    address: bytes | str | int,
+    inputs: Iterable[bytes | str],
+    zero_copy: bool = False,
+    chain_id: int | None = None,
+) -> dict[str, list[Any]]:
     """
-    Special Case: Decode modexp function input.
-    function modexp(Bsize, Esize, Msize, B, E, M)
-    where Bsize, Esize and Msize and the size in bytes of B, E, M respectively
+    Decode the calldata of many calls to the same precompiled function.
+    Returns a dict mapping each of the function's parameters to a list of values,
+    one per input.
     """
+    if (precompile := get_precompiles(chain_id).lookup(address)) is None:
+        raise UnknownPrecompile(address)
 
-    # Read the byte size of argument. Each size is given as a 32 byte uint (uint256)
-    if len(calldata) < 96:
-        raise DecodingError
-
-    Bsize = int.from_bytes(calldata[0:32], "big")
-    Esize = int.from_bytes(calldata[32:64], "big")
-    Msize = int.from_bytes(calldata[64:96], "big")
+    return precompile.layout.decode_columns(map(hex_to_bytes, inputs), zero_copy)
 
-    if len(calldata[96:]) < Bsize + Esize + Msize:
-        raise DecodingError
 
-    return named_tree(
-        abi["inputs"],
-        [
-            Bsize,  # Bsize
-            Esize,  # Esize
-            Msize,  # Msize
-            calldata[96 : (96 + Bsize)],  # B
-            calldata[(96 + Bsize) : (96 + Bsize + Esize)],  # E
-            calldata[(96 + Bsize + Esize) : (96 + Bsize + Esize + Msize)],  # M
-        ],
-    )
-
-
-def decode_blake2f(abi: dict, calldata: bytes) -> dict[str, Any]:
+def decode_precompiled_output(
+    address: bytes | str | int,
+    output: bytes | str,
+    zero_copy: bool = False,
+    chain_id: int | None = None,
+) -> dict[str, Any]:
     """
-    Special Case: Decode blake2f function input.
-    function blake2f(rounds: bytes4, h: bytes64, m: bytes128, t: bytes16, f: bytes1)
+    Decode the return data of a precompiled function.
+    Precompiles return no data when they fail, which decodes to an empty dict.
     """
-
-    if len(calldata) != 213:
-        raise DecodingError
-
-    return named_tree(
-        abi["inputs"],
-        [
-            int.from_bytes(calldata[0:4], "big"),  # rounds
-            calldata[4:68],  # h
-            calldata[68:196],  # m
-            calldata[196:212],  # t
-            calldata[212:213],  # f
-        ],
-    )
+    return get_precompiles(chain_id).decode_output(address, output, zero_copy)
 
 
-def decode_validateTendermintHeader(abi: dict, calldata: bytes) -> dict[str, Any]:
+def decode_precompiled_outputs(
+    address: bytes | str | int,
+    outputs: Iterable[bytes | str],
+    zero_copy: bool = False,
+    chain_id: int | None = None,
+) -> list[dict[str, Any]]:
     """
-    Special Case: Decode validateTendermintHeader function input.
-    validateTendermintHeader is a precompile on the BNB chain.
-    function validateTendermintHeader(length: uint256, chainID: uint256, height: uint64, appHash: bytes32, curValidatorSetHash: bytes32, nextValidatorSet: bytes, header: bytes)
+    Decode the return data of many calls to the same precompiled function,
+    resolving the precompile and its layout once for the whole batch.
     """
+    if (precompile := get_precompiles(chain_id).lookup(address)) is None:
+        raise UnknownPrecompile(address)
 
-    # Calldata Layout:
-    # Value: | length   | chainID  | height  | appHash  | curValidatorSetHash | nextValidatorSet | header          |
-    # Size:  | 32 bytes | 32 bytes | 8 bytes | 32 bytes | 32 bytes            | length bytes     | remaining bytes |
+    decode = precompile.output.decode
+    return [
+        decode(output, zero_copy) if output else {}
+        for output in map(hex_to_bytes, outputs)
+    ]
 
-    length = int.from_bytes(calldata[0:32], "big")
-    chainID = int.from_bytes(calldata[32:64], "big")
-    height = int.from_bytes(calldata[64:72], "big")
-    appHash = calldata[72:104]
-    curValidatorSetHash = calldata[104:136]
-    nextValidatorSet = calldata[136 : length + 32]
-    header = calldata[length + 32 :]
 
-    return named_tree(
-        abi["inputs"],
-        [
-            length,
-            chainID,
-            height,
-            appHash,
-            curValidatorSetHash,
-            nextValidatorSet,
-            header,
-        ],
-    )
+class Precompile(NamedTuple):
+    abi: dict
+    layout: Layout
+    output: Layout
 
 
-def decode_verifyMerkleProof(abi: dict, calldata: bytes) -> dict[str, Any]:
+class PrecompileSet:
     """
-    Special Case: Decode verifyMerkleProof function input.
-    verifyMerkleProof is a precompile on the BNB chain.
-    function verifyMerkleProof(storeName: string, keyLength: uint256, key: bytes, valueLength: uint256, value: bytes, appHash: uint256, proof: bytes)
+    The precompiled functions available on a chain, keyed by integer address.
     """
 
-    # Calldata Layout:
-    # Value: | storeName | keyLength | key             | valueLength | value           | appHash  | proof           |
-    # Size:  | 32 bytes  | 32 bytes  | keyLength bytes | 32 bytes    | keyLength bytes | 32 bytes | remaining bytes |
-
-    storeName = calldata[0:32].decode()
-    keyLength = int.from_bytes(calldata[32:64], "big")
-    key = calldata[64 : 64 + keyLength]
-    valueLength = int.from_bytes(calldata[64 + keyLength : 96 + keyLength], "big")
-    value = calldata[96 + keyLength : 96 + keyLength + valueLength]
-    appHash = calldata[96 + keyLength + valueLength : 128 + keyLength + valueLength]
-    proof = calldata[128 + keyLength + valueLength :]
-
-    return named_tree(
-        abi["inputs"],
-        [
-            storeName,
-            keyLength,
-            key,
-            valueLength,
-            value,
-            appHash,
-            proof,
-        ],
-    )
-
-
-def decode_verifyBLSSignature(abi: dict, calldata: bytes) -> dict[str, Any]:
+    __slots__ = ("_by_address", "_small_only")
+
+    _by_address: dict[int, Precompile]
+    _small_only: bool
+
+    def __init__(
+        self,
+        precompiles: Iterable[dict],
+        layouts: Mapping[str, Layout] | None = None,
+        output_layouts: Mapping[str, Layout] | None = None,
+    ):
+        layouts = {**LAYOUTS, **(layouts or {})}
+        output_layouts = {**OUTPUT_LAYOUTS, **(output_layouts or {})}
+        self._by_address = {
+            int(abi["address"], 16): Precompile(
+                abi,
+                layouts[abi["name"]],
+                output_layouts.get(abi["name"], RAW_OUTPUT_LAYOUT),
+            )
+            for abi in precompiles
+        }
+        self._small_only = all(a < SMALL_ADDRESS_LIMIT for a in self._by_address)
+
+    def __iter__(self) -> Iterator[dict]:
+        return (precompile.abi for precompile in self._by_address.values())
+
+    def extend(
+        self,
+        precompiles: Iterable[dict],
+        layouts: Mapping[str, Layout] | None = None,
+        output_layouts: Mapping[str, Layout] | None = None,
+    ) -> PrecompileSet:
+        """
+        Create a new set with additional precompiles, replacing any at the same address.
+        """
+        extended = PrecompileSet(precompiles, layouts, output_layouts)
+        extended._by_address = {**self._by_address, **extended._by_address}
+        extended._small_only = self._small_only and extended._small_only
+        return extended
+
+    def lookup(self, address: bytes | str | int) -> Precompile | None:
+        if isinstance(address, int):
+            key = address
+        elif isinstance(address, str):
+            try:
+                key = int(address, 16)
+            except ValueError:
+                return None
+        else:
+            # Most addresses are rejected by the leading zeros without any conversion
+            if self._small_only and len(address) == 20 and address[:18] != ZERO_PREFIX:
+                return None
+            key = int.from_bytes(address, "big")
+        return self._by_address.get(key)
+
+    def get(self, address: bytes | str | int) -> dict | None:
+        if (precompile := self.lookup(address)) is None:
+            return None
+        return precompile.abi
+
+    def decode(
+        self, address: bytes | str | int, input: bytes | str, zero_copy: bool = False
+    ) -> dict[str, Any]:
+        # Check if this is actually a precompiled function
+        if (precompile := self.lookup(address)) is None:
+            raise UnknownPrecompile(address)
+
+        # Precompiled functions do not have a selector, so the entire input is calldata
+        return precompile.layout.decode(hex_to_bytes(input), zero_copy)
+
+    def decode_output(
+        self, address: bytes | str | int, output: bytes | str, zero_copy: bool = False
+    ) -> dict[str, Any]:
+        if (precompile := self.lookup(address)) is None:
+            raise UnknownPrecompile(address)
+
+        output = hex_to_bytes(output)
+        if not output:
+            return {}
+        return precompile.output.decode(output, zero_copy)
+
+
+def get_precompiles(chain_id: int | None = None) -> PrecompileSet:
     """
-    Special Case: Decode verifyBLSSignature function input.
-    verifyBLSSignature is a precompile on the BNB chain.
-    function verifyBLSSignature(vote: bytes32, voteSignature: bytes, voteAddress: bytes)
+    Get the precompiles of a chain, defaulting to Ethereum's for unknown chains.
+    Without a `chain_id` every known precompile is returned.
     """
+    if chain_id is None:
+        return ALL_PRECOMPILES
+    return CHAIN_PRECOMPILES.get(chain_id, ETHEREUM_PRECOMPILES)
 
-    if len(calldata) != 176:
-        raise DecodingError
-
-    vote = calldata[0:32]
-    voteSignature = calldata[32:128]
-    voteAddress = calldata[128:176]
-
-    return named_tree(
-        abi["inputs"],
-        [
-            vote,
-            voteSignature,
-            voteAddress,
-        ],
-    )
 
-
-def decode_BFTLightBlockValidate(abi: dict, calldata: bytes) -> dict[str, Any]:
+def register_precompiles(chain_id: int, precompiles: PrecompileSet):
     """
-    Special Case: Decode BFTLightBlockValidate function input.
-    BFTLightBlockValidate is a precompile on the BNB chain.
-    function BFTLightBlockValidate(consensusStateLength: uint256, consensusState: bytes, lightBlock: bytes)
+    Set the precompiles of a chain, eg. `ETHEREUM_PRECOMPILES.extend(...)` for an L2.
     """
+    CHAIN_PRECOMPILES[chain_id] = precompiles
+
+
+# Calldata layouts of each precompiled function, keyed by name
+LAYOUTS = {
+    # Single argument functions, all calldata corresponds to this value
+    "sha256": Layout([rest("data")]),
+    "ripemd160": Layout([rest("data")]),
+    "identity": Layout([rest("data")]),
+    "ecrecover": Layout([fixed(name, 32) for name in ("hash", "v", "r", "s")]),
+    # Bsize, Esize and Msize are the size in bytes of B, E, M respectively
+    "modexp": Layout(
+        [
+            fixed("Bsize", 32, "uint"),
+            fixed("Esize", 32, "uint"),
+            fixed("Msize", 32, "uint"),
+            ref("B", "Bsize"),
+            ref("E", "Esize"),
+            ref("M", "Msize"),
+        ]
+    ),
+    "ecadd": Layout([fixed(name, 32) for name in ("x1", "y1", "x2", "y2")]),
+    "ecmul": Layout([fixed(name, 32) for name in ("x1", "y1", "s")]),
+    # Any number of (G1, G2) point pairs, each of 192 bytes
+    "ecpairing": Layout(
+        [
+            repeated(
+                "pairs",
+                Layout([fixed(n, 32) for n in ("x1", "y1", "x2", "y2", "x3", "y3")]),
+            )
+        ]
+    ),
+    "blake2f": Layout(
+        [
+            fixed("rounds", 4, "uint"),
+            fixed("h", 64),
+            fixed("m", 128),
+            fixed("t", 16),
+            fixed("f", 1),
+        ],
+        exact=True,
+    ),
+    "pointEvaluation": Layout(
+        [
+            fixed("versionedHash", 32),
+            fixed("z", 32),
+            fixed("y", 32),
+            fixed("commitment", 48),
+            fixed("proof", 48),
+        ],
+        exact=True,
+    ),
+    # BLS12-381 curve operations, G1 points are 128 bytes and G2 points 256 bytes
+    "bls12G1Add": Layout([fixed("a", 128), fixed("b", 128)], exact=True),
+    "bls12G1MSM": Layout(
+        [repeated("pairs", Layout([fixed("point", 128), fixed("scalar", 32)]))]
+    ),
+    "bls12G2Add": Layout([fixed("a", 256), fixed("b", 256)], exact=True),
+    "bls12G2MSM": Layout(
+        [repeated("pairs", Layout([fixed("point", 256), fixed("scalar", 32)]))]
+    ),
+    "bls12PairingCheck": Layout(
+        [repeated("pairs", Layout([fixed("g1", 128), fixed("g2", 256)]))]
+    ),
+    "bls12MapFpToG1": Layout([fixed("fp", 64)], exact=True),
+    "bls12MapFp2ToG2": Layout([fixed("fp2", 128)], exact=True),
+    # Value: | length   | chainID  | height  | appHash  | curValidatorSetHash | nextValidatorSet | header          |
+    # Size:  | 32 bytes | 32 bytes | 8 bytes | 32 bytes | 32 bytes            | length bytes     | remaining bytes |
+    # where length covers everything from chainID up to the end of nextValidatorSet
+    "validateTendermintHeader": Layout(
+        [
+            fixed("length", 32, "uint"),
+            fixed("chainID", 32, "uint"),
+            fixed("height", 8, "uint"),
+            fixed("appHash", 32),
+            fixed("curValidatorSetHash", 32),
+            ref("nextValidatorSet", "length", base=32),
+            rest("header"),
+        ]
+    ),
+    # Value: | storeName | keyLength | key             | valueLength | value             | appHash  | proof           |
+    # Size:  | 32 bytes  | 32 bytes  | keyLength bytes | 32 bytes    | valueLength bytes | 32 bytes | remaining bytes |
+    "verifyMerkleProof": Layout(
+        [
+            fixed("storeName", 32, "string"),
+            fixed("keyLength", 32, "uint"),
+            ref("key", "keyLength"),
+            fixed("valueLength", 32, "uint"),
+            ref("value", "valueLength"),
+            fixed("appHash", 32),
+            rest("proof"),
+        ]
+    ),
+    "p256Verify": Layout(
+        [fixed(name, 32) for name in ("hash", "r", "s", "x", "y")], exact=True
+    ),
+    "verifyBLSSignature": Layout(
+        [fixed("vote", 32), fixed("voteSignature", 96), fixed("voteAddress", 48)],
+        exact=True,
+    ),
+    "BFTLightBlockValidate": Layout(
+        [
+            fixed("consensusStateLength", 32, "uint"),
+            ref("consensusState", "consensusStateLength"),
+            rest("lightBlock"),
+        ]
+    ),
+}
 
-    consensusStateLength = int.from_bytes(calldata[0:32], "big")
-    consensusState = calldata[32 : 32 + consensusStateLength]
-    lightBlock = calldata[32 + consensusStateLength :]
 
-    return named_tree(
-        abi["inputs"],
+# Return data layouts of each precompiled function, keyed by name
+OUTPUT_LAYOUTS = {
+    # The recovered address is left padded to 32 bytes
+    "ecrecover": Layout(
+        [padding(12), fixed("publicAddress", 20, "address")], exact=True
+    ),
+    "sha256": Layout([fixed("hash", 32)], exact=True),
+    # The 20 byte hash is left padded to 32 bytes
+    "ripemd160": Layout([fixed("hash", 32)], exact=True),
+    "identity": Layout([rest("data")]),
+    "modexp": Layout([rest("value")]),
+    "ecadd": Layout([fixed("x", 32), fixed("y", 32)], exact=True),
+    "ecmul": Layout([fixed("x", 32), fixed("y", 32)], exact=True),
+    "ecpairing": Layout([fixed("success", 32)], exact=True),
+    "blake2f": Layout([fixed("h", 64)], exact=True),
+    "pointEvaluation": Layout(
+        [fixed("fieldElements", 32, "uint"), fixed("blsModulus", 32, "uint")],
+        exact=True,
+    ),
+    "bls12G1Add": Layout([fixed("point", 128)], exact=True),
+    "bls12G1MSM": Layout([fixed("point", 128)], exact=True),
+    "bls12G2Add": Layout([fixed("point", 256)], exact=True),
+    "bls12G2MSM": Layout([fixed("point", 256)], exact=True),
+    "bls12PairingCheck": Layout([fixed("success", 32)], exact=True),
+    "bls12MapFpToG1": Layout([fixed("point", 128)], exact=True),
+    "bls12MapFp2ToG2": Layout([fixed("point", 256)], exact=True),
+    "p256Verify": Layout([fixed("success", 32, "uint")], exact=True),
+    "validateTendermintHeader": Layout([rest("result")]),
+    "verifyMerkleProof": Layout([fixed("result", 32, "uint")], exact=True),
+    "verifyBLSSignature": Layout([rest("output")]),
+    # Value: | validatorSetChanged | empty    | consensusStateLength | newConsensusState          |
+    # Size : | 1 byte              | 23 bytes | 8 bytes              | consensusStateLength bytes |
+    "BFTLightBlockValidate": Layout(
         [
-            consensusStateLength,
-            consensusState,
-            lightBlock,
-        ],
-    )
-
-
-# Map each precompiled function to its required decoder function
-SPECIAL_CASES = {
-    "sha256": decode_single_input,
-    "ripemd160": decode_single_input,
-    "identity": decode_single_input,
-    "modexp": decode_modexp,
-    "blake2f": decode_blake2f,
-    "validateTendermintHeader": decode_validateTendermintHeader,
-    "verifyMerkleProof": decode_verifyMerkleProof,
-    "verifyBLSSignature": decode_verifyBLSSignature,
-    "BFTLightBlockValidate": decode_BFTLightBlockValidate,
+            fixed("validatorSetChanged", 1, "bool"),
+            padding(23),
+            fixed("consensusStateLength", 8, "uint"),
+            ref("newConsensusState", "consensusStateLength"),
+        ]
+    ),
 }
 
+# Used for the output of precompiles without a known layout
+RAW_OUTPUT_LAYOUT = Layout([rest("output")])
+
 
 # Define precompiled function abis
 # NOTE: The selectors included have been manually added for conformity. Precompiled functions do not actually have selectors.
@@ -351,17 +477,24 @@ PRECOMPILES = [
         "stateMutability": "pure",
     },
     # ecpairing
+    # NOTE: The input is any number of 192 byte pairs of a G1 point (x1, y1) and a G2 point (x2, y2, x3, y3)
     {
-        "selector": "0xc9744441",
-        "signature": "ecpairing(bytes32,bytes32,bytes32,bytes32,bytes32,bytes32)",
+        "selector": "0xb8660fac",
+        "signature": "ecpairing((bytes32,bytes32,bytes32,bytes32,bytes32,bytes32)[])",
         "name": "ecpairing",
         "inputs": [
-            {"name": "x1", "type": "bytes32", "internalType": "bytes32"},
-            {"name": "y1", "type": "bytes32", "internalType": "bytes32"},
-            {"name": "x2", "type": "bytes32", "internalType": "bytes32"},
-            {"name": "y2", "type": "bytes32", "internalType": "bytes32"},
-            {"name": "x3", "type": "bytes32", "internalType": "bytes32"},
-            {"name": "y3", "type": "bytes32", "internalType": "bytes32"},
+            {
+                "name": "pairs",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "x1", "type": "bytes32", "internalType": "bytes32"},
+                    {"name": "y1", "type": "bytes32", "internalType": "bytes32"},
+                    {"name": "x2", "type": "bytes32", "internalType": "bytes32"},
+                    {"name": "y2", "type": "bytes32", "internalType": "bytes32"},
+                    {"name": "x3", "type": "bytes32", "internalType": "bytes32"},
+                    {"name": "y3", "type": "bytes32", "internalType": "bytes32"},
+                ],
+            },
         ],
         "address": "0x0000000000000000000000000000000000000008",
         "outputs": [
@@ -388,6 +521,148 @@ PRECOMPILES = [
         ],
         "stateMutability": "pure",
     },
+    # pointEvaluation (EIP-4844)
+    # NOTE: As with blake2f, the bytes48 types are not valid abi types
+    {
+        "selector": "0x34420517",
+        "signature": "pointEvaluation(bytes32,bytes32,bytes32,bytes48,bytes48)",
+        "name": "pointEvaluation",
+        "inputs": [
+            {"name": "versionedHash", "type": "bytes32", "internalType": "bytes32"},
+            {"name": "z", "type": "bytes32", "internalType": "bytes32"},
+            {"name": "y", "type": "bytes32", "internalType": "bytes32"},
+            {"name": "commitment", "type": "bytes48", "internalType": "bytes48"},
+            {"name": "proof", "type": "bytes48", "internalType": "bytes48"},
+        ],
+        "address": "0x000000000000000000000000000000000000000a",
+        "outputs": [
+            {"name": "fieldElements", "type": "uint256", "internalType": "uint256"},
+            {"name": "blsModulus", "type": "uint256", "internalType": "uint256"},
+        ],
+        "stateMutability": "pure",
+    },
+    # BLS12-381 curve operations (EIP-2537)
+    # bls12G1Add
+    {
+        "selector": "0x82a1629d",
+        "signature": "bls12G1Add(bytes128,bytes128)",
+        "name": "bls12G1Add",
+        "inputs": [
+            {"name": "a", "type": "bytes128", "internalType": "bytes128"},
+            {"name": "b", "type": "bytes128", "internalType": "bytes128"},
+        ],
+        "address": "0x000000000000000000000000000000000000000b",
+        "outputs": [
+            {"name": "point", "type": "bytes128", "internalType": "bytes128"},
+        ],
+        "stateMutability": "pure",
+    },
+    # bls12G1MSM
+    {
+        "selector": "0x8e7db8c5",
+        "signature": "bls12G1MSM((bytes128,bytes32)[])",
+        "name": "bls12G1MSM",
+        "inputs": [
+            {
+                "name": "pairs",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "point", "type": "bytes128", "internalType": "bytes128"},
+                    {"name": "scalar", "type": "bytes32", "internalType": "bytes32"},
+                ],
+            },
+        ],
+        "address": "0x000000000000000000000000000000000000000c",
+        "outputs": [
+            {"name": "point", "type": "bytes128", "internalType": "bytes128"},
+        ],
+        "stateMutability": "pure",
+    },
+    # bls12G2Add
+    {
+        "selector": "0x9f2f01c0",
+        "signature": "bls12G2Add(bytes256,bytes256)",
+        "name": "bls12G2Add",
+        "inputs": [
+            {"name": "a", "type": "bytes256", "internalType": "bytes256"},
+            {"name": "b", "type": "bytes256", "internalType": "bytes256"},
+        ],
+        "address": "0x000000000000000000000000000000000000000d",
+        "outputs": [
+            {"name": "point", "type": "bytes256", "internalType": "bytes256"},
+        ],
+        "stateMutability": "pure",
+    },
+    # bls12G2MSM
+    {
+        "selector": "0x1d465597",
+        "signature": "bls12G2MSM((bytes256,bytes32)[])",
+        "name": "bls12G2MSM",
+        "inputs": [
+            {
+                "name": "pairs",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "point", "type": "bytes256", "internalType": "bytes256"},
+                    {"name": "scalar", "type": "bytes32", "internalType": "bytes32"},
+                ],
+            },
+        ],
+        "address": "0x000000000000000000000000000000000000000e",
+        "outputs": [
+            {"name": "point", "type": "bytes256", "internalType": "bytes256"},
+        ],
+        "stateMutability": "pure",
+    },
+    # bls12PairingCheck
+    {
+        "selector": "0x107e4699",
+        "signature": "bls12PairingCheck((bytes128,bytes256)[])",
+        "name": "bls12PairingCheck",
+        "inputs": [
+            {
+                "name": "pairs",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "g1", "type": "bytes128", "internalType": "bytes128"},
+                    {"name": "g2", "type": "bytes256", "internalType": "bytes256"},
+                ],
+            },
+        ],
+        "address": "0x000000000000000000000000000000000000000f",
+        "outputs": [
+            {"name": "success", "type": "bytes32", "internalType": "bytes32"},
+        ],
+        "stateMutability": "pure",
+    },
+    # bls12MapFpToG1
+    {
+        "selector": "0x351bf2f2",
+        "signature": "bls12MapFpToG1(bytes64)",
+        "name": "bls12MapFpToG1",
+        "inputs": [
+            {"name": "fp", "type": "bytes64", "internalType": "bytes64"},
+        ],
+        "address": "0x0000000000000000000000000000000000000010",
+        "outputs": [
+            {"name": "point", "type": "bytes128", "internalType": "bytes128"},
+        ],
+        "stateMutability": "pure",
+    },
+    # bls12MapFp2ToG2
+    {
+        "selector": "0x08cc0969",
+        "signature": "bls12MapFp2ToG2(bytes128)",
+        "name": "bls12MapFp2ToG2",
+        "inputs": [
+            {"name": "fp2", "type": "bytes128", "internalType": "bytes128"},
+        ],
+        "address": "0x0000000000000000000000000000000000000011",
+        "outputs": [
+            {"name": "point", "type": "bytes256", "internalType": "bytes256"},
+        ],
+        "stateMutability": "pure",
+    },
     # validateTendermintHeader (BNB Chain)
     # ABI reverse engineered from https://github.com/bnb-chain/bsc-genesis-contract/blob/master/contracts/TendermintLightClient.sol
     {
@@ -478,5 +753,46 @@ PRECOMPILES = [
 ]
 
 
+# secp256r1 signature verification (RIP-7212), shipped by rollups such as the OP Stack
+# NOTE: This shares its address with validateTendermintHeader on the BNB Chain
+P256VERIFY = {
+    "selector": "0xba3a3627",
+    "signature": "p256Verify(bytes32,bytes32,bytes32,bytes32,bytes32)",
+    "name": "p256Verify",
+    "inputs": [
+        {"name": "hash", "type": "bytes32", "internalType": "bytes32"},
+        {"name": "r", "type": "bytes32", "internalType": "bytes32"},
+        {"name": "s", "type": "bytes32", "internalType": "bytes32"},
+        {"name": "x", "type": "bytes32", "internalType": "bytes32"},
+        {"name": "y", "type": "bytes32", "internalType": "bytes32"},
+    ],
+    "address": "0x0000000000000000000000000000000000000100",
+    "outputs": [
+        {"name": "success", "type": "uint256", "internalType": "uint256"},
+    ],
+    "stateMutability": "pure",
+}
+
+
 # Map each address to its abi
 PRECOMPILED_MAP = {hex_to_bytes(abi["address"]): abi for abi in PRECOMPILES}
+
+ALL_PRECOMPILES = PrecompileSet(PRECOMPILES)
+ETHEREUM_PRECOMPILES = PrecompileSet(
+    abi for abi in PRECOMPILES if int(abi["address"], 16) <= 0x11
+)
+BNB_PRECOMPILES = PrecompileSet(
+    abi
+    for abi in PRECOMPILES
+    if int(abi["address"], 16) <= 0x09 or 0x100 <= int(abi["address"], 16) <= 0x103
+)
+OP_STACK_PRECOMPILES = ETHEREUM_PRECOMPILES.extend([P256VERIFY])
+
+# Map each chain id to its precompiles
+CHAIN_PRECOMPILES: dict[int, PrecompileSet] = {
+    1: ETHEREUM_PRECOMPILES,
+    10: OP_STACK_PRECOMPILES,
+    56: BNB_PRECOMPILES,
+    97: BNB_PRECOMPILES,
+    8453: OP_STACK_PRECOMPILES,
+}
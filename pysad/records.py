@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+"""
+Compact record output.
+
+Decoded dicts store every field name in every result. Records are tuples whose
+field names live on a class generated once per ABI struct, so a buffered result
+costs little more than its values. Classes are cached by name and field names,
+so identical structs across fragments and contracts share a single class.
+"""
+
+from __future__ import annotations
+
+from collections import namedtuple
+from collections.abc import Sequence
+from typing import Any
+
+DEFAULT_RECORD_NAME = "Record"
+
+
+class Record(tuple):
+    """
+    Base of every generated record class.
+    Fields are available by position and, where the ABI name is a valid
+    identifier, as attributes.
+    """
+
+    __slots__ = ()
+
+    # The field names as given in the ABI, which may be empty or duplicated
+    _abi_names: tuple[str, ...] = ()
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert to the same named tree returned by the default output mode.
+        """
+        return {name: _to_dict(value) for name, value in zip(self._abi_names, self)}
+
+
+def _to_dict(value: Any) -> Any:
+    if isinstance(value, Record):
+        return value.to_dict()
+    elif isinstance(value, list):
+        return [_to_dict(item) for item in value]
+    return value
+
+
+_RECORD_TYPES: dict[tuple[str, tuple[str, ...]], type[Record]] = {}
+
+
+def struct_name(abi: dict) -> str:
+    """
+    The Solidity struct name of a tuple parameter, eg. `PermitSingle` for
+    `struct IAllowanceTransfer.PermitSingle`, if the ABI includes it.
+    """
+    internal_type = abi.get("internalType") or ""
+    if internal_type.startswith("struct "):
+        name = internal_type[len("struct ") :].split(".")[-1].split("[")[0]
+        if name.isidentifier():
+            return name
+    return DEFAULT_RECORD_NAME
+
+
+def record_type(name: str, fields: Sequence[str]) -> type[Record]:
+    """
+    Get the record class for a struct, creating it on first use.
+    """
+    if not name.isidentifier():
+        name = DEFAULT_RECORD_NAME
+
+    key = (name, tuple(fields))
+    if (cls := _RECORD_TYPES.get(key)) is None:
+        base = namedtuple(name, fields, rename=True)  # type: ignore
+        cls = type(name, (base, Record), {"__slots__": (), "_abi_names": key[1]})
+        # Keep the class created first if another thread raced to create it
+        cls = _RECORD_TYPES.setdefault(key, cls)
+    return cls
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+from operator import attrgetter
+from threading import RLock
+from typing import Any, TypeVar
+
+from pysad.address import AddressFormat
+from pysad.cache import NegativeCache, PlanCache, ResultCache
+from pysad.decoder import ABIDecoder
+from pysad.errors import UnknownABI
+from pysad.expand import CalldataExpander
+from pysad.plan import DecodePlan, EventPlan
+from pysad.result import DecodeResult, DecodeStatus
+from pysad.revert import decode_standard_error
+from pysad.serialize import JSONPolicy, get_policy
+from pysad.tables import PlanIndex
+from pysad.utils import hex_to_bytes
+from pysad.validate import DecodeLimits
+from pysad.versions import VersionedABI
+
+Plan = TypeVar("Plan", DecodePlan, EventPlan)
+
+
+class ABIRegistry:
+    """
+    Maps contract addresses to the decoder for their ABI.
+    With a `cache`, results of every decoder built by the registry are cached in it.
+
+    Selectors and topics are also indexed across all registered ABIs, to decode
+    calls and logs of unregistered contracts. Those which match nothing are kept
+    in the `unknown` negative cache until an ABI defining them is registered.
+
+    ABIs can also be bound to an address over a range of blocks, eg. the
+    implementations of a proxy, for decoding with a `block`.
+    """
+
+    contracts: dict[bytes, ABIDecoder]
+    versions: dict[bytes, VersionedABI]
+    selectors: PlanIndex[DecodePlan]
+    events: PlanIndex[EventPlan]
+    cache: ResultCache | None
+    plans: PlanCache | None
+    unknown: NegativeCache
+
+    def __init__(
+        self,
+        contracts: Mapping[str | bytes, list[dict] | ABIDecoder] | None = None,
+        cache: ResultCache | None = None,
+        unknown: NegativeCache | None = None,
+        plans: PlanCache | None = None,
+    ):
+        """
+        With `plans`, the decoders built by the registry are lazy and share the
+        given `PlanCache`, so that compile time and resident plans track the
+        selectors in use rather than the number of registered ABIs.
+        """
+        self.contracts = {}
+        self.versions = {}
+        self.selectors = PlanIndex()
+        self.events = PlanIndex()
+        self.cache = cache
+        self.plans = plans
+        self.unknown = unknown if unknown is not None else NegativeCache()
+        self._expander: CalldataExpander | None = None
+        # Bumped after the indexes are swapped, to stamp negative cache entries
+        self._generation = 0
+        # Serializes registrations, lookups only read the tables they swap in
+        self._lock = RLock()
+        for address, abi in (contracts or {}).items():
+            self._register(address, abi, swap=False)
+
+    def register(
+        self, address: str | bytes, abi: list[dict] | ABIDecoder
+    ) -> ABIDecoder:
+        """
+        Register the decoder for a contract, replacing any registered before.
+        Later updates to the decoder, through the registry or not, are indexed.
+        """
+        return self._register(address, abi)
+
+    def _register(
+        self, address: str | bytes, abi: list[dict] | ABIDecoder, swap: bool = True
+    ) -> ABIDecoder:
+        if isinstance(abi, ABIDecoder):
+            decoder = abi
+        else:
+            decoder = ABIDecoder(abi, self.cache, self.plans)
+        address = hex_to_bytes(address)
+        with self._lock:
+            previous = self.contracts.get(address)
+            self.contracts[address] = decoder
+            if previous is not None and previous is not decoder:
+                if previous not in self.contracts.values():
+                    previous.unwatch(self._reindex)
+                # The replaced decoder's entries are moved to the new decoder's
+                self._reindex(
+                    decoder, previous.function_plans, previous.event_plans, swap
+                )
+            else:
+                self._reindex(decoder, {}, {}, swap)
+            decoder.watch(self._reindex)
+        return decoder
+
+    def add_abi(
+        self, address: str | bytes, entries: list[dict], source: str | None = None
+    ) -> ABIDecoder:
+        """
+        Add ABI entries to a registered contract, eg. after a proxy upgrade or for
+        a diamond's facet, registering the contract if it is not yet.
+        """
+        with self._lock:
+            if (decoder := self.get(address)) is None:
+                decoder = ABIDecoder(entries, self.cache, self.plans, source=source)
+                return self.register(address, decoder)
+        # Reindexed by the decoder calling back `_reindex`
+        decoder.add_abi(entries, source)
+        return decoder
+
+    def remove_abi(self, address: str | bytes, entries: list[dict]) -> ABIDecoder:
+        decoder = self._lookup(address)
+        decoder.remove_abi(entries)
+        return decoder
+
+    def _reindex(
+        self,
+        decoder: ABIDecoder,
+        functions: Mapping[bytes, DecodePlan],
+        events: Mapping[bytes, EventPlan],
+        swap: bool = True,
+    ):
+        """
+        Move the index entries of `decoder` from its old `functions` and `events`
+        tables to its current ones.
+        """
+        with self._lock:
+            self.selectors = self._reindex_tables(
+                self.selectors,
+                functions,
+                decoder.function_plans,
+                attrgetter("function_plans"),
+                swap,
+            )
+            self.events = self._reindex_tables(
+                self.events,
+                events,
+                decoder.event_plans,
+                attrgetter("event_plans"),
+                swap,
+            )
+            self._expander = None
+            # Misses recorded against the indexes replaced above no longer hold
+            self._generation += 1
+            self.unknown.discard(
+                [key for key in decoder.function_plans if key not in functions]
+                + [key for key in decoder.event_plans if key not in events]
+            )
+
+    def _reindex_tables(
+        self,
+        index: PlanIndex[Plan],
+        old: Mapping[bytes, Plan],
+        new: Mapping[bytes, Plan],
+        table: Callable[[ABIDecoder], Mapping[bytes, Plan]],
+        swap: bool = True,
+    ) -> PlanIndex[Plan]:
+        # Swapped in as a copy, like the decoder's own tables, unless the registry
+        # is still being built
+        tables = dict(index.tables) if swap else index.tables
+        for key in old.keys() | new.keys():
+            # Keys indexed to another contract's table are left as they are
+            if (current := tables.get(key)) is not None and current is not old:
+                continue
+            if key in new:
+                tables[key] = new
+            else:
+                # The first other contract defining the key takes over, as in `register`
+                others = (table(d) for d in self.contracts.values())
+                if (other := next((t for t in others if key in t), None)) is None:
+                    tables.pop(key, None)
+                else:
+                    tables[key] = other
+        return PlanIndex(tables) if swap else index
+
+    def bind(
+        self,
+        address: str | bytes,
+        abi: list[dict],
+        from_block: int,
+        to_block: int | None = None,
+    ) -> VersionedABI:
+        """
+        Bind an ABI to an address from `from_block` to `to_block` inclusive, eg. a
+        proxy's implementation between two upgrades. Decoding with a `block`
+        uses the ABIs bound at that block, falling back to the one registered
+        for the address, if any.
+        """
+        address = hex_to_bytes(address)
+        with self._lock:
+            if (versions := self.versions.get(address)) is None:
+                versions = self.versions[address] = VersionedABI(
+                    cache=self.cache, plans=self.plans
+                )
+        versions.bind(abi, from_block, to_block)
+        return versions
+
+    def get(self, address: str | bytes, block: int | None = None) -> ABIDecoder | None:
+        address = hex_to_bytes(address)
+        if block is not None and (versions := self.versions.get(address)) is not None:
+            if (decoder := versions.at(block)) is not None:
+                return decoder
+        return self.contracts.get(address)
+
+    def _lookup(self, address: str | bytes, block: int | None = None) -> ABIDecoder:
+        if (decoder := self.get(address, block)) is None:
+            raise UnknownABI(address)
+        return decoder
+
+    def decode_call(
+        self,
+        to: str | bytes,
+        input: str | bytes,
+        expand: bool | CalldataExpander = False,
+        block: int | None = None,
+        **options: Any,
+    ):
+        """
+        Decode a call to a registered contract.
+        With `expand`, nested calls are probed against every registered selector.
+        With `block`, the call is decoded against the ABIs bound at that block.
+        Output options (`records`, `address_format`, `json`, `raw`) are passed
+        through to the contract's `ABIDecoder`.
+        """
+        if expand is True:
+            if self._expander is None:
+                self._expander = CalldataExpander(self.selectors)
+            expand = self._expander
+        return self._lookup(to, block).decode_function(input, expand, **options)
+
+    def _find(
+        self, index: Callable[[ABIRegistry], Mapping[bytes, Plan]], key: bytes
+    ) -> Plan | None:
+        # The generation is read before the index, so a miss in an index swapped
+        # out meanwhile is stamped with the generation before the swap
+        generation = self._generation
+        if self.unknown.known(key, generation):
+            self.unknown.add(key, generation)
+            return None
+        if (plan := index(self).get(key)) is None:
+            self.unknown.add(key, generation)
+        return plan
+
+    def try_decode_any_call(
+        self,
+        input: str | bytes,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ) -> DecodeResult:
+        """
+        Decode calldata against whichever registered ABI defines its selector,
+        eg. for calls to unregistered contracts.
+        """
+        input = hex_to_bytes(input)
+        selector = input[:4]
+        if (plan := self._find(attrgetter("selectors"), selector)) is None:
+            return DecodeResult(DecodeStatus.UNKNOWN_SELECTOR, selector)
+        return plan.try_decode(
+            input[4:], selector, records, address_format, get_policy(json), raw, limits
+        )
+
+    def try_decode_any_event(
+        self,
+        topics: list[str] | list[bytes],
+        memory: str | bytes,
+        records: bool = False,
+        address_format: AddressFormat | None = None,
+        json: bool | JSONPolicy = False,
+        raw: bool = False,
+        limits: DecodeLimits | None = None,
+    ) -> DecodeResult:
+        """
+        Decode a log against whichever registered ABI defines its topic.
+        """
+        if not topics:
+            return DecodeResult(DecodeStatus.UNKNOWN_SELECTOR, b"")
+
+        topics = list(map(hex_to_bytes, topics))
+        selector: bytes = topics[0]  # type: ignore
+        if (plan := self._find(attrgetter("events"), selector)) is None:
+            return DecodeResult(DecodeStatus.UNKNOWN_SELECTOR, selector)
+        return plan.try_decode(
+            topics[1:],  # type: ignore
+            hex_to_bytes(memory),
+            selector,
+            records,
+            address_format,
+            get_policy(json),
+            raw,
+            limits,
+        )
+
+    def decode_return(
+        self,
+        to: str | bytes,
+        output: str | bytes,
+        selector: str | bytes,
+        block: int | None = None,
+        **options: Any,
+    ):
+        return self._lookup(to, block).decode_return(output, selector, **options)
+
+    def decode_error(
+        self,
+        to: str | bytes,
+        output: str | bytes,
+        block: int | None = None,
+        **options: Any,
+    ):
+        if (decoder := self.get(to, block)) is not None:
+            return decoder.decode_error(output, **options)
+        # Standard reverts are decodable whether or not the contract is known
+        output = hex_to_bytes(output)
+        standard = decode_standard_error(
+            output,
+            options.get("records", False),
+            options.get("raw", False),
+            options.get("address_format"),
+            get_policy(options.get("json", False)),
+            options.get("limits"),
+        )
+        if standard is None:
+            raise UnknownABI(to)
+        return standard
+
+    def decode_event(
+        self,
+        address: str | bytes,
+        topics: list[str] | list[bytes],
+        memory: str | bytes,
+        block: int | None = None,
+        **options: Any,
+    ):
+        return self._lookup(address, block).decode_event(topics, memory, **options)
+
+    def try_decode_call(
+        self,
+        to: str | bytes,
+        input: str | bytes,
+        block: int | None = None,
+        **options: Any,
+    ) -> DecodeResult:
+        """
+        Decode a call like `decode_call`, reporting unknown contracts, unknown
+        selectors and invalid data in the returned `DecodeResult` instead of raising.
+        """
+        if (decoder := self.get(to, block)) is None:
+            input = hex_to_bytes(input)
+            return DecodeResult(DecodeStatus.UNKNOWN_CONTRACT, input[:4])
+        return decoder.try_decode_function(input, **options)
+
+    def try_decode_event(
+        self,
+        address: str | bytes,
+        topics: list[str] | list[bytes],
+        memory: str | bytes,
+        block: int | None = None,
+        **options: Any,
+    ) -> DecodeResult:
+        if (decoder := self.get(address, block)) is None:
+            selector = hex_to_bytes(topics[0]) if topics else b""
+            return DecodeResult(DecodeStatus.UNKNOWN_CONTRACT, selector)
+        return decoder.try_decode_event(topics, memory, **options)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+
+"""
+Non-raising decode results.
+
+In bulk decoding a large share of the input can be junk (spam tokens, garbage
+calldata), and raising an exception per bad item costs far more than decoding
+a good one. The `try_decode_*` methods report failures as a status instead.
+"""
+
+from __future__ import annotations
+
+from enum import IntEnum
+from typing import Any, NamedTuple
+
+
+class DecodeStatus(IntEnum):
+    OK = 0
+    # No ABI entry matches the selector or topic
+    UNKNOWN_SELECTOR = 1
+    # No ABI is registered for the address
+    UNKNOWN_CONTRACT = 2
+    # The data is shorter than the fixed size head of the parameters
+    TOO_SHORT = 3
+    # The data does not decode as the parameters
+    INVALID_DATA = 4
+    # The number of topics does not match the event's indexed parameters
+    INVALID_TOPICS = 5
+    # The data exceeds the budgets of the given `DecodeLimits`
+    LIMIT_EXCEEDED = 6
+
+
+class DecodeResult(NamedTuple):
+    """
+    `position` is the offset in the data at which decoding stopped, if it failed.
+    """
+
+    status: DecodeStatus
+    selector: bytes
+    value: Any = None
+    position: int | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.status is DecodeStatus.OK
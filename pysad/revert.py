@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""
+Fast path for the revert payloads built into Solidity, `Error(string)` and
+`Panic(uint256)`, which make up the bulk of reverts and are not part of any ABI.
+https://docs.soliditylang.org/en/latest/control-structures.html#panic-via-assert-and-error-via-require
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pysad.address import AddressFormat
+from pysad.errors import DecodingError
+from pysad.plan import DecodePlan
+from pysad.records import record_type
+from pysad.serialize import JSONPolicy
+from pysad.validate import DecodeLimits
+
+ERROR_SELECTOR = bytes.fromhex("08c379a0")
+PANIC_SELECTOR = bytes.fromhex("4e487b71")
+
+PANIC_CODES = {
+    0x00: "GENERIC",
+    0x01: "ASSERT",
+    0x11: "ARITHMETIC_OVERFLOW",
+    0x12: "DIVISION_BY_ZERO",
+    0x21: "INVALID_ENUM",
+    0x22: "INVALID_STORAGE_ENCODING",
+    0x31: "EMPTY_ARRAY_POP",
+    0x32: "ARRAY_OUT_OF_BOUNDS",
+    0x41: "OUT_OF_MEMORY",
+    0x51: "INVALID_FUNCTION",
+}
+
+# Used for anything the fast path does not handle, eg. non standard offsets, and
+# to shape the output of both paths alike
+ERROR_PLAN = DecodePlan([{"name": "message", "type": "string"}], "Error")
+PANIC_PLAN = DecodePlan([{"name": "code", "type": "uint256"}], "Panic")
+
+STANDARD_SELECTORS = frozenset([ERROR_SELECTOR, PANIC_SELECTOR])
+
+ERROR_RECORD = record_type("Error", ["message"])
+PANIC_RECORD = record_type("Panic", ["code", "reason"])
+
+
+def _decode_error_string(data: bytes, limits: DecodeLimits | None) -> tuple[str]:
+    # Standard layout: | offset = 0x20 | length | utf-8 bytes (padded) |
+    if limits is None and len(data) >= 68 and int.from_bytes(data[4:36], "big") == 32:
+        length = int.from_bytes(data[36:68], "big")
+        if 68 + length <= len(data):
+            try:
+                return (data[68 : 68 + length].decode(),)
+            except UnicodeDecodeError as e:
+                raise DecodingError from e
+
+    return ERROR_PLAN.decode_args(data[4:], limits)
+
+
+def _decode_panic(data: bytes, limits: DecodeLimits | None) -> tuple[int]:
+    if limits is not None:
+        PANIC_PLAN.shape_check(data[4:], limits)
+    if len(data) != 36:
+        raise DecodingError(f"Panic payload has length {len(data)}, expected 36")
+    return (int.from_bytes(data[4:36], "big"),)
+
+
+def decode_standard_error(
+    data: bytes,
+    records: bool = False,
+    raw: bool = False,
+    address: AddressFormat | None = None,
+    json: JSONPolicy | None = None,
+    limits: DecodeLimits | None = None,
+) -> dict[str, Any] | tuple | None:
+    """
+    Decode `Error(string)` and `Panic(uint256)` revert data, with the same output
+    options as decode plans. Returns None for any other selector.
+    With `raw`, returns the ABI values, `(message,)` or `(code,)`.
+    Panics also get the `reason` for their code, unless `raw`.
+    """
+    selector = data[:4]
+    if selector == ERROR_SELECTOR:
+        plan, args = ERROR_PLAN, _decode_error_string(data, limits)
+    elif selector == PANIC_SELECTOR:
+        plan, args = PANIC_PLAN, _decode_panic(data, limits)
+    else:
+        return None
+
+    if raw:
+        if records or address is not None or json is not None:
+            raise ValueError("Raw output can not be combined with other output modes")
+        return args
+    if plan is ERROR_PLAN:
+        return plan.get_shape(records, address, json)(args)
+
+    code = plan.get_shape(False, address, json)(args)["code"]
+    reason = PANIC_CODES.get(args[0])
+    return PANIC_RECORD(code, reason) if records else {"code": code, "reason": reason}
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+"""
+JSON output.
+
+Decode plans can shape results straight into JSON-ready trees, converting bytes,
+big integers and addresses while the tree is built rather than in a second walk
+over the default output. The conversions are set by a `JSONPolicy`.
+"""
+
+from __future__ import annotations
+
+import json
+from base64 import b64encode
+from collections.abc import Callable
+from typing import Any, Literal, NamedTuple
+
+from pysad.address import AddressFormat, get_address_converter
+
+BytesPolicy = Literal["hex", "base64"]
+IntPolicy = Literal["string", "hex", "int"]
+
+# Largest integer exactly representable by a double, ie. a JavaScript number
+MAX_SAFE_INTEGER = (1 << 53) - 1
+
+
+class JSONPolicy(NamedTuple):
+    """
+    `bytes` sets the encoding of bytes values, `big_int` that of integers beyond
+    ±2^53 - 1 and `address` the address format.
+    """
+
+    bytes: BytesPolicy = "hex"
+    big_int: IntPolicy = "string"
+    address: AddressFormat | None = None
+
+
+DEFAULT_POLICY = JSONPolicy()
+
+
+def _bytes_to_hex(value: bytes) -> str:
+    return "0x" + value.hex()
+
+
+def _bytes_to_base64(value: bytes) -> str:
+    return b64encode(value).decode()
+
+
+def _big_int_to_string(value: int) -> int | str:
+    return value if -MAX_SAFE_INTEGER <= value <= MAX_SAFE_INTEGER else str(value)
+
+
+def _big_int_to_hex(value: int) -> int | str:
+    return value if -MAX_SAFE_INTEGER <= value <= MAX_SAFE_INTEGER else hex(value)
+
+
+BYTES_CONVERTERS: dict[str, Callable[[bytes], str]] = {
+    "hex": _bytes_to_hex,
+    "base64": _bytes_to_base64,
+}
+
+BIG_INT_CONVERTERS: dict[str, Callable[[int], int | str] | None] = {
+    "string": _big_int_to_string,
+    "hex": _big_int_to_hex,
+    "int": None,
+}
+
+
+def get_json_converters(
+    policy: JSONPolicy,
+) -> tuple[Callable[[bytes], str], Callable[[int], Any] | None, Callable | None]:
+    """
+    Resolve a policy into its bytes, big integer and address converters.
+    """
+    if policy.address == "bytes":
+        raise ValueError("Addresses can not be output as bytes in JSON")
+    try:
+        return (
+            BYTES_CONVERTERS[policy.bytes],
+            BIG_INT_CONVERTERS[policy.big_int],
+            get_address_converter(policy.address),
+        )
+    except KeyError as e:
+        raise ValueError(f"Unknown JSON policy {e.args[0]!r}") from None
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Serialize a JSON-ready result into compact JSON bytes.
+    """
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def get_policy(json: bool | JSONPolicy) -> JSONPolicy | None:
+    if json is True:
+        return DEFAULT_POLICY
+    return json or None
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+
+"""
+Selector tables.
+
+Plans are interned by the content of their compact fragment, so contracts sharing
+an entry, eg. the `Transfer` event of every ERC-20 token, share a single plan.
+
+A registry can hold far more ABIs than are ever decoded against. Lazy tables keep
+only the selector to ABI fragment index and compile the plan of a selector on
+first use into a shared, bounded `PlanCache`. The registry-wide index maps each
+selector to the table defining it, so registering a lazy decoder compiles nothing.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator, Mapping
+from functools import partial
+from threading import Lock
+from typing import Any, TypeVar
+from weakref import WeakValueDictionary
+
+from pysad.cache import PlanCache
+from pysad.fragment import Fragment
+from pysad.plan import DecodePlan, EventPlan
+
+Plan = TypeVar("Plan", DecodePlan, EventPlan)
+
+
+_PLANS: WeakValueDictionary[tuple[Callable, Fragment], Any] = WeakValueDictionary()
+_PLANS_LOCK = Lock()
+
+
+def intern_plan(compile: Callable[[Fragment], Plan], fragment: Fragment) -> Plan:
+    """
+    Compile the plan of `fragment`, sharing it with every decoder holding an
+    identical fragment for as long as any of them uses it.
+    """
+    key = (compile, fragment)
+    with _PLANS_LOCK:
+        plan = _PLANS.get(key)
+    if plan is None:
+        # Compiled outside the lock, the first plan stored wins any race
+        plan = compile(fragment)
+        with _PLANS_LOCK:
+            plan = _PLANS.setdefault(key, plan)
+    return plan
+
+
+def cached_plan(
+    cache: PlanCache, compile: Callable[[Fragment], Plan], fragment: Fragment
+) -> Plan:
+    return cache.get_or_compile(
+        (compile, fragment), partial(intern_plan, compile, fragment)
+    )
+
+
+class LazyPlans(Mapping[bytes, Plan]):
+    """
+    The plans of a fragment table, compiled with `compile` on first use and kept
+    in `cache`, keyed by the fragment's content.
+    """
+
+    __slots__ = ("fragments", "compile", "cache")
+
+    def __init__(
+        self,
+        fragments: Mapping[bytes, Fragment],
+        compile: Callable[[Fragment], Plan],
+        cache: PlanCache,
+    ):
+        self.fragments = fragments
+        self.compile = compile
+        self.cache = cache
+
+    def __getitem__(self, selector: bytes) -> Plan:
+        return cached_plan(self.cache, self.compile, self.fragments[selector])
+
+    def get(self, selector: bytes, default: Plan | None = None) -> Plan | None:
+        if (fragment := self.fragments.get(selector)) is None:
+            return default
+        return cached_plan(self.cache, self.compile, fragment)
+
+    def __contains__(self, selector: object) -> bool:
+        return selector in self.fragments
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self.fragments)
+
+    def __len__(self) -> int:
+        return len(self.fragments)
+
+
+class PlanIndex(Mapping[bytes, Plan]):
+    """
+    Maps selectors to the plans of the tables defining them, without resolving
+    any plan until it is looked up.
+    """
+
+    __slots__ = ("tables",)
+
+    tables: dict[bytes, Mapping[bytes, Plan]]
+
+    def __init__(self, tables: dict[bytes, Mapping[bytes, Plan]] | None = None):
+        self.tables = tables if tables is not None else {}
+
+    def __getitem__(self, selector: bytes) -> Plan:
+        return self.tables[selector][selector]
+
+    def get(self, selector: bytes, default: Plan | None = None) -> Plan | None:
+        if (table := self.tables.get(selector)) is None:
+            return default
+        return table.get(selector, default)
+
+    def __contains__(self, selector: object) -> bool:
+        return selector in self.tables
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self.tables)
+
+    def __len__(self) -> int:
+        return len(self.tables)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+"""
+Decoding of `callTracer` traces.
+
+Frames are walked iteratively with an explicit stack, so arbitrarily deep traces
+do not hit the interpreter recursion limit, and results are yielded one frame at
+a time so huge traces never have to be materialised.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from itertools import islice
+from typing import Any, NamedTuple
+
+from pysad.decoder import ABIDecoder
+from pysad.errors import PySADError
+from pysad.precompiled import PrecompileSet, get_precompiles
+from pysad.registry import ABIRegistry
+from pysad.revert import decode_standard_error
+from pysad.utils import hex_to_bytes
+
+CREATE_TYPES = frozenset(["CREATE", "CREATE2"])
+
+
+class TraceFrame(NamedTuple):
+    path: tuple[int, ...]
+    frame: dict
+
+
+class DecodedFrame(NamedTuple):
+    path: tuple[int, ...]
+    type: str
+    to: str | None
+    precompiled: bool
+    input: dict[str, Any] | None
+    output: dict[str, Any] | None
+    revert: dict[str, Any] | None
+    exception: PySADError | None
+
+
+def walk_trace(trace: dict) -> Iterator[TraceFrame]:
+    """
+    Yield every frame of a trace in execution (pre-)order along with its path,
+    the indices of the `calls` taken from the root to reach it.
+    """
+    stack: list[TraceFrame] = [TraceFrame((), trace)]
+    while stack:
+        item = stack.pop()
+        yield item
+
+        calls = item.frame.get("calls") or ()
+        for i in range(len(calls) - 1, -1, -1):
+            stack.append(TraceFrame((*item.path, i), calls[i]))
+
+
+def _frame_target(frame: dict) -> str | None:
+    if frame.get("type", "CALL").upper() in CREATE_TYPES:
+        return None
+    return frame.get("to")
+
+
+def decode_frame(
+    item: TraceFrame,
+    registry: ABIRegistry,
+    decoder: ABIDecoder | None = None,
+    precompiles: PrecompileSet | None = None,
+) -> DecodedFrame:
+    """
+    Decode a single frame's input and output.
+    Decoding failures are reported on the result rather than raised.
+    """
+    precompiles = precompiles or get_precompiles()
+    path, frame = item
+    type = frame.get("type", "CALL").upper()
+    to = _frame_target(frame)
+    input = frame.get("input") or "0x"
+    output = frame.get("output") or "0x"
+    reverted = "error" in frame
+
+    decoded_input = decoded_output = revert = exception = None
+    precompile = precompiles.lookup(to) if to is not None else None
+    precompiled = precompile is not None
+
+    try:
+        if precompile is not None:
+            decoded_input = precompile.layout.decode(hex_to_bytes(input))
+            if not reverted and len(output) > 2:
+                decoded_output = precompile.output.decode(hex_to_bytes(output))
+        elif to is not None and (decoder := decoder or registry.get(to)):
+            decoded_input = decoder.decode_function(input)
+            if reverted:
+                if len(output) > 2:
+                    revert = decoder.decode_error(output)
+            else:
+                decoded_output = decoder.decode_return(output, hex_to_bytes(input)[:4])
+        elif reverted:
+            revert = decode_standard_error(hex_to_bytes(output))
+    except PySADError as e:
+        exception = e
+
+    return DecodedFrame(
+        path,
+        type,
+        to,
+        precompiled,
+        decoded_input,
+        decoded_output,
+        revert,
+        exception,
+    )
+
+
+def _decode_batch(
+    batch: list[TraceFrame], registry: ABIRegistry, precompiles: PrecompileSet
+) -> list[DecodedFrame]:
+    # Group the frames by their target so that each decoder is resolved once and
+    # frames hitting the same selectors are decoded back to back with the same plans
+    groups: dict[str | None, list[int]] = {}
+    for i, item in enumerate(batch):
+        to = _frame_target(item.frame)
+        groups.setdefault(to.lower() if to else None, []).append(i)
+
+    results: list[DecodedFrame | None] = [None] * len(batch)
+    for to, indices in groups.items():
+        decoder = registry.get(to) if to else None
+        for i in indices:
+            results[i] = decode_frame(batch[i], registry, decoder, precompiles)
+
+    return results  # type: ignore
+
+
+def decode_trace(
+    trace: dict,
+    registry: ABIRegistry,
+    batch_size: int | None = None,
+    chain_id: int | None = None,
+) -> Iterator[DecodedFrame]:
+    """
+    Decode every frame of a `callTracer` trace, yielding results in execution order.
+
+    With `batch_size`, frames are read in chunks of that size and decoded grouped
+    by target within each chunk, keeping memory bounded by the chunk.
+    With `chain_id`, only that chain's precompiles are treated as such.
+    """
+    frames = walk_trace(trace)
+    precompiles = get_precompiles(chain_id)
+
+    if batch_size is None:
+        for item in frames:
+            yield decode_frame(item, registry, precompiles=precompiles)
+        return
+
+    while batch := list(islice(frames, batch_size)):
+        yield from _decode_batch(batch, registry, precompiles)
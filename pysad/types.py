@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
-from typing import Literal
+from collections.abc import Mapping
+from typing import Any, Literal
 
-SelectorABIMapping = dict[bytes, dict]
+SelectorABIMapping = dict[bytes, Mapping[str, Any]]
 ABITypes = Literal["function", "error", "event", "constructor"]
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+
+"""
+Decoding of Uniswap Universal Router command streams.
+
+`execute(bytes commands, bytes[] inputs[, uint256 deadline])` packs one command
+per byte of `commands`, each with its own ABI encoded `inputs[i]`.
+The per-command layouts below are compiled into decode plans once at import.
+
+Command reference: https://github.com/Uniswap/universal-router/blob/main/contracts/libraries/Commands.sol
+"""
+
+from __future__ import annotations
+
+from typing import Any, NamedTuple
+
+from eth_utils.abi import function_signature_to_4byte_selector
+
+from pysad.errors import DecodingError, UnknownABI
+from pysad.plan import DecodePlan
+from pysad.utils import hex_to_bytes
+
+# Flag set on a command byte when the router should continue if the command reverts
+FLAG_ALLOW_REVERT = 0x80
+COMMAND_TYPE_MASK = 0x3F
+
+# V3 paths are packed as token (20 bytes) followed by fee (3 bytes) + token hops
+V3_ADDRESS_SIZE = 20
+V3_FEE_SIZE = 3
+V3_HOP_SIZE = V3_ADDRESS_SIZE + V3_FEE_SIZE
+
+
+def _params(*specs: str | dict) -> list[dict]:
+    """
+    Build ABI parameters from "type name" strings, passing through dict entries.
+    """
+    params = []
+    for spec in specs:
+        if isinstance(spec, dict):
+            params.append(spec)
+        else:
+            type, name = spec.split()
+            params.append({"name": name, "type": type})
+    return params
+
+
+PERMIT_DETAILS = _params(
+    "address token", "uint160 amount", "uint48 expiration", "uint48 nonce"
+)
+
+PERMIT_SINGLE = {
+    "name": "permitSingle",
+    "type": "tuple",
+    "components": [
+        {"name": "details", "type": "tuple", "components": PERMIT_DETAILS},
+        *_params("address spender", "uint256 sigDeadline"),
+    ],
+}
+
+PERMIT_BATCH = {
+    "name": "permitBatch",
+    "type": "tuple",
+    "components": [
+        {"name": "details", "type": "tuple[]", "components": PERMIT_DETAILS},
+        *_params("address spender", "uint256 sigDeadline"),
+    ],
+}
+
+ALLOWANCE_TRANSFER_DETAILS = {
+    "name": "batchDetails",
+    "type": "tuple[]",
+    "components": _params(
+        "address from", "address to", "uint160 amount", "address token"
+    ),
+}
+
+_V3_SWAP = ("address recipient", "bytes path", "bool payerIsUser")
+_V2_SWAP = ("address recipient", "address[] path", "bool payerIsUser")
+_MARKET = ("uint256 value", "bytes data")
+_MARKET_721 = (*_MARKET, "address recipient", "address token", "uint256 id")
+_MARKET_1155 = (*_MARKET_721, "uint256 amount")
+
+# Command type -> (name, input parameters)
+COMMANDS: dict[int, tuple[str, list[dict]]] = {
+    0x00: (
+        "V3_SWAP_EXACT_IN",
+        _params(_V3_SWAP[0], "uint256 amountIn", "uint256 amountOutMin", *_V3_SWAP[1:]),
+    ),
+    0x01: (
+        "V3_SWAP_EXACT_OUT",
+        _params(_V3_SWAP[0], "uint256 amountOut", "uint256 amountInMax", *_V3_SWAP[1:]),
+    ),
+    0x02: (
+        "PERMIT2_TRANSFER_FROM",
+        _params("address token", "address recipient", "uint160 amount"),
+    ),
+    0x03: ("PERMIT2_PERMIT_BATCH", _params(PERMIT_BATCH, "bytes signature")),
+    0x04: ("SWEEP", _params("address token", "address recipient", "uint256 amountMin")),
+    0x05: ("TRANSFER", _params("address token", "address recipient", "uint256 value")),
+    0x06: (
+        "PAY_PORTION",
+        _params("address token", "address recipient", "uint256 bips"),
+    ),
+    0x08: (
+        "V2_SWAP_EXACT_IN",
+        _params(_V2_SWAP[0], "uint256 amountIn", "uint256 amountOutMin", *_V2_SWAP[1:]),
+    ),
+    0x09: (
+        "V2_SWAP_EXACT_OUT",
+        _params(_V2_SWAP[0], "uint256 amountOut", "uint256 amountInMax", *_V2_SWAP[1:]),
+    ),
+    0x0A: ("PERMIT2_PERMIT", _params(PERMIT_SINGLE, "bytes signature")),
+    0x0B: ("WRAP_ETH", _params("address recipient", "uint256 amountMin")),
+    0x0C: ("UNWRAP_WETH", _params("address recipient", "uint256 amountMin")),
+    0x0D: ("PERMIT2_TRANSFER_FROM_BATCH", _params(ALLOWANCE_TRANSFER_DETAILS)),
+    0x0E: (
+        "BALANCE_CHECK_ERC20",
+        _params("address owner", "address token", "uint256 minBalance"),
+    ),
+    0x10: ("SEAPORT", _params(*_MARKET)),
+    0x11: ("LOOKS_RARE_721", _params(*_MARKET_721)),
+    0x12: ("NFTX", _params(*_MARKET)),
+    0x13: (
+        "CRYPTOPUNKS",
+        _params("uint256 punkId", "address recipient", "uint256 value"),
+    ),
+    0x14: ("LOOKS_RARE_1155", _params(*_MARKET_1155)),
+    0x15: ("OWNER_CHECK_721", _params("address owner", "address token", "uint256 id")),
+    0x16: (
+        "OWNER_CHECK_1155",
+        _params("address owner", "address token", "uint256 id", "uint256 minBalance"),
+    ),
+    0x17: ("SWEEP_ERC721", _params("address token", "address recipient", "uint256 id")),
+    0x18: ("X2Y2_721", _params(*_MARKET_721)),
+    0x19: ("SUDOSWAP", _params(*_MARKET)),
+    0x1A: ("NFT20", _params(*_MARKET)),
+    0x1B: ("X2Y2_1155", _params(*_MARKET_1155)),
+    0x1C: ("FOUNDATION", _params(*_MARKET_721)),
+    0x1D: (
+        "SWEEP_ERC1155",
+        _params("address token", "address recipient", "uint256 id", "uint256 amount"),
+    ),
+    0x1E: ("ELEMENT_MARKET", _params(*_MARKET)),
+    0x20: ("SEAPORT_V1_4", _params(*_MARKET)),
+    0x21: ("EXECUTE_SUB_PLAN", _params("bytes commands", "bytes[] inputs")),
+    # `spender` is the router's `Spenders` enum, 0 for OpenSea and 1 for Sudoswap
+    0x22: ("APPROVE_ERC20", _params("address token", "uint256 spender")),
+}
+
+V3_SWAP_COMMANDS = frozenset([0x00, 0x01])
+EXECUTE_SUB_PLAN = 0x21
+# Sub-plans are decoded recursively, nesting is bounded to stay clear of the
+# interpreter recursion limit
+MAX_SUB_PLAN_DEPTH = 32
+
+# Compile every command layout once
+COMMAND_PLANS: dict[int, DecodePlan] = {
+    command: DecodePlan(inputs) for command, (_, inputs) in COMMANDS.items()
+}
+
+EXECUTE_PLANS: dict[bytes, DecodePlan] = {
+    function_signature_to_4byte_selector("execute(bytes,bytes[])"): DecodePlan(
+        _params("bytes commands", "bytes[] inputs")
+    ),
+    function_signature_to_4byte_selector("execute(bytes,bytes[],uint256)"): DecodePlan(
+        _params("bytes commands", "bytes[] inputs", "uint256 deadline")
+    ),
+}
+
+
+class RouterCommand(NamedTuple):
+    index: int
+    command: int
+    name: str | None
+    allow_revert: bool
+    input: bytes
+    args: dict[str, Any] | None
+
+
+def decode_v3_path(path: bytes) -> list[dict[str, Any]]:
+    """
+    Unpack a packed V3 path into its hops.
+    """
+    if len(path) < V3_ADDRESS_SIZE + V3_HOP_SIZE or (
+        (len(path) - V3_ADDRESS_SIZE) % V3_HOP_SIZE
+    ):
+        raise DecodingError(f"Invalid V3 path length {len(path)}")
+
+    hops = []
+    for start in range(0, len(path) - V3_ADDRESS_SIZE, V3_HOP_SIZE):
+        fee_start = start + V3_ADDRESS_SIZE
+        token_start = fee_start + V3_FEE_SIZE
+        hops.append(
+            {
+                "tokenIn": "0x" + path[start:fee_start].hex(),
+                "fee": int.from_bytes(path[fee_start:token_start], "big"),
+                "tokenOut": "0x"
+                + path[token_start : token_start + V3_ADDRESS_SIZE].hex(),
+            }
+        )
+    return hops
+
+
+def decode_command(
+    index: int, command_byte: int, input: bytes, depth: int = 0
+) -> RouterCommand:
+    """
+    Decode a single command. The `commands` of an `EXECUTE_SUB_PLAN` are decoded
+    into the `RouterCommand`s of the sub-plan, which replace its `inputs`.
+    """
+    command = command_byte & COMMAND_TYPE_MASK
+    allow_revert = bool(command_byte & FLAG_ALLOW_REVERT)
+
+    if (plan := COMMAND_PLANS.get(command)) is None:
+        return RouterCommand(index, command, None, allow_revert, input, None)
+
+    args = plan.decode(input)
+    if command in V3_SWAP_COMMANDS:
+        args["path"] = decode_v3_path(args["path"])
+    elif command == EXECUTE_SUB_PLAN:
+        args = {
+            "commands": decode_commands(args["commands"], args["inputs"], depth + 1)
+        }
+
+    return RouterCommand(
+        index, command, COMMANDS[command][0], allow_revert, input, args
+    )
+
+
+def decode_commands(
+    commands: bytes | str, inputs: list[bytes], depth: int = 0
+) -> list[RouterCommand]:
+    """
+    Decode an already split command stream and its inputs.
+    """
+    commands = hex_to_bytes(commands)
+    if len(commands) != len(inputs):
+        raise DecodingError(
+            f"Received {len(commands)} commands but {len(inputs)} inputs"
+        )
+    if depth > MAX_SUB_PLAN_DEPTH:
+        raise DecodingError(f"Sub-plans nested deeper than {MAX_SUB_PLAN_DEPTH}")
+
+    return [
+        decode_command(index, command, input, depth)
+        for index, (command, input) in enumerate(zip(commands, inputs))
+    ]
+
+
+def decode_execute(input: bytes | str) -> list[RouterCommand]:
+    """
+    Decode the command stream of a Universal Router `execute` call.
+    """
+    input = hex_to_bytes(input)
+    if (plan := EXECUTE_PLANS.get(input[:4])) is None:
+        raise UnknownABI()
+
+    args = plan.decode_args(input[4:])
+    return decode_commands(args[0], list(args[1]))
@@ -2,8 +2,7 @@
 
 from __future__ import annotations
 
-from collections.abc import Iterable
-from copy import deepcopy
+from collections.abc import Iterable, Mapping, Sequence
 from itertools import starmap
 from typing import Any, cast
 
@@ -54,12 +53,17 @@ def get_log_inputs(inputs: list[dict]) -> tuple[list[bool], list[bool]]:
     return reference, indexed
 
 
-def fix_reference_log_inputs(inputs: list[dict]) -> list[dict]:
-    _inputs = deepcopy(inputs)
-    for i in _inputs:
-        if is_reference_type(i):
-            i["type"] = "bytes32"
-    return _inputs
+def fix_reference_log_inputs(inputs: Sequence[Mapping]) -> list[Mapping]:
+    # Only indexed reference types are hashed, the others are decoded in full
+    return [
+        _as_bytes32(i) if i.get("indexed") and is_reference_type(i) else i
+        for i in inputs
+    ]
+
+
+def _as_bytes32(input: Mapping) -> dict:
+    # A reference type replaced by its hash has no components
+    return {**{k: v for k, v in input.items() if k != "components"}, "type": "bytes32"}
 
 
 def is_equivalent_runtime_opcode(runtime: Instruction, init: Instruction):
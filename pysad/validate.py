@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+
+"""
+Shape checks run before decoding.
+
+Adversarial calldata can claim huge lengths or point many offsets at the same
+region, making eth_abi allocate and scan far more than the input size before it
+fails. A shape check is compiled once per parameter list and walks only the
+offsets and lengths of an input, verifying that they stay in bounds and within
+the byte, element and depth budgets of a `DecodeLimits`.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+from typing import NamedTuple, cast
+
+from eth_abi.grammar import ABIType, TupleType, parse
+
+from pysad.errors import InvalidShape, LimitExceeded
+
+DEFAULT_MAX_DEPTH = 32
+
+
+class DecodeLimits(NamedTuple):
+    """
+    `max_bytes` caps both the input length and the total length of its bytes and
+    string values, `max_elements` the total number of array elements and
+    `max_depth` the nesting of dynamic values. None leaves a budget unlimited.
+    """
+
+    max_bytes: int | None = None
+    max_elements: int | None = None
+    max_depth: int = DEFAULT_MAX_DEPTH
+
+
+class _Budget:
+    """
+    Mutable budgets of a single check.
+    """
+
+    __slots__ = ("bytes", "elements", "depth")
+
+    def __init__(self, limits: DecodeLimits):
+        self.bytes = limits.max_bytes
+        self.elements = limits.max_elements
+        self.depth = limits.max_depth
+
+    def spend_bytes(self, length: int, position: int):
+        if self.bytes is not None:
+            self.bytes -= length
+            if self.bytes < 0:
+                raise LimitExceeded("Byte budget exceeded", position)
+
+    def spend_elements(self, length: int, position: int):
+        if self.elements is not None:
+            self.elements -= length
+            if self.elements < 0:
+                raise LimitExceeded("Element budget exceeded", position)
+
+
+# Checks the value encoded at the given absolute position
+Check = Callable[[bytes, int, _Budget], None]
+
+
+def _read_word(data: bytes, position: int) -> int:
+    if position + 32 > len(data):
+        raise InvalidShape(
+            f"Word at {position} runs past the input length {len(data)}", position
+        )
+    return int.from_bytes(data[position : position + 32], "big")
+
+
+def _static_size(abi_type: ABIType) -> int:
+    # Arrays of tuples are tuple types too, so arrays are told apart first
+    if abi_type.is_array:
+        return _static_size(abi_type.item_type) * abi_type.arrlist[-1][0]  # type: ignore
+    elif isinstance(abi_type, TupleType):
+        return sum(_static_size(c) for c in abi_type.components)
+    return 32
+
+
+def _head_size(abi_type: ABIType) -> int:
+    return 32 if abi_type.is_dynamic else _static_size(abi_type)
+
+
+def head_size(types: Sequence[str]) -> int:
+    """
+    The number of bytes taken by the head of the ABI encoding of `types`, ie. the
+    minimum length of any valid encoding.
+    """
+    return sum(_head_size(cast(ABIType, parse(t))) for t in types)
+
+
+def _check_bytes(data: bytes, position: int, budget: _Budget):
+    length = _read_word(data, position)
+    if length > len(data) - position - 32:
+        raise InvalidShape(
+            f"Length {length} at {position} exceeds the remaining input", position
+        )
+    budget.spend_bytes(length, position)
+
+
+def _compile_frame(components: Sequence[ABIType]) -> Check:
+    """
+    Check a tuple encoding: a head of static values and offsets, relative to the
+    start of the frame, to the dynamic values.
+    """
+    frame_size = sum(_head_size(c) for c in components)
+    dynamic = []
+    head = 0
+    for component in components:
+        if component.is_dynamic:
+            dynamic.append((head, compile_check(component)))
+        head += _head_size(component)
+
+    def check(data: bytes, start: int, budget: _Budget):
+        if start + frame_size > len(data):
+            raise InvalidShape(
+                f"Head of {frame_size} bytes at {start} runs past the input length "
+                f"{len(data)}",
+                start,
+            )
+
+        budget.depth -= 1
+        if budget.depth < 0:
+            raise LimitExceeded("Nesting depth exceeded", start)
+
+        for head, component_check in dynamic:
+            offset = _read_word(data, start + head)
+            if offset > len(data) - start:
+                raise InvalidShape(
+                    f"Offset {offset} at {start + head} points past the input",
+                    start + head,
+                )
+            component_check(data, start + offset, budget)
+
+        budget.depth += 1
+
+    return check
+
+
+def _compile_dynamic_array(item_type: ABIType) -> Check:
+    item_size = _head_size(item_type)
+    item_check = compile_check(item_type) if item_type.is_dynamic else None
+
+    def check(data: bytes, position: int, budget: _Budget):
+        length = _read_word(data, position)
+        content = position + 32
+        if length * item_size > len(data) - content:
+            raise InvalidShape(
+                f"Array of {length} elements at {position} exceeds the remaining input",
+                position,
+            )
+        budget.spend_elements(length, position)
+
+        if item_check is None:
+            return
+
+        # Dynamic items are encoded as a frame of offsets relative to its start
+        budget.depth -= 1
+        if budget.depth < 0:
+            raise LimitExceeded("Nesting depth exceeded", position)
+
+        for head in range(content, content + 32 * length, 32):
+            offset = _read_word(data, head)
+            if offset > len(data) - content:
+                raise InvalidShape(
+                    f"Offset {offset} at {head} points past the input", head
+                )
+            item_check(data, content + offset, budget)
+
+        budget.depth += 1
+
+    return check
+
+
+def compile_check(abi_type: ABIType) -> Check:
+    """
+    Compile the check of a dynamic value, given the position its offset points to.
+    """
+    if abi_type.is_array:
+        item_type = abi_type.item_type
+        if not abi_type.arrlist[-1]:  # type: ignore
+            return _compile_dynamic_array(item_type)
+        # A fixed size array of dynamic items is encoded like a tuple
+        return _compile_frame([item_type] * abi_type.arrlist[-1][0])  # type: ignore
+
+    elif isinstance(abi_type, TupleType):
+        return _compile_frame(abi_type.components)
+
+    return _check_bytes
+
+
+class ShapeCheck:
+    """
+    A compiled shape check of the ABI encoding of `types`.
+    """
+
+    __slots__ = ("check", "static")
+
+    def __init__(self, types: Sequence[str]):
+        abi_types = [cast(ABIType, parse(t)) for t in types]
+        self.check = _compile_frame(abi_types)
+        # Static encodings have a single valid length, the size of their head
+        self.static = not any(t.is_dynamic for t in abi_types)
+
+    def __call__(self, data: bytes, limits: DecodeLimits):
+        if limits.max_bytes is not None and len(data) > limits.max_bytes:
+            raise LimitExceeded(
+                f"Input length {len(data)} exceeds {limits.max_bytes} bytes", 0
+            )
+        self.check(data, 0, _Budget(limits))
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""
+Block-versioned ABI bindings.
+
+Proxies change implementation over time, so decoding a historical transaction
+needs the ABI which was live at its block. An address' bindings are cut into
+segments at every block where a binding starts or ends, and a block is resolved
+to its segment by bisecting their starts. Each distinct set of overlapping
+bindings, eg. a proxy's own ABI together with its implementation at the time,
+is merged into a single decoder when first used.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_right
+from threading import Lock
+from typing import NamedTuple
+
+from pysad.cache import PlanCache, ResultCache
+from pysad.decoder import ABIDecoder
+
+
+class Binding(NamedTuple):
+    """
+    An ABI live from `from_block` to `to_block`, inclusive.
+    None leaves the binding open ended.
+    """
+
+    abi: list[dict]
+    from_block: int
+    to_block: int | None = None
+
+    @property
+    def source(self) -> str:
+        """
+        The block range, as the source of the binding's entries in merged decoders.
+        """
+        return f"{self.from_block}-{'' if self.to_block is None else self.to_block}"
+
+
+class _Segments(NamedTuple):
+    # The first block of each segment, in order
+    starts: list[int]
+    # The indexes of the bindings live in each segment, in binding order
+    active: list[tuple[int, ...]]
+
+
+def _segments(bindings: list[Binding]) -> _Segments:
+    bounds = {binding.from_block for binding in bindings}
+    bounds.update(b.to_block + 1 for b in bindings if b.to_block is not None)
+
+    starts = sorted(bounds)
+    active = [
+        tuple(
+            i
+            for i, binding in enumerate(bindings)
+            if binding.from_block <= start
+            and (binding.to_block is None or start <= binding.to_block)
+        )
+        for start in starts
+    ]
+    return _Segments(starts, active)
+
+
+class VersionedABI:
+    """
+    The ABI bindings of a single address, resolving blocks in O(log k) for k
+    bindings.
+    """
+
+    bindings: list[Binding]
+    cache: ResultCache | None
+    plans: PlanCache | None
+
+    def __init__(
+        self,
+        bindings: list[Binding] | None = None,
+        cache: ResultCache | None = None,
+        plans: PlanCache | None = None,
+    ):
+        self.bindings = []
+        self.cache = cache
+        self.plans = plans
+        self._segments = _Segments([], [])
+        self._decoders: dict[tuple[int, ...], ABIDecoder] = {}
+        self._lock = Lock()
+        for binding in bindings or []:
+            self.bind(*binding)
+
+    def bind(self, abi: list[dict], from_block: int, to_block: int | None = None):
+        if to_block is not None and to_block < from_block:
+            raise ValueError(f"Binding ends at {to_block} before it starts")
+
+        # Swapped in as copies, so concurrent lookups see the old or new bindings
+        with self._lock:
+            bindings = [*self.bindings, Binding(abi, from_block, to_block)]
+            self.bindings = bindings
+            self._segments = _segments(bindings)
+            self._decoders = {}
+
+    def at(self, block: int) -> ABIDecoder | None:
+        """
+        The decoder merging every ABI live at `block`, with later bindings as the
+        primary entries on colliding selectors. None if no ABI is bound at `block`.
+        """
+        starts, active = self._segments
+        if (i := bisect_right(starts, block) - 1) < 0 or not (live := active[i]):
+            return None
+
+        decoders = self._decoders
+        if (decoder := decoders.get(live)) is None:
+            decoder = ABIDecoder([], self.cache, self.plans)
+            for i in live:
+                binding = self.bindings[i]
+                decoder.add_abi(binding.abi, binding.source)
+            # Keep the decoder built first if another thread raced to build it
+            decoder = decoders.setdefault(live, decoder)
+        return decoder
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+import pytest
+from pysad.decoder import ABIDecoder
+from pysad.errors import UnknownABI
+from pysad.registry import ABIRegistry
+
+from .abis import PERMIT2_ABI, WETH_ABI
+
+PROXY = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+TRANSFER = "0xa9059cbb000000000000000000000000eb093c39fc8ded8c4d043c367d4bd75321e8a7c60000000000000000000000000000000000000000000000000577f9efb3eee9c1"
+LOCKDOWN = bytes.fromhex("cc53287f") + bytes.fromhex("20".rjust(64, "0")) + bytes(32)
+
+WETH_FUNCTIONS = [e for e in WETH_ABI if e["type"] == "function"]
+LOCKDOWN_ABI = [e for e in PERMIT2_ABI if e.get("name") in ("lockdown", "Lockdown")]
+
+
+def test_add_remove_abi():
+    decoder = ABIDecoder(WETH_FUNCTIONS)
+    plan = decoder.function_plans[bytes.fromhex("a9059cbb")]
+    functions = decoder.function_plans
+
+    decoder.add_abi(LOCKDOWN_ABI)
+    assert decoder.decode_function(LOCKDOWN) == {"approvals": []}
+    assert len(decoder.event_plans) == 1
+    # Plans of other entries are kept and earlier tables are left untouched
+    assert decoder.function_plans[bytes.fromhex("a9059cbb")] is plan
+    assert bytes.fromhex("cc53287f") not in functions
+
+    decoder.remove_abi(LOCKDOWN_ABI)
+    with pytest.raises(UnknownABI):
+        decoder.decode_function(LOCKDOWN)
+    assert decoder.decode_function(TRANSFER)["wad"] == 0x577F9EFB3EEE9C1
+
+
+def test_registry_add_remove_abi():
+    registry = ABIRegistry({PROXY: WETH_FUNCTIONS})
+    assert not registry.try_decode_any_call(LOCKDOWN).ok
+
+    # A proxy upgrade adding functions updates the registry-wide indexes
+    registry.add_abi(PROXY, LOCKDOWN_ABI)
+    assert registry.decode_call(PROXY, LOCKDOWN) == {"approvals": []}
+    assert registry.try_decode_any_call(LOCKDOWN).ok
+    assert bytes.fromhex("cc53287f") not in registry.unknown
+
+    registry.remove_abi(PROXY, LOCKDOWN_ABI)
+    assert bytes.fromhex("cc53287f") not in registry.selectors
+    assert not registry.try_decode_any_call(LOCKDOWN).ok
+    assert registry.try_decode_any_call(TRANSFER).ok
+
+
+def test_registry_reregister():
+    registry = ABIRegistry({PROXY: WETH_FUNCTIONS})
+    weth = registry.contracts[bytes.fromhex(PROXY[2:])]
+    assert registry.try_decode_any_call(TRANSFER).ok
+
+    # The replaced decoder's selectors leave the index with it
+    registry.register(PROXY, PERMIT2_ABI)
+    assert not registry.try_decode_any_call(TRANSFER).ok
+    assert registry.try_decode_any_call(LOCKDOWN).ok
+    assert registry.decode_call(PROXY, LOCKDOWN) == {"approvals": []}
+
+    # And its later updates are no longer indexed
+    weth.add_abi(WETH_ABI)
+    assert set(registry.events) == set(registry.get(PROXY).event_plans)
+
+
+def test_registry_decoder_updates():
+    registry = ABIRegistry({PROXY: WETH_FUNCTIONS})
+    decoder = registry.get(PROXY)
+    registry.decode_call(PROXY, TRANSFER, expand=True)
+
+    # Updates made on a registered decoder directly are indexed too
+    decoder.add_abi(LOCKDOWN_ABI)
+    assert registry.try_decode_any_call(LOCKDOWN).ok
+    assert registry._expander is None
+    decoder.remove_abi(WETH_FUNCTIONS)
+    assert not registry.try_decode_any_call(TRANSFER).ok
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import pytest
+from pysad.address import checksum_address
+from pysad.decoder import ABIDecoder
+
+from .abis import PERMIT2_ABI, WETH_ABI
+
+TRANSFER = "0xa9059cbb000000000000000000000000eb093c39fc8ded8c4d043c367d4bd75321e8a7c60000000000000000000000000000000000000000000000000577f9efb3eee9c1"
+
+
+@pytest.mark.parametrize(
+    "address_format,expected",
+    [
+        (None, "0xeb093c39fc8ded8c4d043c367d4bd75321e8a7c6"),
+        ("hex", "0xeb093c39fc8ded8c4d043c367d4bd75321e8a7c6"),
+        ("checksum", "0xeB093c39fc8dEd8c4d043C367d4bD75321e8A7c6"),
+        ("bytes", bytes.fromhex("eb093c39fc8ded8c4d043c367d4bd75321e8a7c6")),
+    ],
+)
+def test_address_format(address_format, expected):
+    decoder = ABIDecoder(WETH_ABI)
+    first = decoder.decode_function(TRANSFER, address_format=address_format)
+    assert first["dst"] == expected
+
+    if address_format is not None:
+        # Equal addresses share one object
+        second = decoder.decode_function(TRANSFER, address_format=address_format)
+        assert second["dst"] is first["dst"]
+
+
+def test_nested_address_format():
+    calldata = "2b67b57000000000000000000000000062ff24067cb34156e45eca5133a7ace2fecbe5250000000000000000000000005026f006b85729a8b14553fae6af249ad16c9aab000000000000000000000000ffffffffffffffffffffffffffffffffffffffff000000000000000000000000000000000000000000000000000000006478a9830000000000000000000000000000000000000000000000000000000000000000000000000000000000000000ef1c6e67703c7bd7107eed8303fbe6ec2554bf6b000000000000000000000000000000000000000000000000000000006451238b0000000000000000000000000000000000000000000000000000000000000100000000000000000000000000000000000000000000000000000000000000004150b69139c84457a21b5c6c90385b0483077953e067494309a0ac54e5f107594166d881a158e05a505f96d2cd30afb57d32ade18d4103f5c06249ea3e1d47d75a1c00000000000000000000000000000000000000000000000000000000000000"
+    decoder = ABIDecoder(PERMIT2_ABI)
+    record = decoder.decode_function(calldata, records=True, address_format="bytes")
+    assert record.owner == bytes.fromhex("62ff24067cb34156e45eca5133a7ace2fecbe525")
+    assert record.permitSingle.details.token == bytes.fromhex(
+        "5026f006b85729a8b14553fae6af249ad16c9aab"
+    )
+
+
+def test_checksum_cache():
+    checksum_address.cache_clear()
+    for _ in range(3):
+        checksum_address("0xeb093c39fc8ded8c4d043c367d4bd75321e8a7c6")
+    info = checksum_address.cache_info()
+    assert info.hits == 2 and info.misses == 1
+
+
+def test_unknown_address_format():
+    with pytest.raises(ValueError):
+        ABIDecoder(WETH_ABI).decode_function(TRANSFER, address_format="upper")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+
+import asyncio
+from contextlib import aclosing
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from pysad.aio import AsyncDecoder, process_pool
+from pysad.decoder import ABIDecoder
+from pysad.errors import UnknownABI
+from pysad.result import DecodeStatus
+
+from .abis import WETH_ABI
+
+TRANSFER = "0xa9059cbb000000000000000000000000eb093c39fc8ded8c4d043c367d4bd75321e8a7c60000000000000000000000000000000000000000000000000577f9efb3eee9c1"
+APPROVE = "0x095ea7b300000000000000000000000068b3465833fb72a70ecdf485e0e4c7bd8665fc45ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff"
+DEPOSIT = "0xd0e30db0"
+DEPOSIT_TOPICS = [
+    "0xe1fffcc4923d04b559f4d29a8bfc6cda04eb5b0d3c460751c2402c5c5cc9109c",
+    "0x0000000000000000000000003fc91a3afd70395cd496c647d5a6cc9d4b2b7fad",
+]
+DEPOSIT_DATA = "0x00000000000000000000000000000000000000000000000000038d7ea4c68000"
+TRANSFER_FROM = {
+    "type": "function",
+    "name": "transferFrom",
+    "inputs": [
+        {"name": "from", "type": "address"},
+        {"name": "to", "type": "address"},
+        {"name": "value", "type": "uint256"},
+    ],
+    "outputs": [{"name": "", "type": "bool"}],
+}
+# Shares the 0x23b872dd selector with `transferFrom`
+GASPRICE_BIT_ETHER = {
+    "type": "function",
+    "name": "gasprice_bit_ether",
+    "inputs": [{"name": "x", "type": "int128"}],
+    "outputs": [],
+}
+TRANSFER_FROM_CALL = (
+    "0x23b872dd" + "00" * 44 + "11" * 20 + "00" * 44 + "22" * 20 + "00" * 31 + "05"
+)
+GASPRICE_CALL = "0x23b872dd" + "00" * 31 + "05"
+
+decoder = ABIDecoder(WETH_ABI)
+
+
+def test_inline_and_offloaded():
+    async def main(async_decoder):
+        assert await async_decoder.decode_function(APPROVE) == (
+            decoder.decode_function(APPROVE)
+        )
+        event = await async_decoder.decode_event(DEPOSIT_TOPICS, DEPOSIT_DATA)
+        assert event == decoder.decode_event(DEPOSIT_TOPICS, DEPOSIT_DATA)
+        assert (await async_decoder.try_decode_function("0x12345678")).status is (
+            DecodeStatus.UNKNOWN_SELECTOR
+        )
+        with pytest.raises(UnknownABI):
+            await async_decoder.decode_function("0x12345678")
+
+    asyncio.run(main(AsyncDecoder(decoder)))
+    asyncio.run(main(AsyncDecoder(decoder, threshold=0)))
+
+
+def test_stream_order():
+    inputs = [TRANSFER, APPROVE, DEPOSIT, "0x12345678"] * 50
+    expected = [decoder.try_decode_function(input) for input in inputs]
+
+    async def produce():
+        for input in inputs:
+            yield input
+            await asyncio.sleep(0)
+
+    async def main():
+        # Offloaded jobs finish out of order, results are still yielded in order
+        async_decoder = AsyncDecoder(decoder, threshold=0, max_in_flight=8)
+        results = [result async for result in async_decoder.stream(produce())]
+        assert results == expected
+
+        events = async_decoder.stream(
+            [(DEPOSIT_TOPICS, DEPOSIT_DATA)] * 3, "decode_event", raw=True
+        )
+        assert [event async for event in events] == [
+            decoder.decode_event(DEPOSIT_TOPICS, DEPOSIT_DATA, raw=True)
+        ] * 3
+
+    asyncio.run(main())
+
+
+def test_stream_early_exit():
+    async def main():
+        async_decoder = AsyncDecoder(decoder, threshold=0, max_in_flight=8)
+        async with aclosing(async_decoder.stream([APPROVE] * 100)) as results:
+            async for _ in results:
+                break
+
+        # The tasks decoded ahead are cancelled and waited for on close
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(main())
+
+
+def test_process_pool():
+    async def main(async_decoder):
+        results = await async_decoder.decode_batch(
+            "try_decode_function", [TRANSFER, APPROVE, DEPOSIT]
+        )
+        assert results == [
+            decoder.try_decode_function(input) for input in (TRANSFER, APPROVE, DEPOSIT)
+        ]
+        with pytest.raises(UnknownABI):
+            await async_decoder.decode_function("0x12345678")
+
+    with process_pool(decoder, max_workers=2) as pool:
+        asyncio.run(main(AsyncDecoder(decoder, pool, threshold=0)))
+
+
+def test_process_pool_copies_decoder():
+    colliding = ABIDecoder([TRANSFER_FROM], compact=False, source="token")
+    colliding.add_abi([GASPRICE_BIT_ETHER], source="facet")
+    inputs = [TRANSFER_FROM_CALL, GASPRICE_CALL, "0x23b872dd" + "00" * 8]
+
+    async def main(async_decoder):
+        results = await async_decoder.decode_batch("try_decode_function", inputs)
+        assert results == [colliding.try_decode_function(input) for input in inputs]
+
+    with process_pool(colliding, max_workers=1) as pool:
+        async_decoder = AsyncDecoder(colliding, pool, threshold=0)
+        asyncio.run(main(async_decoder))
+
+        # Workers would decode with stale copies of the updated decoder
+        colliding.add_abi(WETH_ABI)
+        with pytest.raises(ValueError):
+            asyncio.run(main(async_decoder))
+
+    with pytest.raises(TypeError):
+        AsyncDecoder(colliding, ProcessPoolExecutor(1))
+
+
+def test_reuse_across_loops():
+    async_decoder = AsyncDecoder(decoder, threshold=0, max_in_flight=2)
+
+    async def main():
+        results = await asyncio.gather(
+            *(async_decoder.decode_function(APPROVE) for _ in range(8))
+        )
+        assert results == [decoder.decode_function(APPROVE)] * 8
+
+    # Every loop gets its own bound on the jobs in flight
+    asyncio.run(main())
+    asyncio.run(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+import pytest
+from pysad.cache import ResultCache
+from pysad.decoder import ABIDecoder
+from pysad.errors import DecodingError
+from pysad.registry import ABIRegistry
+
+from .abis import WETH_ABI
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+APPROVE = "0x095ea7b300000000000000000000000068b3465833fb72a70ecdf485e0e4c7bd8665fc45ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff"
+DEPOSIT = "0xd0e30db0"
+
+
+def test_cache_hits():
+    cache = ResultCache()
+    decoder = ABIDecoder(WETH_ABI, cache=cache)
+
+    first = decoder.decode_function(APPROVE)
+    first["wad"] = 0
+    # Hits are copies, unaffected by changes to earlier results
+    assert decoder.decode_function(APPROVE)["wad"] == (1 << 256) - 1
+    assert decoder.decode_function(DEPOSIT) == {}
+
+    # Output options are part of the key
+    assert decoder.decode_function(APPROVE, raw=True)[1] == (1 << 256) - 1
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 3, 3)
+    assert stats.hit_rate == 0.25
+
+
+def test_cache_bounds():
+    cache = ResultCache(max_entries=2, max_bytes=100, copy=False)
+    decoder = ABIDecoder(WETH_ABI, cache=cache)
+
+    decoder.decode_function(APPROVE)
+    decoder.decode_function(DEPOSIT)
+    shared = decoder.decode_function(DEPOSIT)
+    assert decoder.decode_function(DEPOSIT) is shared
+
+    # 68 + 68 bytes exceeds the byte bound, evicting the approval
+    decoder.decode_function(APPROVE[:-2] + "00")
+    stats = cache.stats()
+    assert stats.entries == 2 and stats.evictions == 1 and stats.bytes == 72
+
+
+def test_cache_errors_not_cached():
+    cache = ResultCache()
+    decoder = ABIDecoder(WETH_ABI, cache=cache)
+    for _ in range(2):
+        with pytest.raises(DecodingError):
+            decoder.decode_function(APPROVE[:20])
+    assert len(cache) == 0
+
+
+def test_registry_cache():
+    cache = ResultCache()
+    registry = ABIRegistry({WETH: WETH_ABI}, cache=cache)
+    for _ in range(4):
+        registry.decode_call(WETH, APPROVE)
+    assert cache.stats().hits == 3
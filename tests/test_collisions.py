@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+from pysad.decoder import ABIDecoder
+from pysad.result import DecodeStatus
+
+TRANSFER_FROM = {
+    "type": "function",
+    "name": "transferFrom",
+    "inputs": [
+        {"name": "from", "type": "address"},
+        {"name": "to", "type": "address"},
+        {"name": "value", "type": "uint256"},
+    ],
+    "outputs": [{"name": "", "type": "bool"}],
+}
+# Shares the 0x23b872dd selector with `transferFrom`
+GASPRICE_BIT_ETHER = {
+    "type": "function",
+    "name": "gasprice_bit_ether",
+    "inputs": [{"name": "x", "type": "int128"}],
+    "outputs": [],
+}
+ERC20_TRANSFER = {
+    "type": "event",
+    "name": "Transfer",
+    "inputs": [
+        {"name": "from", "type": "address", "indexed": True},
+        {"name": "to", "type": "address", "indexed": True},
+        {"name": "value", "type": "uint256", "indexed": False},
+    ],
+}
+ERC721_TRANSFER = {
+    "type": "event",
+    "name": "Transfer",
+    "inputs": [
+        {"name": "from", "type": "address", "indexed": True},
+        {"name": "to", "type": "address", "indexed": True},
+        {"name": "tokenId", "type": "uint256", "indexed": True},
+    ],
+}
+# Both have the 0xeabad097 selector, one taking a static tuple array
+PAIRS = {
+    "type": "function",
+    "name": "pairs18202",
+    "inputs": [
+        {
+            "name": "pairs",
+            "type": "tuple[2]",
+            "components": [{"name": "value", "type": "uint256"}],
+        }
+    ],
+    "outputs": [],
+}
+BLOB = {
+    "type": "function",
+    "name": "blob36650",
+    "inputs": [{"name": "blob", "type": "bytes"}],
+    "outputs": [],
+}
+
+SELECTOR = bytes.fromhex("23b872dd")
+ADDRESS = bytes(12) + bytes.fromhex("c02aaa39b223fe8d0a0e5c4f27ead9083c756cc2")
+WORD = (5).to_bytes(32, "big")
+
+
+def test_function_collision():
+    decoder = ABIDecoder([TRANSFER_FROM], source="token")
+    decoder.add_abi([GASPRICE_BIT_ETHER], source="facet")
+    assert decoder.functions[SELECTOR]["name"] == "gasprice_bit_ether"
+    assert [c.source for c in decoder.candidates(SELECTOR)] == ["token", "facet"]
+
+    # Candidates are told apart by the shape of the calldata
+    args = decoder.decode_function(SELECTOR + ADDRESS + ADDRESS + WORD)
+    assert args["value"] == 5
+    assert decoder.decode_function(SELECTOR + WORD) == {"x": 5}
+    assert decoder.try_decode_function(SELECTOR + ADDRESS + ADDRESS + WORD).ok
+
+    # Data matching no candidate is decoded against the primary one
+    result = decoder.try_decode_function(SELECTOR + bytes(8))
+    assert result.status is DecodeStatus.TOO_SHORT
+
+    decoder.remove_abi([GASPRICE_BIT_ETHER])
+    assert decoder.functions[SELECTOR]["name"] == "transferFrom"
+    assert len(decoder.candidates(SELECTOR)) == 1
+
+
+def test_static_tuple_array_collision():
+    decoder = ABIDecoder([PAIRS, BLOB])
+    selector = bytes.fromhex("eabad097")
+    assert len(decoder.candidates(selector)) == 2
+
+    # Only the static tuple array candidate accepts two words of large values
+    data = selector + (1 << 100).to_bytes(32, "big") + (2 << 100).to_bytes(32, "big")
+    assert decoder.decode_function(data) == {
+        "pairs": [{"value": 1 << 100}, {"value": 2 << 100}]
+    }
+    assert decoder.try_decode_function(data).ok
+
+
+def test_event_collision():
+    decoder = ABIDecoder([ERC20_TRANSFER, ERC721_TRANSFER])
+    topic = next(iter(decoder.events))
+    assert len(decoder.candidates(topic)) == 2
+
+    topics = [topic, ADDRESS, ADDRESS]
+    assert decoder.decode_event(topics, WORD)["value"] == 5
+    assert decoder.decode_event(topics + [WORD], b"")["tokenId"] == 5
@@ -1,9 +1,22 @@
 #!/usr/bin/env python3
 
 import pytest
+from eth_abi.abi import encode
+from eth_utils.abi import event_abi_to_log_topic
+from eth_utils.crypto import keccak
+from pysad.cache import ResultCache
 from pysad.decoder import ABIDecoder, SignatureDecoder
-from pysad.errors import UnknownABI
-from pysad.precompiled import decode_precompiled
+from pysad.errors import DecodingError, LimitExceeded, UnknownABI, UnknownPrecompile
+from pysad.precompiled import (
+    decode_precompiled,
+    decode_precompiled_batch,
+    decode_precompiled_output,
+    decode_precompiled_outputs,
+    get_precompiled_abi,
+)
+from pysad.registry import ABIRegistry
+from pysad.result import DecodeStatus
+from pysad.validate import DecodeLimits
 
 from .abis import (
     PERMIT2_ABI,
@@ -369,6 +382,48 @@ def test_event(abi: list[dict], topics: list[str], memory: str, expected: dict):
     assert expected == contract.decode_event(topics, memory)
 
 
+def test_event_reference_inputs():
+    struct = {"name": "a", "type": "uint256"}
+    event = {
+        "type": "event",
+        "name": "Reference",
+        "inputs": [
+            {"name": "key", "type": "string", "indexed": True},
+            {
+                "name": "hashed",
+                "type": "tuple",
+                "indexed": True,
+                "components": [struct],
+            },
+            {"name": "note", "type": "string", "indexed": False},
+            {
+                "name": "value",
+                "type": "tuple",
+                "indexed": False,
+                "components": [struct],
+            },
+        ],
+    }
+    decoder = ABIDecoder([event])
+    topic = event_abi_to_log_topic(event)
+    topics = [topic, keccak(text="key"), keccak(encode(["uint256"], [1]))]
+    memory = encode(["string", "(uint256)"], ["hi", (5,)])
+
+    # Indexed reference types are only available as their hash, the others are
+    # decoded in full, structs as named trees
+    assert decoder.decode_event(topics, memory) == {
+        "key": keccak(text="key"),
+        "hashed": topics[2],
+        "note": "hi",
+        "value": {"a": 5},
+    }
+    assert decoder.decode_event(topics, memory, json=True)["note"] == "hi"
+    assert decoder.decode_event(topics, memory, raw=True)[2:] == ("hi", (5,))
+    key, hashed, note, value = decoder.schema(topic)
+    assert (hashed.type, hashed.components) == ("bytes32", None)
+    assert (note.type, value.type, value.components[0].name) == ("string", "tuple", "a")
+
+
 @pytest.mark.parametrize(
     "address,calldata,expected",
     [
@@ -438,12 +493,24 @@ def test_event(abi: list[dict], topics: list[str], memory: str, expected: dict):
             "0x0000000000000000000000000000000000000008",
             "0556ae33b821fc82408fd5fb3c42709362fd5426f119be69dc05efd11ad7ed65156c5d5a7caa6ca66164d39e66524f082cb15049d3f7d19d76021f42bdbaf831198e9393920d483a7260bfb731fb5d25f1aa493335a9e71297e485b7aef312c21800deef121f1e76426a00665e5c4479674322d4f75edadd46debd5cd992f6ed090689d0585ff075ec9e99ad690c3395bc4b313370b38ef355acdadcd122975b12c85ea5db8c6deb4aab71808dcb408fe3d1e7690c43d37b4ce6cc0166fa7daa158b227deca4090c40e3b24b23d8681eecdd0da559f7f67d206b29546fee9c551a1d9d88f5cc088fff7dd37c94748a95327e9160cfc021cc7bf209634298bcdf260e01b251f6f1c7e7ff4e580791dee8ea51d87a358e038b4efe30fac09383c10118c4d5b837bcc2bc89b5b398b5974e9f5944073b32078b7e231fec938883b004fc6369f7110fe3d25156c1bb9a72859cf2a04641f99ba4ee413c80da6a5fe422febda3c0c0632a56475b4214e5615e11e6dd3f96e6cea2854a87d4dacc5e55",
             {
-                "x1": b"\x05V\xae3\xb8!\xfc\x82@\x8f\xd5\xfb<Bp\x93b\xfdT&\xf1\x19\xbei\xdc\x05\xef\xd1\x1a\xd7\xede",
-                "y1": b"\x15l]Z|\xaal\xa6ad\xd3\x9efRO\x08,\xb1PI\xd3\xf7\xd1\x9dv\x02\x1fB\xbd\xba\xf81",
-                "x2": b"\x19\x8e\x93\x93\x92\rH:r`\xbf\xb71\xfb]%\xf1\xaaI35\xa9\xe7\x12\x97\xe4\x85\xb7\xae\xf3\x12\xc2",
-                "y2": b'\x18\x00\xde\xef\x12\x1f\x1evBj\x00f^\\DygC"\xd4\xf7^\xda\xddF\xde\xbd\\\xd9\x92\xf6\xed',
-                "x3": b'\t\x06\x89\xd0X_\xf0u\xec\x9e\x99\xadi\x0c3\x95\xbcK13p\xb3\x8e\xf3U\xac\xda\xdc\xd1"\x97[',
-                "y3": b"\x12\xc8^\xa5\xdb\x8cm\xebJ\xabq\x80\x8d\xcb@\x8f\xe3\xd1\xe7i\x0cC\xd3{L\xe6\xcc\x01f\xfa}\xaa",
+                "pairs": [
+                    {
+                        "x1": b"\x05V\xae3\xb8!\xfc\x82@\x8f\xd5\xfb<Bp\x93b\xfdT&\xf1\x19\xbei\xdc\x05\xef\xd1\x1a\xd7\xede",
+                        "y1": b"\x15l]Z|\xaal\xa6ad\xd3\x9efRO\x08,\xb1PI\xd3\xf7\xd1\x9dv\x02\x1fB\xbd\xba\xf81",
+                        "x2": b"\x19\x8e\x93\x93\x92\rH:r`\xbf\xb71\xfb]%\xf1\xaaI35\xa9\xe7\x12\x97\xe4\x85\xb7\xae\xf3\x12\xc2",
+                        "y2": b'\x18\x00\xde\xef\x12\x1f\x1evBj\x00f^\\DygC"\xd4\xf7^\xda\xddF\xde\xbd\\\xd9\x92\xf6\xed',
+                        "x3": b'\t\x06\x89\xd0X_\xf0u\xec\x9e\x99\xadi\x0c3\x95\xbcK13p\xb3\x8e\xf3U\xac\xda\xdc\xd1"\x97[',
+                        "y3": b"\x12\xc8^\xa5\xdb\x8cm\xebJ\xabq\x80\x8d\xcb@\x8f\xe3\xd1\xe7i\x0cC\xd3{L\xe6\xcc\x01f\xfa}\xaa",
+                    },
+                    {
+                        "x1": b'\x15\x8b"}\xec\xa4\t\x0c@\xe3\xb2K#\xd8h\x1e\xec\xdd\r\xa5Y\xf7\xf6} k)To\xee\x9cU',
+                        "y1": b"\x1a\x1d\x9d\x88\xf5\xcc\x08\x8f\xff}\xd3|\x94t\x8a\x952~\x91`\xcf\xc0!\xcc{\xf2\tcB\x98\xbc\xdf",
+                        "x2": b"&\x0e\x01\xb2Q\xf6\xf1\xc7\xe7\xffNX\x07\x91\xde\xe8\xeaQ\xd8z5\x8e\x03\x8bN\xfe0\xfa\xc0\x93\x83\xc1",
+                        "y2": b"\x01\x18\xc4\xd5\xb87\xbc\xc2\xbc\x89\xb5\xb3\x98\xb5\x97N\x9fYD\x07;2\x07\x8b~#\x1f\xec\x93\x88\x83\xb0",
+                        "x3": b"\x04\xfcci\xf7\x11\x0f\xe3\xd2QV\xc1\xbb\x9ar\x85\x9c\xf2\xa0FA\xf9\x9b\xa4\xeeA<\x80\xdaj_\xe4",
+                        "y3": b'"\xfe\xbd\xa3\xc0\xc0c*VG[B\x14\xe5a^\x11\xe6\xdd?\x96\xe6\xce\xa2\x85J\x87\xd4\xda\xcc^U',
+                    },
+                ]
             },
         ),
         (
@@ -506,3 +573,187 @@ def test_event(abi: list[dict], topics: list[str], memory: str, expected: dict):
 )
 def test_precompiled(address: str, calldata: str, expected: dict):
     assert expected == decode_precompiled(address, calldata)
+
+
+@pytest.mark.parametrize(
+    "output,expected",
+    [
+        (
+            "0x08c379a00000000000000000000000000000000000000000000000000000000000000020000000000000000000000000000000000000000000000000000000000000001a4e6f7420656e6f7567682045746865722070726f76696465642e000000000000",
+            {"message": "Not enough Ether provided."},
+        ),
+        (
+            "0x4e487b710000000000000000000000000000000000000000000000000000000000000011",
+            {"code": 17, "reason": "ARITHMETIC_OVERFLOW"},
+        ),
+        (
+            "0x4e487b7100000000000000000000000000000000000000000000000000000000000000ff",
+            {"code": 255, "reason": None},
+        ),
+    ],
+)
+def test_standard_error(output: str, expected: dict):
+    assert expected == ABIDecoder(WETH_ABI).decode_error(output)
+
+
+def test_standard_error_options():
+    cache = ResultCache()
+    decoder = ABIDecoder(WETH_ABI, cache=cache)
+    panic = "0x4e487b71" + (1 << 60).to_bytes(32, "big").hex()
+    message = "Not enough Ether provided."
+    error = "0x08c379a0" + encode(["string"], [message]).hex()
+
+    # Output options shape standard reverts like any other decoded error
+    assert decoder.decode_error(panic, json=True) == {
+        "code": str(1 << 60),
+        "reason": None,
+    }
+    assert decoder.decode_error(error, records=True).message == message
+    # Also for contracts the registry does not know
+    unknown = "0x" + "00" * 20
+    assert ABIRegistry().decode_error(unknown, panic, json=True)["code"] == str(1 << 60)
+    assert decoder.decode_error(error, raw=True) == (message,)
+    with pytest.raises(ValueError):
+        decoder.decode_error(error, raw=True, json=True)
+
+    # Limits apply to the fast path and its fallback alike
+    limits = DecodeLimits(max_bytes=16)
+    with pytest.raises(LimitExceeded):
+        decoder.decode_error(error, limits=limits)
+    with pytest.raises(LimitExceeded):
+        decoder.decode_error(panic, limits=DecodeLimits(max_bytes=8))
+    result = decoder.try_decode_error(error, limits=limits)
+    assert result.status is DecodeStatus.LIMIT_EXCEEDED
+
+    decoder.decode_error(error)
+    decoder.decode_error(error)
+    assert cache.stats().hits == 1
+
+
+@pytest.mark.parametrize(
+    "address,calldata,expected",
+    [
+        (
+            "0x000000000000000000000000000000000000000a",
+            "01" * 32 + "02" * 32 + "03" * 32 + "04" * 48 + "05" * 48,
+            {
+                "versionedHash": b"\x01" * 32,
+                "z": b"\x02" * 32,
+                "y": b"\x03" * 32,
+                "commitment": b"\x04" * 48,
+                "proof": b"\x05" * 48,
+            },
+        ),
+        (
+            "0x000000000000000000000000000000000000000c",
+            "01" * 128 + "02" * 32 + "03" * 128 + "04" * 32,
+            {
+                "pairs": [
+                    {"point": b"\x01" * 128, "scalar": b"\x02" * 32},
+                    {"point": b"\x03" * 128, "scalar": b"\x04" * 32},
+                ]
+            },
+        ),
+        (
+            "0x0000000000000000000000000000000000000010",
+            "06" * 64,
+            {"fp": b"\x06" * 64},
+        ),
+    ],
+)
+def test_precompiled_layouts(address: str, calldata: str, expected: dict):
+    assert expected == decode_precompiled(address, calldata)
+
+    zero_copy = decode_precompiled(address, calldata, zero_copy=True)
+    assert expected == zero_copy
+
+
+@pytest.mark.parametrize(
+    "address,calldata",
+    [
+        ("0x0000000000000000000000000000000000000009", "00" * 212),
+        ("0x000000000000000000000000000000000000000c", "01" * 159),
+        ("0x0000000000000000000000000000000000000005", "00" * 95),
+        ("0x0000000000000000000000000000000000000005", "00" * 31 + "01" + "00" * 64),
+    ],
+)
+def test_precompiled_invalid_length(address: str, calldata: str):
+    with pytest.raises(DecodingError):
+        decode_precompiled(address, calldata)
+
+
+@pytest.mark.parametrize(
+    "address,chain_id,expected",
+    [
+        ("0x0000000000000000000000000000000000000001", 1, "ecrecover"),
+        (1, 56, "ecrecover"),
+        (bytes(19) + b"\x11", 1, "bls12MapFp2ToG2"),
+        (bytes(19) + b"\x11", 56, None),
+        (0x100, 1, None),
+        (0x100, 56, "validateTendermintHeader"),
+        (0x100, 10, "p256Verify"),
+        (0x100, None, "validateTendermintHeader"),
+        (b"\xc0" + bytes(18) + b"\x01", 1, None),
+        ("0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2", 1, None),
+    ],
+)
+def test_chain_precompiles(
+    address: bytes | str | int, chain_id: int | None, expected: str | None
+):
+    abi = get_precompiled_abi(address, chain_id)
+    assert expected == (abi and abi["name"])
+
+    if expected is None:
+        with pytest.raises(UnknownPrecompile):
+            decode_precompiled(address, "0x", chain_id=chain_id)
+
+
+@pytest.mark.parametrize(
+    "address,output,expected",
+    [
+        (
+            "0x0000000000000000000000000000000000000001",
+            "0x000000000000000000000000eb093c39fc8ded8c4d043c367d4bd75321e8a7c6",
+            {"publicAddress": "0xeb093c39fc8ded8c4d043c367d4bd75321e8a7c6"},
+        ),
+        ("0x0000000000000000000000000000000000000001", "0x", {}),
+        (
+            "0x0000000000000000000000000000000000000103",
+            "0x01" + "00" * 23 + "0000000000000003" + "aabbcc",
+            {
+                "validatorSetChanged": True,
+                "consensusStateLength": 3,
+                "newConsensusState": b"\xaa\xbb\xcc",
+            },
+        ),
+    ],
+)
+def test_precompiled_output(address: str, output: str, expected: dict):
+    assert expected == decode_precompiled_output(address, output)
+
+
+def test_precompiled_outputs():
+    outputs = ["0x" + "00" * 31 + "01", "0x", bytes(32)]
+    assert decode_precompiled_outputs(0x08, outputs) == [
+        {"success": b"\x00" * 31 + b"\x01"},
+        {},
+        {"success": b"\x00" * 32},
+    ]
+
+
+def test_precompiled_batch():
+    inputs = [bytes([i]) * 128 for i in range(3)]
+    columns = decode_precompiled_batch(0x01, inputs)
+    assert list(columns) == ["hash", "v", "r", "s"]
+    assert columns["hash"] == [bytes([i]) * 32 for i in range(3)]
+    assert columns["v"] == [bytes([i]) * 32 for i in range(3)]
+
+    zero_copy = decode_precompiled_batch(0x01, inputs, zero_copy=True)
+    assert [bytes(v) for v in zero_copy["s"]] == columns["s"]
+
+    # Variable length layouts fall back to row by row decoding
+    pairs = decode_precompiled_batch(0x08, [bytes(192), "0x", bytes(384)])
+    assert [len(p) for p in pairs["pairs"]] == [1, 0, 2]
+
+    with pytest.raises(DecodingError):
+        decode_precompiled_batch(0x01, [bytes(128), bytes(127)])
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+from eth_abi.abi import encode
+from eth_utils.abi import function_signature_to_4byte_selector
+from pysad.decoder import ABIDecoder
+from pysad.expand import CalldataExpander, NestedCall
+from pysad.registry import ABIRegistry
+
+from .abis import WETH_ABI
+
+MULTICALL_ABI = [
+    {
+        "name": "multicall",
+        "type": "function",
+        "inputs": [{"name": "data", "type": "bytes[]"}],
+        "outputs": [{"name": "results", "type": "bytes[]"}],
+    },
+    {
+        "name": "aggregate",
+        "type": "function",
+        "inputs": [
+            {
+                "name": "calls",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "callData", "type": "bytes"},
+                ],
+            }
+        ],
+        "outputs": [],
+    },
+]
+
+DST = "0xeb093c39fc8ded8c4d043c367d4bd75321e8a7c6"
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+
+TRANSFER = function_signature_to_4byte_selector("transfer(address,uint256)") + encode(
+    ["address", "uint256"], [DST, 5]
+)
+DEPOSIT = function_signature_to_4byte_selector("deposit()")
+
+
+def multicall(calls: list[bytes]) -> bytes:
+    return function_signature_to_4byte_selector("multicall(bytes[])") + encode(
+        ["bytes[]"], [calls]
+    )
+
+
+def test_expand_registry():
+    registry = ABIRegistry({WETH: WETH_ABI, "0x01": MULTICALL_ABI})
+    calldata = function_signature_to_4byte_selector(
+        "aggregate((address,bytes)[])"
+    ) + encode(
+        ["(address,bytes)[]"],
+        [[(WETH, TRANSFER), (WETH, DEPOSIT), (WETH, b"\xde\xad\xbe\xef")]],
+    )
+
+    calls = registry.decode_call("0x01", calldata, expand=True)["calls"]
+    assert calls[0]["callData"] == NestedCall(
+        TRANSFER[:4], "transfer", {"dst": DST, "wad": 5}
+    )
+    assert calls[1]["callData"] == NestedCall(DEPOSIT, "deposit", {})
+    assert calls[2]["callData"] == b"\xde\xad\xbe\xef"
+
+    # Without expansion the nested calls are left as raw bytes
+    assert registry.decode_call("0x01", calldata)["calls"][0]["callData"] == TRANSFER
+
+
+def test_expand_limits():
+    decoder = ABIDecoder(MULTICALL_ABI + WETH_ABI)
+    nested = multicall([multicall([TRANSFER])])
+
+    expanded = decoder.decode_function(nested, expand=True)["data"][0]
+    assert expanded.args["data"][0].args == {"dst": DST, "wad": 5}
+
+    shallow = CalldataExpander(decoder.function_plans, max_depth=1)
+    expanded = decoder.decode_function(nested, expand=shallow)["data"][0]
+    assert expanded.args["data"] == [TRANSFER]
+
+    no_budget = CalldataExpander(decoder.function_plans, max_bytes=0)
+    assert decoder.decode_function(nested, expand=no_budget)["data"] == [
+        multicall([TRANSFER])
+    ]
+
+
+def test_expand_memoises_identical_payloads():
+    decoder = ABIDecoder(MULTICALL_ABI + WETH_ABI)
+    first, second = decoder.decode_function(
+        multicall([TRANSFER, TRANSFER]), expand=True
+    )["data"]
+    assert first is second
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import gc
+import json
+import weakref
+
+from pysad.decoder import ABIDecoder
+from pysad.fragment import Fragment, compact_fragment
+
+from .abis import PERMIT2_ABI
+
+PERMIT = bytes.fromhex("2b67b570")
+
+
+def test_compact_fragment():
+    permits = [e for e in PERMIT2_ABI if e.get("name") == "permit"]
+    fragment, batch = map(compact_fragment, permits)
+
+    assert "stateMutability" not in fragment
+    assert fragment["inputs"][0] == {"name": "owner", "type": "address"}
+    permit = fragment["inputs"][1]
+    assert permit["internalType"] == "struct IAllowanceTransfer.PermitBatch"
+    assert fragment.to_dict()["inputs"][1]["components"][0]["type"] == "tuple[]"
+
+    # Identical structs share their components, identical entries, eg. from
+    # another contract's ABI, share the whole fragment
+    details = batch["inputs"][1]["components"][0]["components"]
+    assert details[0] is permit["components"][0]["components"][0]
+    assert compact_fragment(json.loads(json.dumps(permits[0]))) is fragment
+
+
+def test_compact_decoder():
+    decoder = ABIDecoder(PERMIT2_ABI)
+    full = ABIDecoder(PERMIT2_ABI, compact=False)
+    assert isinstance(decoder.functions[PERMIT], Fragment)
+    assert "stateMutability" in full.functions[PERMIT]
+
+
+def test_fragments_released():
+    entry = {
+        "type": "function",
+        "name": "released",
+        "inputs": [{"name": "unique", "type": "uint248"}],
+        "outputs": [],
+    }
+    decoder = ABIDecoder([entry])
+    (fragment,) = map(weakref.ref, decoder.functions.values())
+    param = weakref.ref(fragment()["inputs"][0])
+
+    # Interned fragments and parameters are freed once no decoder holds them
+    decoder.remove_abi([entry])
+    gc.collect()
+    assert fragment() is None and param() is None
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+import gc
+import json
+import weakref
+
+from pysad.cache import PlanCache
+from pysad.decoder import ABIDecoder
+from pysad.registry import ABIRegistry
+
+from .abis import PERMIT2_ABI, WETH_ABI
+
+TRANSFER = bytes.fromhex("a9059cbb")
+APPROVAL = bytes.fromhex(
+    "8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925"
+)
+
+
+def test_shared_plans():
+    # Separately loaded copies of an ABI, and compact or not, share every plan
+    first = ABIDecoder(WETH_ABI)
+    second = ABIDecoder(json.loads(json.dumps(WETH_ABI)), compact=False)
+    assert first.function_plans[TRANSFER] is second.function_plans[TRANSFER]
+    assert first.event_plans[APPROVAL] is second.event_plans[APPROVAL]
+
+    # Entries differing in names do not
+    permit2 = ABIDecoder(PERMIT2_ABI)
+    assert first.event_plans[APPROVAL] is not permit2.event_plans.get(APPROVAL)
+
+    # Lazy decoders share plans with each other and with eager ones
+    plans = PlanCache()
+    registry = ABIRegistry({"0x01": WETH_ABI, "0x02": WETH_ABI}, plans=plans)
+    lazy = [
+        registry.get(address).function_plans[TRANSFER] for address in ("0x01", "0x02")
+    ]
+    assert lazy[0] is lazy[1] is first.function_plans[TRANSFER]
+    assert len(plans) == 1
+
+
+def test_interned_plans_released():
+    abi = [{"type": "function", "name": "released", "inputs": [], "outputs": []}]
+    decoder = ABIDecoder(abi)
+    plan = weakref.ref(decoder.function_plans[bytes.fromhex("96132521")])
+    assert plan() is ABIDecoder(abi).function_plans[bytes.fromhex("96132521")]
+
+    # Plans are dropped once no decoder uses them
+    del decoder
+    gc.collect()
+    assert plan() is None
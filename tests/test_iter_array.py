@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+from itertools import islice
+
+import pytest
+from eth_abi.abi import encode
+from eth_utils.abi import function_signature_to_4byte_selector
+from pysad.decoder import ABIDecoder
+from pysad.errors import DecodingError
+
+AIRDROP_ABI = [
+    {
+        "name": "airdrop",
+        "type": "function",
+        "inputs": [
+            {"name": "token", "type": "address"},
+            {
+                "name": "transfers",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "recipient", "type": "address"},
+                    {"name": "amount", "type": "uint256"},
+                ],
+            },
+            {"name": "memos", "type": "string[]"},
+            {"name": "fees", "type": "uint256[3]"},
+        ],
+    }
+]
+
+SELECTOR = function_signature_to_4byte_selector(
+    "airdrop(address,(address,uint256)[],string[],uint256[3])"
+)
+TOKEN = "0x" + "11" * 20
+COUNT = 1000
+TRANSFERS = [("0x" + f"{i:040x}", i * 10) for i in range(COUNT)]
+MEMOS = [f"memo {i}" for i in range(COUNT)]
+CALLDATA = SELECTOR + encode(
+    ["address", "(address,uint256)[]", "string[]", "uint256[3]"],
+    [TOKEN, TRANSFERS, MEMOS, [1, 2, 3]],
+)
+
+
+def test_iter_array():
+    decoder = ABIDecoder(AIRDROP_ABI)
+    transfers = decoder.iter_array(CALLDATA, "transfers")
+    assert next(transfers) == {"recipient": TRANSFERS[0][0], "amount": 0}
+    assert list(transfers) == decoder.decode_function(CALLDATA)["transfers"][1:]
+
+    assert list(islice(decoder.iter_array(CALLDATA, "memos"), 3)) == MEMOS[:3]
+    assert list(decoder.iter_array(CALLDATA, "fees", raw=True)) == [1, 2, 3]
+
+    records = decoder.iter_array(CALLDATA, "transfers", records=True)
+    assert next(records).recipient == TRANSFERS[0][0]
+
+
+def test_iter_array_invalid():
+    decoder = ABIDecoder(AIRDROP_ABI)
+    with pytest.raises(ValueError):
+        decoder.iter_array(CALLDATA, "token")
+    with pytest.raises(ValueError):
+        decoder.iter_array(CALLDATA, "missing")
+
+    # Truncated calldata is detected from the array length before iterating
+    with pytest.raises(DecodingError):
+        decoder.iter_array(CALLDATA[:1000], "transfers")
+
+
+def test_iter_array_after_static_tuple_array():
+    abi = [
+        {
+            "name": "settle",
+            "type": "function",
+            "inputs": [
+                {
+                    "name": "xs",
+                    "type": "tuple[3]",
+                    "components": [
+                        {"name": "a", "type": "uint256"},
+                        {"name": "b", "type": "uint256"},
+                    ],
+                },
+                {"name": "tail", "type": "uint256[]"},
+            ],
+        }
+    ]
+    types = ["(uint256,uint256)[3]", "uint256[]"]
+    selector = function_signature_to_4byte_selector(
+        "settle((uint256,uint256)[3],uint256[])"
+    )
+    calldata = selector + encode(types, [[(1, 2), (3, 4), (5, 6)], [7, 8, 9]])
+
+    decoder = ABIDecoder(abi)
+    assert list(decoder.iter_array(calldata, "tail")) == [7, 8, 9]
+    assert list(decoder.iter_array(calldata, "xs", raw=True)) == [
+        (1, 2),
+        (3, 4),
+        (5, 6),
+    ]
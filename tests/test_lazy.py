@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+from pysad.cache import PlanCache
+from pysad.decoder import ABIDecoder
+from pysad.registry import ABIRegistry
+
+from .abis import (
+    PERMIT2_ABI,
+    UNIVERSAL_ROUTER_ABI,
+    UNIVERSAL_ROUTER_BYTECODE,
+    UNIVERSAL_ROUTER_CREATE,
+    WETH_ABI,
+)
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+PERMIT2 = "0x000000000022d473030f116ddee9f6b43ac78ba3"
+TRANSFER = "0xa9059cbb000000000000000000000000eb093c39fc8ded8c4d043c367d4bd75321e8a7c60000000000000000000000000000000000000000000000000577f9efb3eee9c1"
+APPROVE = "0x095ea7b300000000000000000000000068b3465833fb72a70ecdf485e0e4c7bd8665fc45ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff"
+DEPOSIT = "0xd0e30db0"
+
+
+def test_lazy_registry():
+    plans = PlanCache(max_plans=2)
+    registry = ABIRegistry({WETH: WETH_ABI, PERMIT2: PERMIT2_ABI}, plans=plans)
+    # Registration only indexes the ABI entries
+    assert len(plans) == 0 and len(registry.selectors) > 20
+
+    eager = ABIDecoder(WETH_ABI)
+    for input in (TRANSFER, APPROVE, TRANSFER, DEPOSIT):
+        assert registry.decode_call(WETH, input) == eager.decode_function(input)
+    assert registry.try_decode_any_call(TRANSFER).ok
+
+    stats = plans.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (2, 3, 2)
+    assert stats.evictions == 1
+
+
+def test_lazy_decoder():
+    plans = PlanCache()
+    decoder = ABIDecoder(WETH_ABI, plans=plans)
+    plan = decoder.function_plans[bytes.fromhex("a9059cbb")]
+    assert decoder.function_plans[bytes.fromhex("a9059cbb")] is plan
+
+    # Updates recompile the changed entries only
+    decoder.add_abi([e for e in WETH_ABI if e.get("name") == "approve"])
+    assert decoder.function_plans[bytes.fromhex("a9059cbb")] is plan
+    decoder.remove_abi([e for e in WETH_ABI if e.get("name") == "transfer"])
+    assert bytes.fromhex("a9059cbb") not in decoder.function_plans
+    assert decoder.decode_function(APPROVE)["wad"] == (1 << 256) - 1
+
+    router = ABIDecoder(UNIVERSAL_ROUTER_ABI, plans=plans)
+    eager = ABIDecoder(UNIVERSAL_ROUTER_ABI)
+    args = router.decode_constructor(UNIVERSAL_ROUTER_CREATE, UNIVERSAL_ROUTER_BYTECODE)
+    assert args and args == eager.decode_constructor(
+        UNIVERSAL_ROUTER_CREATE, UNIVERSAL_ROUTER_BYTECODE
+    )
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+from pysad.cache import NegativeCache
+from pysad.registry import ABIRegistry
+from pysad.result import DecodeStatus
+
+from .abis import PERMIT2_ABI, WETH_ABI
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+PERMIT2 = "0x000000000022d473030f116ddee9f6b43ac78ba3"
+TRANSFER = "0xa9059cbb000000000000000000000000eb093c39fc8ded8c4d043c367d4bd75321e8a7c60000000000000000000000000000000000000000000000000577f9efb3eee9c1"
+LOCKDOWN = bytes.fromhex("cc53287f")
+
+
+def test_unknown_selectors():
+    registry = ABIRegistry({WETH: WETH_ABI})
+    assert registry.try_decode_any_call(TRANSFER).ok
+
+    for _ in range(3):
+        result = registry.try_decode_any_call(LOCKDOWN + bytes(64))
+        assert result.status is DecodeStatus.UNKNOWN_SELECTOR
+    registry.try_decode_any_event(["0x" + "00" * 32], "0x")
+
+    assert LOCKDOWN in registry.unknown
+    assert registry.unknown.most_common(1) == [(LOCKDOWN, 3)]
+
+    # Registering an ABI which defines the selector invalidates it
+    registry.register(PERMIT2, PERMIT2_ABI)
+    assert LOCKDOWN not in registry.unknown
+    assert registry.unknown.misses(bytes(32)) == 1
+    assert registry.try_decode_any_call(LOCKDOWN + bytes(64)).status in (
+        DecodeStatus.OK,
+        DecodeStatus.INVALID_DATA,
+    )
+
+
+def test_negative_cache_bound():
+    cache = NegativeCache(max_entries=2)
+    for key in (b"a", b"b", b"a", b"c"):
+        cache.add(key)
+    assert len(cache) == 2 and b"b" not in cache
+    assert cache.most_common() == [(b"a", 2), (b"c", 1)]
+
+
+def test_miss_during_registration():
+    registry: ABIRegistry
+
+    class Interleaved(NegativeCache):
+        # Registers PERMIT2 between a lookup missing in the old index and the
+        # miss being recorded
+        def add(self, key: bytes, generation: int = 0):
+            if key == LOCKDOWN and registry.get(PERMIT2) is None:
+                registry.register(PERMIT2, PERMIT2_ABI)
+            super().add(key, generation)
+
+    registry = ABIRegistry({WETH: WETH_ABI}, unknown=Interleaved())
+    result = registry.try_decode_any_call(LOCKDOWN + bytes(64))
+    assert result.status is DecodeStatus.UNKNOWN_SELECTOR
+
+    # The miss was recorded against the old index, so it is looked up again
+    assert registry.try_decode_any_call(LOCKDOWN + bytes(64)).status in (
+        DecodeStatus.OK,
+        DecodeStatus.INVALID_DATA,
+    )
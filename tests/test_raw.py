@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+
+import pytest
+from pysad.decoder import ABIDecoder
+from pysad.errors import UnknownABI
+from pysad.plan import SchemaField
+
+from .abis import PERMIT2_ABI, WETH_ABI
+
+TRANSFER = "0xa9059cbb000000000000000000000000eb093c39fc8ded8c4d043c367d4bd75321e8a7c60000000000000000000000000000000000000000000000000577f9efb3eee9c1"
+INDEXED_REFERENCE_ABI = [
+    {
+        "anonymous": False,
+        "inputs": [
+            {"indexed": True, "name": "test1", "type": "string"},
+            {"indexed": False, "name": "test2", "type": "uint256"},
+        ],
+        "name": "Reference",
+        "type": "event",
+    }
+]
+
+
+def test_raw_function():
+    decoder = ABIDecoder(WETH_ABI)
+    assert decoder.decode_function(TRANSFER, raw=True) == (
+        "0xeb093c39fc8ded8c4d043c367d4bd75321e8a7c6",
+        394058300329486785,
+    )
+    assert decoder.schema(TRANSFER[:10]) == (
+        SchemaField("dst", "address"),
+        SchemaField("wad", "uint256"),
+    )
+    assert decoder.schema("0xa9059cbb", "return") == (SchemaField("", "bool"),)
+    assert decoder.decode_error("0x4e487b71" + "00" * 31 + "01", raw=True) == (1,)
+
+
+def test_raw_event():
+    decoder = ABIDecoder(INDEXED_REFERENCE_ABI)
+    selector = next(iter(decoder.events))
+    hashed = b"\x29" * 32
+
+    args = decoder.decode_event([selector, hashed], (5).to_bytes(32, "big"), raw=True)
+    assert args == (hashed, 5)
+
+    # Reference types in topics are only available as their hash
+    assert decoder.schema(selector) == (
+        SchemaField("test1", "bytes32"),
+        SchemaField("test2", "uint256"),
+    )
+
+
+def test_schema_nesting():
+    decoder = ABIDecoder(PERMIT2_ABI)
+    owner, permit, signature = decoder.schema("0x2b67b570")
+    assert permit.type == "tuple"
+    details = permit.components[0]
+    assert details.name == "details"
+    assert [f.name for f in details.components] == [
+        "token",
+        "amount",
+        "expiration",
+        "nonce",
+    ]
+    # Schemas are cached per plan
+    assert decoder.schema("0x2b67b570")[1] is permit
+
+    with pytest.raises(UnknownABI):
+        decoder.schema("0x00000000")
+    with pytest.raises(ValueError):
+        decoder.decode_function("0x2b67b570", raw=True, records=True)
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+from eth_abi.abi import encode
+from pysad.decoder import ABIDecoder
+from pysad.records import Record, record_type
+
+from .abis import PERMIT2_ABI, WETH_ABI
+
+PERMIT_CALLDATA = "2b67b57000000000000000000000000062ff24067cb34156e45eca5133a7ace2fecbe5250000000000000000000000005026f006b85729a8b14553fae6af249ad16c9aab000000000000000000000000ffffffffffffffffffffffffffffffffffffffff000000000000000000000000000000000000000000000000000000006478a9830000000000000000000000000000000000000000000000000000000000000000000000000000000000000000ef1c6e67703c7bd7107eed8303fbe6ec2554bf6b000000000000000000000000000000000000000000000000000000006451238b0000000000000000000000000000000000000000000000000000000000000100000000000000000000000000000000000000000000000000000000000000004150b69139c84457a21b5c6c90385b0483077953e067494309a0ac54e5f107594166d881a158e05a505f96d2cd30afb57d32ade18d4103f5c06249ea3e1d47d75a1c00000000000000000000000000000000000000000000000000000000000000"
+
+
+def test_function_record():
+    decoder = ABIDecoder(PERMIT2_ABI)
+    record = decoder.decode_function(PERMIT_CALLDATA, records=True)
+
+    assert isinstance(record, Record)
+    assert type(record).__name__ == "permit"
+    assert type(record.permitSingle).__name__ == "PermitSingle"
+    assert type(record.permitSingle.details).__name__ == "PermitDetails"
+    assert record.permitSingle.details.expiration == 1685629315
+    assert record.to_dict() == decoder.decode_function(PERMIT_CALLDATA)
+
+    # Classes are generated once per struct
+    other = decoder.decode_function(PERMIT_CALLDATA, records=True)
+    assert type(other.permitSingle) is type(record.permitSingle)
+
+
+def test_event_and_error_records():
+    decoder = ABIDecoder(WETH_ABI)
+    topics = [
+        "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef",
+        "0x" + "00" * 12 + "11" * 20,
+        "0x" + "00" * 12 + "22" * 20,
+    ]
+    memory = "0x" + encode(["uint256"], [5]).hex()
+    record = decoder.decode_event(topics, memory, records=True)
+    assert type(record).__name__ == "Transfer"
+    assert record.to_dict() == decoder.decode_event(topics, memory)
+
+    panic = decoder.decode_error("0x4e487b71" + "00" * 31 + "11", records=True)
+    assert panic.code == 0x11 and panic.reason == "ARITHMETIC_OVERFLOW"
+
+
+def test_unnamed_fields():
+    cls = record_type("Output", ["", "", "class"])
+    record = cls._make([1, 2, 3])
+    assert record.to_dict() == {"": 2, "class": 3}
+    assert tuple(record) == (1, 2, 3)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import pytest
+from pysad.decoder import ABIDecoder
+from pysad.registry import ABIRegistry
+from pysad.result import DecodeStatus
+
+from .abis import WETH_ABI
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+TRANSFER = "0xa9059cbb000000000000000000000000eb093c39fc8ded8c4d043c367d4bd75321e8a7c60000000000000000000000000000000000000000000000000577f9efb3eee9c1"
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+
+@pytest.mark.parametrize(
+    "input,status,position",
+    [
+        (TRANSFER, DecodeStatus.OK, None),
+        ("0x12345678" + TRANSFER[10:], DecodeStatus.UNKNOWN_SELECTOR, None),
+        (TRANSFER[:74], DecodeStatus.TOO_SHORT, 32),
+        # An address with dirty upper bytes
+        ("0xa9059cbb" + "ff" * 32 + TRANSFER[74:], DecodeStatus.INVALID_DATA, 32),
+    ],
+)
+def test_try_decode_function(input: str, status: DecodeStatus, position: int | None):
+    result = ABIDecoder(WETH_ABI).try_decode_function(input)
+    assert result.status is status
+    assert result.selector == bytes.fromhex(input[2:10])
+    assert result.position == position
+    assert result.ok == (status is DecodeStatus.OK)
+    if result.ok:
+        assert result.value == ABIDecoder(WETH_ABI).decode_function(input)
+
+
+def test_try_decode_event():
+    decoder = ABIDecoder(WETH_ABI)
+    address = "0x" + "00" * 12 + "11" * 20
+    assert decoder.try_decode_event(
+        [TRANSFER_TOPIC, address, address], "0x" + "00" * 32
+    ).ok
+    assert (
+        decoder.try_decode_event([TRANSFER_TOPIC, address], "0x" + "00" * 32).status
+        is DecodeStatus.INVALID_TOPICS
+    )
+    assert decoder.try_decode_event([], "0x").status is DecodeStatus.UNKNOWN_SELECTOR
+
+
+def test_try_decode_error():
+    decoder = ABIDecoder(WETH_ABI)
+    panic = decoder.try_decode_error("0x4e487b71" + "00" * 31 + "01")
+    assert panic.value == {"code": 1, "reason": "ASSERT"}
+    assert decoder.try_decode_error("0x4e487b71").status is DecodeStatus.INVALID_DATA
+
+
+def test_try_decode_registry():
+    registry = ABIRegistry({WETH: WETH_ABI})
+    assert registry.try_decode_call(WETH, TRANSFER, raw=True).value == (
+        "0xeb093c39fc8ded8c4d043c367d4bd75321e8a7c6",
+        394058300329486785,
+    )
+    unknown = registry.try_decode_call("0x" + "00" * 20, TRANSFER)
+    assert unknown.status is DecodeStatus.UNKNOWN_CONTRACT
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+import json
+
+import pytest
+from pysad.decoder import ABIDecoder
+from pysad.registry import ABIRegistry
+from pysad.serialize import JSONPolicy, dumps
+
+from .abis import PERMIT2_ABI, WETH_ABI
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+PERMIT_CALLDATA = "2b67b57000000000000000000000000062ff24067cb34156e45eca5133a7ace2fecbe5250000000000000000000000005026f006b85729a8b14553fae6af249ad16c9aab000000000000000000000000ffffffffffffffffffffffffffffffffffffffff000000000000000000000000000000000000000000000000000000006478a9830000000000000000000000000000000000000000000000000000000000000000000000000000000000000000ef1c6e67703c7bd7107eed8303fbe6ec2554bf6b000000000000000000000000000000000000000000000000000000006451238b0000000000000000000000000000000000000000000000000000000000000100000000000000000000000000000000000000000000000000000000000000004150b69139c84457a21b5c6c90385b0483077953e067494309a0ac54e5f107594166d881a158e05a505f96d2cd30afb57d32ade18d4103f5c06249ea3e1d47d75a1c00000000000000000000000000000000000000000000000000000000000000"
+SIGNATURE = "0x50b69139c84457a21b5c6c90385b0483077953e067494309a0ac54e5f107594166d881a158e05a505f96d2cd30afb57d32ade18d4103f5c06249ea3e1d47d75a1c"
+
+
+def test_json_output():
+    decoder = ABIDecoder(PERMIT2_ABI)
+    result = decoder.decode_function(PERMIT_CALLDATA, json=True)
+    assert result == {
+        "owner": "0x62ff24067cb34156e45eca5133a7ace2fecbe525",
+        "permitSingle": {
+            "details": {
+                "token": "0x5026f006b85729a8b14553fae6af249ad16c9aab",
+                "amount": "1461501637330902918203684832716283019655932542975",
+                "expiration": 1685629315,
+                "nonce": 0,
+            },
+            "spender": "0xef1c6e67703c7bd7107eed8303fbe6ec2554bf6b",
+            "sigDeadline": 1683039115,
+        },
+        "signature": SIGNATURE,
+    }
+    assert json.loads(dumps(result)) == result
+
+
+def test_json_policy():
+    policy = JSONPolicy(bytes="base64", big_int="hex", address="checksum")
+    result = ABIDecoder(PERMIT2_ABI).decode_function(PERMIT_CALLDATA, json=policy)
+    assert result["owner"] == "0x62Ff24067Cb34156E45ECA5133a7ACE2FEcbE525"
+    assert result["permitSingle"]["details"]["amount"] == hex((1 << 160) - 1)
+    assert result["signature"].startswith(
+        "ULaROchEV6IbXGyQOFsEgwd5U+BnSUMJoKxU5fEHWUFm"
+    )
+
+
+def test_json_registry():
+    registry = ABIRegistry({WETH: WETH_ABI})
+    result = registry.decode_call(
+        WETH, "0x2e1a7d4d" + "ff" * 32, json=JSONPolicy(big_int="int")
+    )
+    assert result == {"wad": (1 << 256) - 1}
+
+
+def test_json_invalid():
+    decoder = ABIDecoder(PERMIT2_ABI)
+    with pytest.raises(ValueError):
+        decoder.decode_function(PERMIT_CALLDATA, json=JSONPolicy(address="bytes"))
+    with pytest.raises(ValueError):
+        decoder.decode_function(PERMIT_CALLDATA, records=True, json=True)
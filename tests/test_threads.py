@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from pysad.cache import PlanCache, ResultCache
+from pysad.decoder import ABIDecoder
+from pysad.errors import UnknownABI
+from pysad.registry import ABIRegistry
+
+from .abis import PERMIT2_ABI, WETH_ABI
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+PERMIT2 = "0x000000000022d473030f116ddee9f6b43ac78ba3"
+TRANSFER = "0xa9059cbb000000000000000000000000eb093c39fc8ded8c4d043c367d4bd75321e8a7c60000000000000000000000000000000000000000000000000577f9efb3eee9c1"
+APPROVE = "0x095ea7b300000000000000000000000068b3465833fb72a70ecdf485e0e4c7bd8665fc45ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff"
+DEPOSIT = "0xd0e30db0"
+INPUTS = [TRANSFER, APPROVE, DEPOSIT] * 200
+
+
+def test_shared_decoder():
+    # A single shard and a tiny bound, so threads contend on every lookup and eviction
+    cache = ResultCache(max_entries=2, shards=1)
+    decoder = ABIDecoder(WETH_ABI, cache=cache, plans=PlanCache(max_plans=1))
+    expected = [ABIDecoder(WETH_ABI).decode_function(input) for input in INPUTS]
+
+    with ThreadPoolExecutor(8) as pool:
+        runs = list(
+            pool.map(lambda _: list(map(decoder.decode_function, INPUTS)), range(8))
+        )
+    assert all(run == expected for run in runs)
+    assert cache.stats().entries <= 2
+
+
+def test_updates_during_decoding():
+    registry = ABIRegistry({WETH: WETH_ABI}, cache=ResultCache())
+    expected = [registry.decode_call(WETH, input) for input in INPUTS]
+    approve = [e for e in WETH_ABI if e.get("name") == "approve"]
+
+    def decode(_):
+        return [registry.decode_call(WETH, input) for input in INPUTS]
+
+    def update(i):
+        # Readers only ever see the tables before or after an update
+        registry.add_abi(WETH, approve)
+        registry.add_abi(PERMIT2, PERMIT2_ABI)
+        registry.bind(WETH, WETH_ABI, i)
+
+    with ThreadPoolExecutor(8) as pool:
+        updates = pool.map(update, range(8))
+        runs = list(pool.map(decode, range(8)))
+        list(updates)
+    assert all(run == expected for run in runs)
+    assert registry.decode_call(WETH, APPROVE, block=7) == expected[1]
+
+
+def test_tables_swapped_atomically():
+    cache = ResultCache()
+    decoder = ABIDecoder(WETH_ABI, cache=cache)
+    transfer = [e for e in WETH_ABI if e.get("name") == "transfer"]
+    selector = bytes.fromhex(TRANSFER[2:10])
+    output = (1).to_bytes(32, "big")
+
+    def decode(_):
+        for _ in range(200):
+            try:
+                # Either the old or the new tables, never a mix of both
+                assert decoder.decode_return(output, selector) == {"": True}
+            except UnknownABI:
+                pass
+
+    def toggle(_):
+        for _ in range(50):
+            decoder.remove_abi(transfer)
+            decoder.add_abi(transfer)
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: (toggle if i < 2 else decode)(i), range(8)))
+
+    # Results cached by decodes racing the updates are not served afterwards
+    decoder.remove_abi(transfer)
+    with pytest.raises(UnknownABI):
+        decoder.decode_return(output, selector)
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+
+import pytest
+from pysad.registry import ABIRegistry
+from pysad.trace import decode_trace, walk_trace
+
+from .abis import WETH_ABI
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+
+TRACE = {
+    "type": "CALL",
+    "to": "0x68b3465833fb72a70ecdf485e0e4c7bd8665fc45",
+    "input": "0x12345678",
+    "calls": [
+        {
+            "type": "CALL",
+            "to": WETH,
+            "input": "0xa9059cbb000000000000000000000000eb093c39fc8ded8c4d043c367d4bd75321e8a7c60000000000000000000000000000000000000000000000000577f9efb3eee9c1",
+            "output": "0x0000000000000000000000000000000000000000000000000000000000000001",
+        },
+        {
+            "type": "STATICCALL",
+            "to": "0x0000000000000000000000000000000000000002",
+            "input": "0x4b263d5c",
+            "calls": [],
+        },
+        {
+            "type": "CALL",
+            "to": WETH,
+            "input": "0x2e1a7d4d0000000000000000000000000000000000000000000000000577f9efb3eee9c1",
+            "error": "execution reverted",
+        },
+    ],
+}
+
+
+@pytest.mark.parametrize("batch_size", [None, 1, 2, 100])
+def test_decode_trace(batch_size: int | None):
+    registry = ABIRegistry({WETH: WETH_ABI})
+    frames = list(decode_trace(TRACE, registry, batch_size=batch_size))
+
+    assert [f.path for f in frames] == [(), (0,), (1,), (2,)]
+
+    root, transfer, sha256, withdraw = frames
+    assert root.input is None and root.exception is None
+    assert transfer.input == {
+        "dst": "0xeb093c39fc8ded8c4d043c367d4bd75321e8a7c6",
+        "wad": 394058300329486785,
+    }
+    assert transfer.output == {"": True}
+    assert sha256.precompiled and sha256.input == {"data": b"K&=\\"}
+    assert withdraw.input == {"wad": 394058300329486785}
+    assert withdraw.output is None and withdraw.revert is None
+
+
+def test_walk_deep_trace():
+    depth = 10_000
+    trace: dict = {"type": "CALL", "to": WETH, "input": "0x"}
+    frame = trace
+    for _ in range(depth):
+        frame["calls"] = [{"type": "CALL", "to": WETH, "input": "0x"}]
+        frame = frame["calls"][0]
+
+    assert sum(1 for _ in walk_trace(trace)) == depth + 1
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+import pytest
+from eth_abi.abi import encode
+from eth_utils.abi import collapse_if_tuple
+from pysad.errors import DecodingError
+from pysad.universal_router import (
+    COMMANDS,
+    EXECUTE_SUB_PLAN,
+    MAX_SUB_PLAN_DEPTH,
+    decode_commands,
+    decode_execute,
+    decode_v3_path,
+)
+
+WETH = "0xc02aaa39b223fe8d0a0e5c4f27ead9083c756cc2"
+USDC = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
+RECIPIENT = "0x87af91888eaf9ed56c8214a240935836667ad776"
+
+V3_PATH = bytes.fromhex(USDC[2:]) + (500).to_bytes(3, "big") + bytes.fromhex(WETH[2:])
+
+
+def test_decode_execute():
+    commands = bytes([0x00, 0x80 | 0x0C, 0x3F])
+    inputs = [
+        encode(
+            ["address", "uint256", "uint256", "bytes", "bool"],
+            [RECIPIENT, 1000, 1, V3_PATH, True],
+        ),
+        encode(
+            ["address", "uint256"], ["0x0000000000000000000000000000000000000001", 1]
+        ),
+        b"\x01\x02",
+    ]
+    calldata = (
+        "0x3593564c"
+        + encode(["bytes", "bytes[]", "uint256"], [commands, inputs, 1683039126]).hex()
+    )
+
+    swap, unwrap, unknown = decode_execute(calldata)
+
+    assert swap.name == "V3_SWAP_EXACT_IN" and not swap.allow_revert
+    assert swap.args == {
+        "recipient": RECIPIENT,
+        "amountIn": 1000,
+        "amountOutMin": 1,
+        "path": [{"tokenIn": USDC, "fee": 500, "tokenOut": WETH}],
+        "payerIsUser": True,
+    }
+    assert unwrap.name == "UNWRAP_WETH" and unwrap.allow_revert
+    assert unwrap.args == {
+        "recipient": "0x0000000000000000000000000000000000000001",
+        "amountMin": 1,
+    }
+    assert unknown.command == 0x3F and unknown.args is None
+
+
+def test_v3_multihop_path():
+    path = V3_PATH + (3000).to_bytes(3, "big") + bytes.fromhex(USDC[2:])
+    assert [hop["fee"] for hop in decode_v3_path(path)] == [500, 3000]
+
+    with pytest.raises(DecodingError):
+        decode_v3_path(path[:-1])
+
+
+def _sample(param: dict):
+    type = param["type"]
+    if type.endswith("[]"):
+        return [_sample({**param, "type": type[:-2]})]
+    elif type == "tuple":
+        return tuple(_sample(c) for c in param["components"])
+    elif type == "address":
+        return RECIPIENT
+    elif type == "bool":
+        return True
+    elif type == "bytes":
+        return V3_PATH if param["name"] == "path" else b"\x01\x02"
+    return 7
+
+
+def _encode(inputs: list[dict]) -> bytes:
+    return encode(list(map(collapse_if_tuple, inputs)), list(map(_sample, inputs)))
+
+
+@pytest.mark.parametrize(
+    "command", [c for c in COMMANDS if c != EXECUTE_SUB_PLAN], ids=hex
+)
+def test_command_table(command):
+    name, inputs = COMMANDS[command]
+    (decoded,) = decode_commands(bytes([command]), [_encode(inputs)])
+    assert decoded.name == name
+    assert list(decoded.args) == [param["name"] for param in inputs]
+
+
+def test_execute_sub_plan():
+    balance_check = _encode(COMMANDS[0x0E][1])
+    inner = encode(["bytes", "bytes[]"], [bytes([0x0E]), [balance_check]])
+    outer = encode(
+        ["bytes", "bytes[]"],
+        [
+            bytes([0x0C, 0x80 | 0x21]),
+            [
+                encode(["address", "uint256"], [RECIPIENT, 1]),
+                encode(
+                    ["bytes", "bytes[]"], [bytes([0x0E, 0x21]), [balance_check, inner]]
+                ),
+            ],
+        ],
+    )
+    calldata = "0x24856bc3" + outer.hex()
+
+    unwrap, sub_plan = decode_execute(calldata)
+    assert unwrap.name == "UNWRAP_WETH"
+    assert sub_plan.name == "EXECUTE_SUB_PLAN" and sub_plan.allow_revert
+
+    check, nested = sub_plan.args["commands"]
+    assert check.name == "BALANCE_CHECK_ERC20"
+    assert check.args == {"owner": RECIPIENT, "token": RECIPIENT, "minBalance": 7}
+    (innermost,) = nested.args["commands"]
+    assert innermost.args == check.args and innermost.index == 0
+
+
+def test_sub_plan_depth():
+    plan = encode(["bytes", "bytes[]"], [b"", []])
+    for _ in range(MAX_SUB_PLAN_DEPTH + 1):
+        plan = encode(["bytes", "bytes[]"], [bytes([0x21]), [plan]])
+    with pytest.raises(DecodingError):
+        decode_commands(bytes([0x21]), [plan])
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+import pytest
+from eth_abi.abi import encode
+from pysad.errors import InvalidShape, LimitExceeded
+from pysad.plan import DecodePlan
+from pysad.result import DecodeStatus
+from pysad.validate import DecodeLimits, ShapeCheck, head_size
+
+MULTICALL = DecodePlan([{"name": "data", "type": "bytes[]"}], "multicall")
+UNLIMITED = DecodeLimits()
+
+
+def word(value: int) -> bytes:
+    return value.to_bytes(32, "big")
+
+
+def test_valid_inputs():
+    types = ["address", "(uint256,bytes)[]", "string", "uint8[2][]", "bytes[2]"]
+    values = [
+        "0x" + "11" * 20,
+        [(1, b"a" * 40), (2, b"")],
+        "hello",
+        [[1, 2], [3, 4]],
+        [b"x", b"y" * 33],
+    ]
+    ShapeCheck(types)(encode(types, values), UNLIMITED)
+
+
+def test_head_size():
+    assert head_size(["address", "uint256[3]", "(bool,bytes32)", "bytes"]) == 224
+    assert head_size(["(uint256,address)[3]", "(uint256,bytes)[2]"]) == 224
+
+
+@pytest.mark.parametrize(
+    "types,values",
+    [
+        (["(uint256,uint256)[]"], [[]]),
+        (["(uint256,uint256)[]"], [[(1, 2), (3, 4)]]),
+        (
+            ["(uint256,address)[3]", "(address,bytes)[]"],
+            [[(1, "0x" + "11" * 20)] * 3, []],
+        ),
+        (
+            ["(address,bytes)[]", "(string,uint8)[2]"],
+            [[("0x" + "22" * 20, b"a" * 33)], [("x", 1), ("", 2)]],
+        ),
+    ],
+)
+def test_tuple_arrays(types: list[str], values: list):
+    ShapeCheck(types)(encode(types, values), UNLIMITED)
+
+
+def test_tuple_array_length():
+    plan = DecodePlan(
+        [
+            {
+                "name": "calls",
+                "type": "tuple[]",
+                "components": [
+                    {"name": "target", "type": "address"},
+                    {"name": "data", "type": "bytes"},
+                ],
+            }
+        ]
+    )
+    with pytest.raises(InvalidShape) as e:
+        plan.decode(word(32) + word(1 << 200) + bytes(128), limits=UNLIMITED)
+    assert e.value.position == 32 and "Array of" in str(e.value)
+
+
+@pytest.mark.parametrize(
+    "data,position",
+    [
+        # Offset past the end of the input
+        (word(0x1000), 0),
+        # Claimed length far beyond the remaining input
+        (word(32) + word(1 << 64), 32),
+        # Item offset past the end of the array
+        (word(32) + word(1) + word(0x1000), 64),
+    ],
+)
+def test_malformed(data: bytes, position: int):
+    with pytest.raises(InvalidShape) as e:
+        MULTICALL.decode(data, limits=UNLIMITED)
+    assert e.value.position == position
+
+
+def test_byte_budget():
+    # Every item points at the same 1KB payload
+    count = 100
+    data = word(32) + word(count) + word(32 * count) * count + word(1024) + bytes(1024)
+    assert len(MULTICALL.decode(data)["data"]) == count
+
+    with pytest.raises(LimitExceeded):
+        MULTICALL.decode(data, limits=DecodeLimits(max_bytes=10 * 1024))
+
+    result = MULTICALL.try_decode(data, limits=DecodeLimits(max_elements=10))
+    assert result.status is DecodeStatus.LIMIT_EXCEEDED and result.position == 32
+
+
+def test_depth_limit():
+    plan = DecodePlan([{"name": "nested", "type": "uint256[][][]"}])
+    data = encode(["uint256[][][]"], [[[[1]]]])
+    assert plan.decode(data, limits=DecodeLimits(max_depth=4)) == {"nested": [[[1]]]}
+    with pytest.raises(LimitExceeded):
+        plan.decode(data, limits=DecodeLimits(max_depth=2))
+
+
+def test_tuple_array_depth():
+    calls = {
+        "name": "calls",
+        "type": "tuple[]",
+        "components": [
+            {"name": "n", "type": "uint256"},
+            {"name": "b", "type": "bytes"},
+        ],
+    }
+    plan = DecodePlan(
+        [
+            {
+                "name": "batches",
+                "type": "tuple[]",
+                "components": [calls, {"name": "c", "type": "bytes"}],
+            }
+        ]
+    )
+    data = encode(["((uint256,bytes)[],bytes)[]"], [[([(1, b"a")], b"b")]])
+    assert plan.decode(data, limits=DecodeLimits(max_depth=5))["batches"] == [
+        {"calls": [{"n": 1, "b": b"a"}], "c": b"b"}
+    ]
+    with pytest.raises(LimitExceeded):
+        plan.decode(data, limits=DecodeLimits(max_depth=4))
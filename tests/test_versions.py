@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+
+import pytest
+from pysad.errors import UnknownABI
+from pysad.registry import ABIRegistry
+from pysad.result import DecodeStatus
+from pysad.versions import VersionedABI
+
+from .abis import PERMIT2_ABI, WETH_ABI
+
+PROXY = "0x000000000022d473030f116ddee9f6b43ac78ba3"
+TRANSFER = "0xa9059cbb000000000000000000000000eb093c39fc8ded8c4d043c367d4bd75321e8a7c60000000000000000000000000000000000000000000000000577f9efb3eee9c1"
+LOCKDOWN = "0xcc53287f" + "20".rjust(64, "0") + "00" * 32
+
+PROXY_ABI = [e for e in PERMIT2_ABI if e["type"] == "error"]
+WETH_FUNCTIONS = [e for e in WETH_ABI if e["type"] == "function"]
+LOCKDOWN_ABI = [e for e in PERMIT2_ABI if e.get("name") == "lockdown"]
+
+
+def test_versioned_abi():
+    versions = VersionedABI()
+    versions.bind(PROXY_ABI, 0)
+    versions.bind(WETH_FUNCTIONS, 100, 199)
+    versions.bind(LOCKDOWN_ABI, 200)
+
+    assert versions.at(-1) is None
+    assert not versions.at(99).functions and versions.at(99).errors
+    assert versions.at(100) is versions.at(199)
+    assert bytes.fromhex("a9059cbb") in versions.at(150).functions
+    assert set(versions.at(200).functions) == {bytes.fromhex("cc53287f")}
+    assert versions.at(10**9).errors
+
+    with pytest.raises(ValueError):
+        versions.bind(WETH_FUNCTIONS, 10, 5)
+
+
+def test_registry_blocks():
+    registry = ABIRegistry()
+    registry.bind(PROXY, WETH_FUNCTIONS, 100, 199)
+    registry.bind(PROXY, LOCKDOWN_ABI, 200)
+
+    assert registry.decode_call(PROXY, TRANSFER, block=150)["wad"] == 0x577F9EFB3EEE9C1
+    assert registry.decode_call(PROXY, LOCKDOWN, block=250) == {"approvals": []}
+    status = registry.try_decode_call(PROXY, TRANSFER, block=250).status
+    assert status is DecodeStatus.UNKNOWN_SELECTOR
+
+    # Outside of the bindings, the registered ABI is used if there is one
+    with pytest.raises(UnknownABI):
+        registry.decode_call(PROXY, TRANSFER, block=50)
+    registry.register(PROXY, WETH_ABI)
+    assert registry.decode_call(PROXY, TRANSFER, block=50)["wad"] == 0x577F9EFB3EEE9C1
+    assert registry.decode_call(PROXY, TRANSFER)["wad"] == 0x577F9EFB3EEE9C1